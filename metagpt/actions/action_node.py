@@ -417,7 +417,9 @@ class ActionNode:
         timeout=USE_CONFIG_TIMEOUT,
     ) -> (str, BaseModel):
         """Use ActionOutput to wrap the output of aask"""
-        content = await self.llm.aask(prompt, system_msgs, images=images, timeout=timeout)
+        # the output ends with the closing tag, stop the generation there instead of paying for trailing tokens
+        stream = self.llm.aask_stream(prompt, system_msgs, images=images, timeout=timeout, stop=f"[/{TAG}]")
+        content = await stream.read()
         logger.debug(f"llm raw output:\n{content}")
         output_class = self.create_model_class(output_class_name, output_data_mapping)
 
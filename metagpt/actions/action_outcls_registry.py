@@ -3,9 +3,114 @@
 # @Desc   : registry to store Dynamic Model from ActionNode.create_model_class to keep it as same Class
 #           with same class name and mapping
 
-from functools import wraps
+import types
+import typing
+from collections import OrderedDict
+from functools import lru_cache, wraps
+from typing import Any, Hashable, Optional
 
-action_outcls_registry = dict()
+DEFAULT_MAXSIZE = 1024
+_UNION_TYPES = (typing.Union, getattr(types, "UnionType", typing.Union))  # `X | Y` since python 3.10
+
+
+class ActionOutclsRegistry:
+    """LRU cache of the dynamic classes, at most `maxsize` of them are kept.
+
+    A class evicted and created again is a new class, so its instances no longer compare equal to the instances of the
+    evicted one. `hits`, `misses` and `evictions` tell whether `maxsize` fits the workload.
+    """
+
+    def __init__(self, maxsize: int = DEFAULT_MAXSIZE):
+        self.maxsize = maxsize
+        self._classes: OrderedDict[Hashable, type] = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def get(self, outcls_id: Hashable) -> Optional[type]:
+        out_cls = self._classes.get(outcls_id)
+        if out_cls is None:
+            self.misses += 1
+            return None
+        self._classes.move_to_end(outcls_id)
+        self.hits += 1
+        return out_cls
+
+    def put(self, outcls_id: Hashable, out_cls: type):
+        self._classes[outcls_id] = out_cls
+        self._classes.move_to_end(outcls_id)
+        while len(self._classes) > self.maxsize:
+            self._classes.popitem(last=False)
+            self.evictions += 1
+
+    def stats(self) -> dict:
+        return {
+            "size": len(self._classes),
+            "maxsize": self.maxsize,
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+        }
+
+    def clear(self):
+        self._classes.clear()
+
+    def __len__(self) -> int:
+        return len(self._classes)
+
+    def __contains__(self, outcls_id: Hashable) -> bool:
+        return outcls_id in self._classes
+
+
+action_outcls_registry = ActionOutclsRegistry()
+
+
+@lru_cache(maxsize=DEFAULT_MAXSIZE)
+def _hashable_type_key(tp: Hashable) -> Hashable:
+    origin = typing.get_origin(tp)
+    if origin is None:
+        return tp
+    if origin in _UNION_TYPES:
+        origin = typing.Union
+    return origin, tuple(_type_key(i) for i in typing.get_args(tp))
+
+
+def _type_key(tp: Any) -> Hashable:
+    """`typing.List[str]` and `list[str]` have the same key, as do `Optional[str]` and `str | None`"""
+    try:
+        return _hashable_type_key(tp)
+    except TypeError:  # unhashable
+        return repr(tp)
+
+
+def _value_key(value: Any) -> Hashable:
+    if value is ... or isinstance(value, (str, int, float, bool, type(None))):
+        return value
+    if hasattr(value, "__repr_args__"):
+        # a `Field(...)` only hashes by identity, and `create_model` sets its annotation
+        return type(value), repr([i for i in value.__repr_args__() if i[0] != "annotation"])
+    return repr(value)
+
+
+def mapping_fingerprint(mapping: dict) -> tuple:
+    """Structural key of a mapping of `ActionNode.create_model_class`, independent of the order of the fields"""
+    fields = []
+    for name, value in mapping.items():
+        if isinstance(value, dict):
+            fields.append((name, mapping_fingerprint(value)))
+        elif isinstance(value, tuple) and len(value) == 2:
+            tp, default = value
+            try:
+                tp_key = _hashable_type_key(tp)
+            except TypeError:
+                tp_key = repr(tp)
+            fields.append((name, tp_key, default if default is ... else _value_key(default)))
+        elif isinstance(value, tuple):
+            fields.append((name, _type_key(value[0]), *(_value_key(i) for i in value[1:])))
+        else:
+            fields.append((name, _type_key(value)))
+    fields.sort()  # field names are unique, only they are compared
+    return tuple(fields)
 
 
 def register_action_outcls(func):
@@ -15,28 +120,16 @@ def register_action_outcls(func):
     """
 
     @wraps(func)
-    def decorater(*args, **kwargs):
-        """
-        arr example
-            [<class 'metagpt.actions.action_node.ActionNode'>, 'test', {'field': (str, Ellipsis)}]
-        """
-        arr = list(args) + list(kwargs.values())
+    def decorater(cls, class_name: str, mapping: dict):
         """
         outcls_id example
-            "<class 'metagpt.actions.action_node.ActionNode'>_test_{'field': (str, Ellipsis)}"
+            (<class 'metagpt.actions.action_node.ActionNode'>, 'test', (('field', <class 'str'>, Ellipsis),))
         """
-        for idx, item in enumerate(arr):
-            if isinstance(item, dict):
-                arr[idx] = dict(sorted(item.items()))
-        outcls_id = "_".join([str(i) for i in arr])
-        # eliminate typing influence
-        outcls_id = outcls_id.replace("typing.List", "list").replace("typing.Dict", "dict")
-
-        if outcls_id in action_outcls_registry:
-            return action_outcls_registry[outcls_id]
-
-        out_cls = func(*args, **kwargs)
-        action_outcls_registry[outcls_id] = out_cls
+        outcls_id = (cls, class_name, mapping_fingerprint(mapping))
+        out_cls = action_outcls_registry.get(outcls_id)
+        if out_cls is None:
+            out_cls = func(cls, class_name, mapping)
+            action_outcls_registry.put(outcls_id, out_cls)
         return out_cls
 
     return decorater
@@ -185,6 +185,7 @@ class WebBrowseAndSummarize(Action):
     desc: str = "Explore the web and provide summaries of articles and webpages."
     browse_func: Union[Callable[[list[str]], None], None] = None
     web_browser_engine: Optional[WebBrowserEngine] = None
+    max_concurrency: int = 8  # chunks of a page summarized at once
 
     @model_validator(mode="after")
     def validate_engine_and_run_func(self):
@@ -222,13 +223,10 @@ class WebBrowseAndSummarize(Action):
         prompt_template = WEB_BROWSE_AND_SUMMARIZE_PROMPT.format(query=query, content="{}")
         for u, content in zip([url, *urls], contents):
             content = content.inner_text
-            chunk_summaries = []
-            for prompt in generate_prompt_chunk(content, prompt_template, self.llm.model, system_text, 4096):
-                logger.debug(prompt)
-                summary = await self._aask(prompt, [system_text])
-                if summary == "Not relevant.":
-                    continue
-                chunk_summaries.append(summary)
+            prompts = list(generate_prompt_chunk(content, prompt_template, self.llm.model, system_text, 4096))
+            logger.debug(prompts)
+            summaries_of_chunks = await self._summarize_chunks(prompts, system_text)
+            chunk_summaries = [i for i in summaries_of_chunks if i != "Not relevant."]
 
             if not chunk_summaries:
                 summaries[u] = None
@@ -244,6 +242,16 @@ class WebBrowseAndSummarize(Action):
             summaries[u] = summary
         return summaries
 
+    async def _summarize_chunks(self, prompts: list[str], system_text: str) -> list[str]:
+        """Summarize the chunks of a page concurrently, at most `max_concurrency` of them at once"""
+        semaphore = asyncio.Semaphore(self.max_concurrency)
+
+        async def summarize(prompt: str) -> str:
+            async with semaphore:
+                return await self._aask(prompt, [system_text])
+
+        return await asyncio.gather(*[summarize(i) for i in prompts])
+
 
 class ConductResearch(Action):
     """Action class to conduct research and generate a research report."""
@@ -13,6 +13,7 @@ from pydantic import BaseModel, model_validator
 
 from metagpt.configs.browser_config import BrowserConfig
 from metagpt.configs.embedding_config import EmbeddingConfig
+from metagpt.configs.http_config import HTTPConfig
 from metagpt.configs.llm_config import LLMConfig, LLMType
 from metagpt.configs.mermaid_config import MermaidConfig
 from metagpt.configs.redis_config import RedisConfig
@@ -54,6 +55,9 @@ class Config(CLIParams, YamlModel):
     # Global Proxy. Will be used if llm.proxy is not set
     proxy: str = ""
 
+    # Connection pool of the HTTP sessions shared by the requests
+    http: HTTPConfig = HTTPConfig()
+
     # Tool Parameters
     search: SearchConfig = SearchConfig()
     browser: BrowserConfig = BrowserConfig()
@@ -0,0 +1,23 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+@File    : http_config.py
+@Desc    : Connection pool of the shared aiohttp sessions, see `metagpt.utils.ahttp_client.SESSION_POOL`
+"""
+from typing import Optional
+
+from metagpt.utils.yaml_model import YamlModel
+
+DEFAULT_CONNECTOR_LIMIT = 100  # max simultaneous connections of a session, 0 for unlimited
+DEFAULT_CONNECTOR_LIMIT_PER_HOST = 0  # max simultaneous connections to one endpoint, 0 for unlimited
+DEFAULT_KEEPALIVE_TIMEOUT = 30  # seconds an idle connection is kept for reuse
+DEFAULT_DNS_CACHE_TTL = 300  # seconds a resolved host is cached
+
+
+class HTTPConfig(YamlModel):
+    """Config for the connection pool of HTTP requests"""
+
+    limit: int = DEFAULT_CONNECTOR_LIMIT
+    limit_per_host: int = DEFAULT_CONNECTOR_LIMIT_PER_HOST
+    keepalive_timeout: float = DEFAULT_KEEPALIVE_TIMEOUT
+    ttl_dns_cache: Optional[int] = DEFAULT_DNS_CACHE_TTL  # 0 disables the cache, None caches forever
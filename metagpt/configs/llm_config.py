@@ -6,7 +6,7 @@
 @File    : llm_config.py
 """
 from enum import Enum
-from typing import Optional
+from typing import List, Optional
 
 from pydantic import field_validator
 
@@ -14,6 +14,7 @@ from metagpt.const import LLM_API_TIMEOUT
 from metagpt.utils.yaml_model import YamlModel
 from metagpt.const import METAGPT_ROOT, CONFIG_ROOT
 
+
 class LLMType(Enum):
     OPENAI = "openai"
     ANTHROPIC = "anthropic"
@@ -34,6 +35,7 @@ class LLMType(Enum):
     OPENROUTER = "openrouter"
     BEDROCK = "bedrock"
     ARK = "ark"
+    ROUTER = "router"  # spread requests across `LLMConfig.endpoints`
 
     def __missing__(self, key):
         return self.OPENAI
@@ -90,6 +92,26 @@ class LLMConfig(YamlModel):
     # Cost Control
     calc_usage: bool = True
 
+    # Rate Limit, shared by all LLM instances of the same endpoint, 0 means unlimited
+    rpm: int = 0  # requests per minute
+    tpm: int = 0  # tokens per minute, prompt and max_token are reserved before a request
+    max_concurrency: int = 0  # requests in flight
+    rate_limit_retries: int = 3  # retries of a 429 response, with a backoff shared by the endpoint
+
+    # Share one in-flight request among concurrent identical requests, only when temperature is 0; each caller is
+    # charged the costs of the shared request, unless all of them charge the same cost manager
+    coalesce_requests: bool = False
+
+    # Routing, for api_type "router" only: requests go to the healthiest of `endpoints`, judged by latency and errors
+    endpoints: List["LLMConfig"] = []
+    hedge_percentile: float = 95  # duplicate a request on the next endpoint once slower than this, 0 to disable
+
+    # Response Cache, reuse the response of an identical request across runs
+    response_cache: bool = False
+    response_cache_path: str = ""  # default to LLM_RESPONSE_CACHE_PATH
+    response_cache_max_entries: int = 10000
+    response_cache_ttl: int = 7 * 24 * 3600  # seconds, 0 means never expire
+
     @field_validator("api_key")
     @classmethod
     def check_llm_key(cls, v):
@@ -97,8 +119,9 @@ class LLMConfig(YamlModel):
             repo_config_path = METAGPT_ROOT / "config/config2.yaml"
             root_config_path = CONFIG_ROOT / "config2.yaml"
             if root_config_path.exists():
-                 raise ValueError(
-                    f"Please set your API key in {root_config_path}. If you also set your config in {repo_config_path}, \nthe former will overwrite the latter. This may cause unexpected result.\n")
+                raise ValueError(
+                    f"Please set your API key in {root_config_path}. If you also set your config in {repo_config_path}, \nthe former will overwrite the latter. This may cause unexpected result.\n"
+                )
             elif repo_config_path.exists():
                 raise ValueError(f"Please set your API key in {repo_config_path}")
             else:
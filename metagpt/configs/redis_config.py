@@ -14,6 +14,7 @@ class RedisConfig(YamlModelWithoutDefault):
     username: str = ""
     password: str
     db: str
+    compress: bool = False  # zlib-compress the values written
 
     def to_url(self):
         return f"redis://{self.host}:{self.port}"
@@ -65,6 +65,7 @@ API_QUESTIONS_PATH = UT_PATH / "files/question/"
 SERDESER_PATH = DEFAULT_WORKSPACE_ROOT / "storage"  # TODO to store `storage` under the individual generated project
 
 TMP = METAGPT_ROOT / "tmp"
+LLM_RESPONSE_CACHE_PATH = CONFIG_ROOT / "llm_response_cache.db"
 
 SOURCE_ROOT = METAGPT_ROOT / "metagpt"
 PROMPT_PATH = SOURCE_ROOT / "prompts"
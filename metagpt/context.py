@@ -88,7 +88,7 @@ class Context(BaseModel):
             return self.cost_manager
 
     def llm(self) -> BaseLLM:
-        """Return a LLM instance, fixme: support cache"""
+        """Return a LLM instance, the SDK client underneath is shared through `LLM_CLIENT_REGISTRY`"""
         # if self._llm is None:
         self._llm = create_llm_instance(self.config.llm)
         if self._llm.cost_manager is None:
@@ -96,7 +96,7 @@ class Context(BaseModel):
         return self._llm
 
     def llm_with_cost_manager_from_llm_config(self, llm_config: LLMConfig) -> BaseLLM:
-        """Return a LLM instance, fixme: support cache"""
+        """Return a LLM instance with its own cost manager, the SDK client underneath is shared"""
         # if self._llm is None:
         llm = create_llm_instance(llm_config)
         if llm.cost_manager is None:
@@ -9,8 +9,18 @@ from typing import TYPE_CHECKING, Any, Dict, Iterable, Optional, Set, Union
 
 from gymnasium import spaces
 from gymnasium.core import ActType, ObsType
-from pydantic import BaseModel, ConfigDict, Field, SerializeAsAny, model_validator
+from pydantic import (
+    BaseModel,
+    ConfigDict,
+    Field,
+    PrivateAttr,
+    SerializeAsAny,
+    field_serializer,
+    field_validator,
+    model_validator,
+)
 
+from metagpt.const import MESSAGE_ROUTE_TO_ALL
 from metagpt.context import Context
 from metagpt.environment.api.env_api import (
     EnvAPIAbstract,
@@ -18,9 +28,11 @@ from metagpt.environment.api.env_api import (
     WriteAPIRegistry,
 )
 from metagpt.environment.base_env_space import BaseEnvAction, BaseEnvObsParams
+from metagpt.environment.env_history import EnvHistory
+from metagpt.environment.scheduler import RoleScheduler
 from metagpt.logs import logger
 from metagpt.schema import Message
-from metagpt.utils.common import get_function_schema, is_coroutine_func, is_send_to
+from metagpt.utils.common import get_function_schema, is_coroutine_func
 
 if TYPE_CHECKING:
     from metagpt.roles.role import Role  # noqa: F401
@@ -131,8 +143,11 @@ class Environment(ExtEnv):
     desc: str = Field(default="")  # 环境描述
     roles: dict[str, SerializeAsAny["Role"]] = Field(default_factory=dict, validate_default=True)
     member_addrs: Dict["Role", Set] = Field(default_factory=dict, exclude=True)
-    history: str = ""  # For debug
+    history: EnvHistory = Field(default_factory=EnvHistory)  # For debug
     context: Context = Field(default_factory=Context, exclude=True)
+    scheduler: RoleScheduler = Field(default_factory=RoleScheduler, exclude=True)
+
+    _addr_index: dict[str, dict["Role", None]] = PrivateAttr(default_factory=dict)  # address -> ordered set of members
 
     def reset(
         self,
@@ -148,6 +163,15 @@ class Environment(ExtEnv):
     def step(self, action: BaseEnvAction) -> tuple[dict[str, Any], float, bool, bool, dict[str, Any]]:
         pass
 
+    @field_validator("history", mode="before")
+    @classmethod
+    def validate_history(cls, history):
+        return EnvHistory.from_text(history) if isinstance(history, str) else history
+
+    @field_serializer("history")
+    def serialize_history(self, history: EnvHistory) -> str:
+        return history.text()
+
     @model_validator(mode="after")
     def init_roles(self):
         self.add_roles(self.roles.values())
@@ -181,31 +205,58 @@ class Environment(ExtEnv):
         route the message to the message recipient is a problem addressed by the transport framework designed
         in RFC 113.
         """
-        logger.debug(f"publish_message: {message.dump()}")
-        found = False
+        logger.opt(lazy=True).debug("publish_message: {}", message.dump)
         # According to the routing feature plan in Chapter 2.2.3.2 of RFC 113
-        for role, addrs in self.member_addrs.items():
-            if is_send_to(message, addrs):
-                role.put_message(message)
-                found = True
-        if not found:
+        recipients = self._get_recipients(message)
+        for role in recipients:
+            role.put_message(message)
+        if not recipients:
             logger.warning(f"Message no recipients: {message.dump()}")
-        self.history += f"\n{message}"  # For debug
+        self.history.add(message)  # For debug
 
         return True
 
+    def publish_messages(self, messages: Iterable[Message]) -> bool:
+        """Distribute a batch of messages to their recipients, in order"""
+        for message in messages:
+            self.publish_message(message)
+        return True
+
+    def _get_recipients(self, message: Message) -> Iterable["Role"]:
+        """Look the recipients up in the address index, same result as `is_send_to` on every member"""
+        if MESSAGE_ROUTE_TO_ALL in message.send_to:
+            return list(self.member_addrs)
+        recipients = {}
+        for addr in message.send_to:
+            recipients.update(self._addr_index.get(addr, {}))
+        return recipients
+
     async def run(self, k=1):
         """处理一次所有信息的运行
         Process all Role runs at once
         """
         for _ in range(k):
             futures = []
-            for role in self.roles.values():
+            for role in self._get_ready_roles():
                 future = role.run()
                 futures.append(future)
 
             await asyncio.gather(*futures)
-            logger.debug(f"is idle: {self.is_idle}")
+            logger.opt(lazy=True).debug("is idle: {}", lambda: self.is_idle)
+
+    def _get_ready_roles(self) -> list["Role"]:
+        """Roles to run in the next round, the ones with nothing to observe are skipped"""
+        return self.scheduler.next_roles(self.member_addrs, total=len(self.roles))
+
+    def wake_up(self, role: "Role", rounds: int = 0):
+        """Run `role` in the next round, or after `rounds` rounds, even if it has no new messages"""
+        self.scheduler.wake_up(role, rounds)
+
+    def close(self):
+        """Release what the environment holds once a run is over, it can still be serialized and run again"""
+        for role in self.roles.values():
+            role.stop()
+        self.history.close()
 
     def get_roles(self) -> dict[str, "Role"]:
         """获得环境内的所有角色
@@ -236,7 +287,14 @@ class Environment(ExtEnv):
 
     def set_addresses(self, obj, addresses):
         """Set the addresses of the object"""
+        for addr in self.member_addrs.get(obj, ()):
+            members = self._addr_index.get(addr, {})
+            members.pop(obj, None)
+            if not members:
+                self._addr_index.pop(addr, None)
         self.member_addrs[obj] = addresses
+        for addr in addresses:
+            self._addr_index.setdefault(addr, {})[obj] = None
 
     def archive(self, auto_archive=True):
         if auto_archive and self.context.git_repo:
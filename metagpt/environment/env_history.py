@@ -0,0 +1,107 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+# @Desc   : bounded history of the messages published in an environment
+
+import json
+import os
+import tempfile
+import weakref
+from collections import deque
+from itertools import islice
+from pathlib import Path
+from typing import Iterator, Optional, Union
+
+from metagpt.schema import Message
+
+DEFAULT_MAX_ENTRIES = 1000
+
+
+class EnvHistory:
+    """The messages published in an environment, rendered as text only when asked for.
+
+    Only the most recent `max_entries` are kept in memory, `str` renders them alone. Older entries are spilled as JSON
+    lines to `spill_path`, or to an anonymous temporary file removed along with the history, and read back by
+    `iter_all` and `text`.
+    """
+
+    def __init__(self, max_entries: Optional[int] = DEFAULT_MAX_ENTRIES, spill_path: Union[str, Path, None] = None):
+        self.entries: deque[str] = deque(maxlen=max_entries)
+        self.spill_path = Path(spill_path) if spill_path else None
+        self.spilled = 0
+        self._spill_file = None
+        self._tmp_path: Optional[Path] = None
+
+    @classmethod
+    def from_text(cls, text: str, **kwargs) -> "EnvHistory":
+        """Load the history of older versions, which was stored as a single string"""
+        history = cls(**kwargs)
+        if text:
+            history.entries.append(text)
+        return history
+
+    def add(self, message: Union[Message, str]):
+        entry = f"\n{message}"
+        if len(self.entries) == self.entries.maxlen:
+            self._spill(self.entries[0])
+        self.entries.append(entry)
+
+    def _spill(self, entry: str):
+        if self._spill_file is None:
+            self._spill_file = open(self._spill_target(), "a" if self.spilled else "w", encoding="utf-8")
+        self._spill_file.write(json.dumps(entry, ensure_ascii=False) + "\n")
+        self._spill_file.flush()
+        self.spilled += 1
+
+    def _spill_target(self) -> Path:
+        if self.spill_path:
+            self.spill_path.parent.mkdir(parents=True, exist_ok=True)
+            return self.spill_path
+        if self._tmp_path is None:
+            fd, path = tempfile.mkstemp(prefix="env_history_", suffix=".jsonl")
+            os.close(fd)
+            self._tmp_path = Path(path)
+            weakref.finalize(self, self._tmp_path.unlink, missing_ok=True)
+        return self._tmp_path
+
+    @property
+    def total(self) -> int:
+        """Number of all entries, the kept and the spilled ones, an entry keeps its position among them for good"""
+        return self.spilled + len(self.entries)
+
+    def iter_all(self, start: int = 0) -> Iterator[str]:
+        """Iterate over all entries from position `start` on, the spilled ones read lazily from the spill file"""
+        spilled, recent = self.spilled, list(self.entries)
+        if start < spilled:
+            with open(self.spill_path or self._tmp_path, encoding="utf-8") as f:
+                for line in islice(f, start, spilled):
+                    yield json.loads(line)
+        yield from recent[max(start - spilled, 0) :]
+
+    def text(self) -> str:
+        """The whole history, including the spilled entries"""
+        return "".join(self.iter_all())
+
+    def close(self):
+        """Close the spill file, it is opened again by the next spilled entry and stays readable"""
+        if self._spill_file is not None:
+            self._spill_file.close()
+            self._spill_file = None
+
+    def __len__(self) -> int:
+        return len(self.entries)
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self.entries)
+
+    def __str__(self) -> str:
+        return "".join(self.entries)
+
+    def __repr__(self) -> str:
+        return (
+            f"EnvHistory(entries={len(self.entries)}, max_entries={self.entries.maxlen}, spill_path={self.spill_path})"
+        )
+
+    def __eq__(self, other) -> bool:
+        if isinstance(other, EnvHistory):
+            return str(self) == str(other)  # entry boundaries are not kept by serialization
+        return NotImplemented
@@ -0,0 +1,57 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+# @Desc   : ready queue deciding which roles of an environment run in a round
+
+from typing import TYPE_CHECKING, Container, Optional
+
+if TYPE_CHECKING:
+    from metagpt.roles.role import Role  # noqa: F401
+
+
+class RoleScheduler:
+    """Ready queue of roles, a role is only run once it has been woken up.
+
+    Roles are woken up when a message is put into their buffer, or by a timer set with `wake_up(role, rounds)`. Ready
+    roles run by `Role.priority`, higher first, and the longer a role has been waiting the more its priority is raised,
+    so that low priority roles are not starved when `max_concurrency` caps the roles run per round. Equal priorities
+    run in the order they were woken up.
+    """
+
+    def __init__(self, max_concurrency: Optional[int] = None):
+        self.max_concurrency = max_concurrency
+        self.round = 0
+        self.ready: dict["Role", int] = {}  # role -> round it was woken up
+        self.timers: dict["Role", int] = {}  # role -> round it is due
+        self.wakeups = 0  # roles run
+        self.idle_wakeups_avoided = 0  # roles not run because they had nothing to do
+
+    def wake_up(self, role: "Role", rounds: int = 0):
+        """Make `role` ready now, or after `rounds` rounds"""
+        if rounds <= 0:
+            self.ready.setdefault(role, self.round)
+            return
+        due = self.round + rounds
+        self.timers[role] = min(due, self.timers.get(role, due))
+
+    def next_roles(self, members: Container["Role"], total: int) -> list["Role"]:
+        """Pop the ready roles to run in the next round.
+
+        `members` tells which roles still belong to the environment, `total` is how many there are.
+        """
+        self.round += 1
+        for role, due in list(self.timers.items()):
+            if due <= self.round:
+                del self.timers[role]
+                self.wake_up(role)
+
+        for role in [i for i in self.ready if i not in members]:
+            del self.ready[role]
+        ready = sorted(self.ready, key=lambda i: -(i.priority + self.round - self.ready[i]))
+        if self.max_concurrency:
+            ready = ready[: self.max_concurrency]
+        for role in ready:
+            del self.ready[role]
+
+        self.wakeups += len(ready)
+        self.idle_wakeups_avoided += total - len(ready) - len(self.ready)
+        return ready
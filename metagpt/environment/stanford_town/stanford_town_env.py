@@ -2,9 +2,16 @@
 # -*- coding: utf-8 -*-
 # @Desc   : MG StanfordTown Env
 
+from typing import TYPE_CHECKING
+
 from metagpt.environment.base_env import Environment
 from metagpt.environment.stanford_town.stanford_town_ext_env import StanfordTownExtEnv
 
+if TYPE_CHECKING:
+    from metagpt.ext.stanford_town.roles.st_role import STRole  # noqa: F401
+
 
 class StanfordTownEnv(StanfordTownExtEnv, Environment):
-    pass
+    def _get_ready_roles(self) -> list["STRole"]:
+        """Roles perceive the maze on every step, all of them run each round"""
+        return list(self.roles.values())
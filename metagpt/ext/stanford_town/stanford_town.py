@@ -42,4 +42,4 @@ class StanfordTown(Team):
         for profile, role in roles.items():
             role.save_into()
 
-        return self.env.history
+        return self.env.history.text()
@@ -141,7 +141,7 @@ class Moderator(BasePlayer):
         news = []
         if not news:
             news = self.rc.msg_buffer.pop_all()
-        old_messages = [] if ignore_memory else self.rc.memory.get()
+        unseen = news if ignore_memory else self.rc.memory.find_news(news)
         for m in news:
             if len(m.restricted_to) and self.profile not in m.restricted_to and self.name not in m.restricted_to:
                 # if the msg is not send to the whole audience ("") nor this role (self.profile or self.name),
@@ -151,9 +151,8 @@ class Moderator(BasePlayer):
         # add `MESSAGE_ROUTE_TO_ALL in n.send_to` make it to run `ParseSpeak`
         self.rc.news = [
             n
-            for n in news
-            if (n.cause_by in self.rc.watch or self.profile in n.send_to or MESSAGE_ROUTE_TO_ALL in n.send_to)
-            and n not in old_messages
+            for n in unseen
+            if n.cause_by in self.rc.watch or self.profile in n.send_to or MESSAGE_ROUTE_TO_ALL in n.send_to
         ]
         return len(self.rc.news)
 
@@ -6,8 +6,13 @@
 @File    : logs.py
 """
 
+import atexit
 import sys
+import threading
+import time
+import weakref
 from datetime import datetime
+from typing import Callable, Optional
 
 from loguru import logger as _logger
 
@@ -17,7 +22,11 @@ _print_level = "INFO"
 
 
 def define_log_level(print_level="INFO", logfile_level="DEBUG", name: str = None):
-    """Adjust the log level to above level"""
+    """Adjust the log level to above level.
+
+    The logfile keeps DEBUG records by default. With `logfile_level="INFO"` no sink accepts DEBUG, and the arguments of
+    `logger.opt(lazy=True).debug(...)` on the hot paths are not evaluated at all.
+    """
     global _print_level
     _print_level = print_level
 
@@ -46,3 +55,79 @@ def set_llm_stream_logfunc(func):
 def _llm_stream_log(msg):
     if _print_level in ["INFO"]:
         print(msg, end="")
+
+
+class BufferedStreamLog:
+    """A sink for `set_llm_stream_logfunc` that writes streamed chunks in batches instead of one write per token.
+
+    Chunks are buffered and written once a line is complete or `max_size` characters are pending. A background thread
+    writes whatever is left every `flush_interval` seconds, so partial lines still show up while the LLM is typing.
+    """
+
+    def __init__(
+        self, write: Optional[Callable[[str], None]] = None, flush_interval: float = 0.1, max_size: int = 4096
+    ):
+        self._write = write
+        self.flush_interval = flush_interval
+        self.max_size = max_size
+        self._buffer: list[str] = []
+        self._size = 0
+        self._lock = threading.Lock()
+        self._pending = threading.Event()
+        self._closed = False
+        self._thread = threading.Thread(target=self._run, name="llm-stream-log", daemon=True)
+        self._thread.start()
+        _stream_logs.add(self)
+
+    def __call__(self, msg: str):
+        if _print_level not in ["INFO"] or not msg:
+            return
+        with self._lock:
+            self._buffer.append(msg)
+            self._size += len(msg)
+            full = self._size >= self.max_size or "\n" in msg
+        if full:
+            self.flush()
+        else:
+            self._pending.set()
+
+    def flush(self):
+        with self._lock:
+            text = "".join(self._buffer)
+            self._buffer.clear()
+            self._size = 0
+            if text:
+                self._output(text)
+
+    def _output(self, text: str):
+        if self._write:
+            self._write(text)
+        else:
+            sys.stdout.write(text)
+            sys.stdout.flush()
+
+    def _run(self):
+        while not self._closed:
+            self._pending.wait()
+            self._pending.clear()
+            if not self._closed:
+                time.sleep(self.flush_interval)
+            self.flush()
+
+    def close(self):
+        """Stop the flushing thread and write what is left"""
+        self._closed = True
+        self._pending.set()
+        if self._thread is not threading.current_thread():
+            self._thread.join()
+        self.flush()
+        _stream_logs.discard(self)
+
+
+_stream_logs: "weakref.WeakSet[BufferedStreamLog]" = weakref.WeakSet()
+
+
+@atexit.register
+def _close_stream_logs():
+    for sink in list(_stream_logs):
+        sink.close()
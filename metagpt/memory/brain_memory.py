@@ -12,7 +12,7 @@ import json
 import re
 from typing import Dict, List, Optional
 
-from pydantic import BaseModel, Field
+from pydantic import BaseModel, Field, PrivateAttr
 
 from metagpt.config2 import config
 from metagpt.const import DEFAULT_MAX_TOKENS, DEFAULT_TOKEN_SIZE
@@ -22,6 +22,8 @@ from metagpt.provider.base_llm import BaseLLM
 from metagpt.schema import Message, SimpleMessage
 from metagpt.utils.redis import Redis
 
+DELTA_COMPACT_MIN = 32  # history entries appended to a snapshot before it is rewritten
+
 
 class BrainMemory(BaseModel):
     history: List[Message] = Field(default_factory=list)
@@ -33,6 +35,11 @@ class BrainMemory(BaseModel):
     cacheable: bool = True
     llm: Optional[BaseLLM] = Field(default=None, exclude=True)
 
+    # what `dumps` last wrote: history length, last history message, state but history, and history entries appended
+    _stored_history: tuple[int, Optional[Message]] = PrivateAttr(default=(0, None))
+    _stored_state: str = PrivateAttr(default="")
+    _stored_deltas: int = PrivateAttr(default=0)
+
     class Config:
         arbitrary_types_allowed = True
 
@@ -54,29 +61,75 @@ class BrainMemory(BaseModel):
         texts = [m.content for m in self.knowledge]
         return "\n".join(texts)
 
+    @staticmethod
+    def history_key(redis_key: str) -> str:
+        """Key of the list of history entries appended after the snapshot stored at `redis_key`"""
+        return f"{redis_key}:history"
+
     @staticmethod
     async def loads(redis_key: str) -> "BrainMemory":
         redis = Redis(config.redis)
         if not redis_key:
             return BrainMemory()
-        v = await redis.get(key=redis_key)
-        logger.debug(f"REDIS GET {redis_key} {v}")
+        rsp = await redis.execute(("get", redis_key), ("lrange", BrainMemory.history_key(redis_key), 0, -1))
+        v, deltas = rsp if rsp else (None, [])
+        v = redis.decode(v)
+        logger.debug(f"REDIS GET {redis_key} {v} + {len(deltas)} history entries")
         if v:
             bm = BrainMemory.parse_raw(v)
+            for i in deltas:
+                bm.history.append(Message.model_validate_json(redis.decode(i)))
+            if deltas:
+                bm.last_history_id = str(bm.history[-1].id)
             bm.is_dirty = False
+            bm._track(deltas=len(deltas))
             return bm
         return BrainMemory()
 
+    def _state(self) -> str:
+        return self.model_dump_json(exclude={"history", "is_dirty", "last_history_id"})
+
+    def _track(self, deltas: int = 0):
+        self._stored_history = (len(self.history), self.history[-1] if self.history else None)
+        self._stored_state = self._state()
+        self._stored_deltas = deltas
+
+    def _appended_history(self) -> Optional[List[Message]]:
+        """History appended since the last `dumps`, None if anything else was changed and a snapshot is due"""
+        length, last = self._stored_history
+        if not self._stored_state or len(self.history) < length or (length and self.history[length - 1] is not last):
+            return None
+        appended = self.history[length:]
+        if self._stored_deltas + len(appended) > max(DELTA_COMPACT_MIN, length):  # amortized full rewrites
+            return None
+        if self._state() != self._stored_state:
+            return None
+        return appended
+
     async def dumps(self, redis_key: str, timeout_sec: int = 30 * 60):
+        """Write the memory to `redis_key`, only the new history entries if nothing else changed since last time"""
         if not self.is_dirty:
             return
         redis = Redis(config.redis)
         if not redis_key:
             return False
-        v = self.model_dump_json()
         if self.cacheable:
-            await redis.set(key=redis_key, data=v, timeout_sec=timeout_sec)
-            logger.debug(f"REDIS SET {redis_key} {v}")
+            history_key = self.history_key(redis_key)
+            appended = self._appended_history()
+            if appended is None:
+                v = self.model_dump_json()
+                commands = [("set", redis_key, redis.encode(v)), ("delete", history_key)]
+                deltas = 0
+                logger.debug(f"REDIS SET {redis_key} {v}")
+            else:
+                commands = [("rpush", history_key, *[redis.encode(i.model_dump_json()) for i in appended])]
+                commands = commands if appended else []
+                deltas = self._stored_deltas + len(appended)
+                logger.debug(f"REDIS RPUSH {history_key} {len(appended)} history entries")
+            if timeout_sec:
+                commands += [("expire", redis_key, timeout_sec), ("expire", history_key, timeout_sec)]
+            if await redis.execute(*commands) is not None:
+                self._track(deltas=deltas)
         self.is_dirty = False
 
     @staticmethod
@@ -6,32 +6,214 @@
 @File    : memory.py
 @Modified By: mashenquan, 2023-11-1. According to RFC 116: Updated the type of index key.
 """
+import re
 from collections import defaultdict
-from typing import DefaultDict, Iterable, Set
+from typing import Any, ClassVar, DefaultDict, Iterable, Optional, Set
 
-from pydantic import BaseModel, Field, SerializeAsAny
+from pydantic import (
+    BaseModel,
+    Field,
+    PrivateAttr,
+    SerializeAsAny,
+    model_serializer,
+    model_validator,
+)
 
 from metagpt.const import IGNORED_MESSAGE_ID
 from metagpt.schema import Message
-from metagpt.utils.common import any_to_str, any_to_str_set
+from metagpt.utils.common import any_to_str, any_to_str_set, import_class
+from metagpt.utils.serialize import (
+    hoist_instruct_content_mappings,
+    inline_instruct_content_mappings,
+)
+
+TOKEN_PATTERN = re.compile(r"\w+")
 
 
 class Memory(BaseModel):
-    """The most basic memory: super-memory"""
+    """The most basic memory: super-memory
+
+    `storage` keeps the order and is what gets serialized. It is mirrored by an id-keyed ordered map and hash indexes on
+    `INDEXED_FIELDS`, so that adding, deduplicating, deleting and filtering messages don't scan the whole storage.
+    `delete` only unindexes the message and leaves a tombstone, `storage` and `index` are compacted by the next read of
+    them, or once half of the storage is deleted. `storage` changed behind the back of the memory, appended, replaced or
+    reordered, is indexed again on the next access.
+    Messages are deduplicated by id, or by value with `ignore_id`, rather than by deep equality as `storage` used to:
+    a message with the id of a stored one is not added, even if it differs otherwise.
+    With `index_content`, the words of the contents are indexed as well, for `get_by_content` and `try_remember`.
+    When serialized, the mappings of the messages' `instruct_content` are written once under `ic_mappings`, and
+    subclasses write their class under `__module_class_name`, which validation as `Memory` turns back into them.
+    """
+
+    INDEXED_FIELDS: ClassVar[tuple[str, ...]] = ("role", "cause_by", "sent_from", "send_to")
 
     storage: list[SerializeAsAny[Message]] = []
     index: DefaultDict[str, list[SerializeAsAny[Message]]] = Field(default_factory=lambda: defaultdict(list))
     ignore_id: bool = False
+    index_content: bool = False
+
+    _messages: dict[str, Message] = PrivateAttr(default_factory=dict)
+    _indexes: dict[str, DefaultDict[str, dict[str, Message]]] = PrivateAttr(default_factory=dict)
+    _indexed_count: int = PrivateAttr(default=0)  # len(storage) as of the last index update
+    _indexed_marker: tuple = PrivateAttr(default=())  # `_storage_marker()` as of the last index update
+    _content_index: dict[str, dict[str, Message]] = PrivateAttr(default_factory=dict)  # word -> messages
+    _content_seq: dict[str, int] = PrivateAttr(default_factory=dict)  # message key -> order of indexing
+    _indexed_seq: int = PrivateAttr(default=0)
+    _deleted: set[int] = PrivateAttr(default_factory=set)  # id() of the deleted messages still in storage
+
+    @model_serializer(mode="wrap")
+    def _serialize_memory(self, handler) -> dict[str, Any]:
+        self.compact()
+        data = handler(self)
+        mappings = {}
+        hoist_instruct_content_mappings(data.get("storage", []), mappings)
+        for messages in data.get("index", {}).values():
+            hoist_instruct_content_mappings(messages, mappings)
+        if mappings:
+            data["ic_mappings"] = mappings
+        if type(self) is not Memory:
+            data["__module_class_name"] = f"{type(self).__module__}.{type(self).__qualname__}"
+        return data
+
+    @model_validator(mode="wrap")
+    @classmethod
+    def _convert_to_real_type(cls, value: Any, handler):
+        if not isinstance(value, dict) or "__module_class_name" not in value:
+            return handler(value)
+        value = dict(value)
+        module_name, class_name = value.pop("__module_class_name").rsplit(".", 1)
+        memory_class = import_class(class_name, module_name)
+        if memory_class is cls or not issubclass(memory_class, cls):
+            return handler(value)
+        return memory_class.model_validate(value)
+
+    @model_validator(mode="before")
+    @classmethod
+    def _inline_ic_mappings(cls, data: Any) -> Any:
+        if isinstance(data, dict) and "ic_mappings" in data:
+            data = dict(data)
+            mappings = data.pop("ic_mappings")
+            data["storage"] = list(data.get("storage", []))
+            inline_instruct_content_mappings(data["storage"], mappings)
+            data["index"] = {k: list(v) for k, v in data.get("index", {}).items()}
+            for messages in data["index"].values():
+                inline_instruct_content_mappings(messages, mappings)
+        return data
+
+    def model_post_init(self, __context):
+        self._reindex()
+
+    def __eq__(self, other) -> bool:
+        # the private lookup structures are derived from `storage`, leave them out
+        if type(self) is not type(other):
+            return NotImplemented
+        self.compact()
+        other.compact()
+        return self.__dict__ == other.__dict__
+
+    def _key(self, message: Message) -> str:
+        if not self.ignore_id:
+            return message.id
+        # every message has the same id, identical messages are told apart by value instead
+        ic = message.instruct_content
+        return "\x00".join(
+            [
+                message.role,
+                message.cause_by,
+                message.sent_from,
+                repr(sorted(message.send_to)),
+                message.content,
+                ic.model_dump_json() if ic is not None else "",
+            ]
+        )
+
+    def _reindex(self):
+        """Rebuild the lookup structures from `storage`, messages of `index` are shared with `storage`"""
+        self._messages = {}
+        self._indexes = {name: defaultdict(dict) for name in self.INDEXED_FIELDS}
+        self._content_index = {}
+        self._content_seq = {}
+        self._deleted = set()
+        self.index = defaultdict(list, {k: [] for k in self.index})
+        for message in self.storage:
+            self._index_message(message)
+        self._indexed_count = len(self.storage)
+        self._indexed_marker = self._storage_marker()
+
+    def _storage_marker(self) -> tuple:
+        """Identity of `storage` and of its ends, which tells a list replaced or reordered even at the same length"""
+        storage = self.storage
+        return (id(storage), len(storage), id(storage[0]), id(storage[-1])) if storage else (id(storage), 0)
+
+    def _synced(self):
+        """Storage changed behind our back, e.g. appended or replaced by a subclass, or `index_content` was turned on"""
+        marker = self._storage_marker()
+        if marker != self._indexed_marker or (self.index_content and len(self._content_seq) != len(self._messages)):
+            self.compact()
+            self._reindex()
+
+    def compact(self):
+        """Drop the deleted messages from `storage` and `index`, which is needed before reading them directly"""
+        deleted = self._deleted
+        if not deleted or self._indexed_marker[:1] != (id(self.storage),):
+            return  # a list replaced behind our back is indexed as it is by `_synced`, tombstones and all dropped
+        in_sync = self._indexed_marker == self._storage_marker()  # or left for `_synced` to notice
+        n = self._indexed_count  # messages appended behind our back are not deleted ones
+        self.storage[:n] = [i for i in self.storage[:n] if id(i) not in deleted]
+        for messages in self.index.values():
+            messages[:] = [i for i in messages if id(i) not in deleted]
+        self._indexed_count = n - len(deleted)
+        deleted.clear()
+        if in_sync:
+            self._indexed_marker = self._storage_marker()
+
+    def _index_message(self, message: Message):
+        key = self._key(message)
+        self._messages[key] = message
+        indexes = self._indexes  # private attributes are slow to look up on pydantic models
+        for name in self.INDEXED_FIELDS:
+            value = getattr(message, name, None)
+            for i in value if isinstance(value, (set, list, tuple)) else [value]:
+                indexes[name][i][key] = message
+        if message.cause_by:
+            self.index[message.cause_by].append(message)
+        if self.index_content:
+            self._content_seq[key] = self._indexed_seq = self._indexed_seq + 1
+            content_index = self._content_index
+            for word in set(TOKEN_PATTERN.findall(message.content)):
+                content_index.setdefault(word, {})[key] = message
+
+    def _unindex_message(self, message: Message):
+        key = self._key(message)
+        message = self._messages.pop(key, message)
+        for name in self.INDEXED_FIELDS:
+            value = getattr(message, name, None)
+            for i in value if isinstance(value, (set, list, tuple)) else [value]:
+                self._indexes[name][i].pop(key, None)
+        if self._content_seq.pop(key, None) is not None:
+            for word in set(TOKEN_PATTERN.findall(message.content)):
+                messages = self._content_index.get(word, {})
+                messages.pop(key, None)
+                if not messages:
+                    self._content_index.pop(word, None)
+        return message
+
+    def __contains__(self, message: Message) -> bool:
+        self._synced()
+        return self._key(message) in self._messages
 
     def add(self, message: Message):
         """Add a new message to storage, while updating the index"""
         if self.ignore_id:
             message.id = IGNORED_MESSAGE_ID
-        if message in self.storage:
+        if message in self:
             return
+        if id(message) in self._deleted:  # added again before the storage is compacted
+            self.compact()
         self.storage.append(message)
-        if message.cause_by:
-            self.index[message.cause_by].append(message)
+        self._index_message(message)
+        self._indexed_count += 1
+        self._indexed_marker = self._storage_marker()
 
     def add_batch(self, messages: Iterable[Message]):
         for message in messages:
@@ -39,18 +221,76 @@ class Memory(BaseModel):
 
     def get_by_role(self, role: str) -> list[Message]:
         """Return all messages of a specified role"""
-        return [message for message in self.storage if message.role == role]
+        return self.filter(role=role)
+
+    def filter(
+        self,
+        role: Optional[str] = None,
+        cause_by: Optional[str] = None,
+        sent_from: Optional[str] = None,
+        send_to: Optional[str] = None,
+    ) -> list[Message]:
+        """Return the messages matching all given fields in storage order, `send_to` matches one of the recipients"""
+        self._synced()
+        conditions = {"role": role, "cause_by": cause_by, "sent_from": sent_from, "send_to": send_to}
+        matches = [self._indexes[k].get(any_to_str(v), {}) for k, v in conditions.items() if v is not None]
+        if not matches:
+            self.compact()
+            return list(self.storage)
+        smallest, *others = sorted(matches, key=len)
+        return [msg for key, msg in smallest.items() if all(key in i for i in others)]
 
     def get_by_content(self, content: str) -> list[Message]:
         """Return all messages containing a specified content"""
-        return [message for message in self.storage if content in message.content]
+        self._synced()
+        candidates = self._content_candidates(content) if self.index_content else None
+        if candidates is None:
+            self.compact()
+            candidates = self.storage
+        return [message for message in candidates if content in message.content]
+
+    def _content_candidates(self, content: str) -> Optional[list[Message]]:
+        """Messages that may contain `content` according to the word index, None if the index can't tell.
+
+        A word of `content` surrounded by other characters must be a whole word of the message, this exact lookup is
+        the fast path and the rarest such word bounds the candidates. Only if there is none, the words at the edges of
+        `content`, which may be part of longer words of the message, are matched against the vocabulary.
+        """
+        words = list(TOKEN_PATTERN.finditer(content))
+        if not words:
+            return None
+        whole = [i.group() for i in words if i.start() > 0 and i.end() < len(content)]
+        if whole:
+            postings = sorted((self._content_index.get(i, {}) for i in whole), key=len)
+            rarest, *others = postings
+            return [msg for key, msg in rarest.items() if all(key in i for i in others)]
+
+        candidates = None
+        for match in words:
+            word, left_open, right_open = match.group(), match.start() == 0, match.end() == len(content)
+            if left_open and right_open:
+                vocabulary = [i for i in self._content_index if word in i]
+            elif left_open:
+                vocabulary = [i for i in self._content_index if i.endswith(word)]
+            else:
+                vocabulary = [i for i in self._content_index if i.startswith(word)]
+            found = {}
+            for i in vocabulary:
+                found.update(self._content_index[i])
+            candidates = found if candidates is None else {k: v for k, v in found.items() if k in candidates}
+        return [candidates[k] for k in sorted(candidates, key=self._content_seq.__getitem__)]
 
     def delete_newest(self) -> "Message":
         """delete the newest message from the storage"""
+        self._synced()
+        self.compact()
         if len(self.storage) > 0:
             newest_msg = self.storage.pop()
-            if newest_msg.cause_by and newest_msg in self.index[newest_msg.cause_by]:
-                self.index[newest_msg.cause_by].remove(newest_msg)
+            self._unindex_message(newest_msg)
+            if newest_msg.cause_by:
+                _remove_by_identity(self.index[newest_msg.cause_by], newest_msg)
+            self._indexed_count -= 1
+            self._indexed_marker = self._storage_marker()
         else:
             newest_msg = None
         return newest_msg
@@ -59,48 +299,66 @@ class Memory(BaseModel):
         """Delete the specified message from storage, while updating the index"""
         if self.ignore_id:
             message.id = IGNORED_MESSAGE_ID
-        self.storage.remove(message)
-        if message.cause_by and message in self.index[message.cause_by]:
-            self.index[message.cause_by].remove(message)
+        if message not in self:
+            raise ValueError(f"Message {message.id} not in memory")
+        self._deleted.add(id(self._unindex_message(message)))
+        if len(self._deleted) > len(self.storage) // 2:
+            self.compact()
 
     def clear(self):
         """Clear storage and index"""
         self.storage = []
         self.index = defaultdict(list)
+        self._reindex()
 
     def count(self) -> int:
         """Return the number of messages in storage"""
-        return len(self.storage)
+        self._synced()
+        return len(self.storage) - len(self._deleted)
 
     def try_remember(self, keyword: str) -> list[Message]:
         """Try to recall all messages containing a specified keyword"""
-        return [message for message in self.storage if keyword in message.content]
+        return self.get_by_content(keyword)
 
     def get(self, k=0) -> list[Message]:
         """Return the most recent k memories, return all when k=0"""
+        self.compact()
         return self.storage[-k:]
 
+    def get_history(self) -> list[Message]:
+        """The messages handed to actions as the conversation history, all of them"""
+        return self.get()
+
     def find_news(self, observed: list[Message], k=0) -> list[Message]:
         """find news (previously unseen messages) from the the most recent k memories, from all memories when k=0"""
-        already_observed = self.get(k)
-        news: list[Message] = []
-        for i in observed:
-            if i in already_observed:
-                continue
-            news.append(i)
-        return news
+        if k:
+            already_observed = {self._key(i) for i in self.get(k)}
+            return [i for i in observed if self._key(i) not in already_observed]
+        return [i for i in observed if i not in self]
 
     def get_by_action(self, action) -> list[Message]:
         """Return all messages triggered by a specified Action"""
         index = any_to_str(action)
+        self._synced()
+        self.compact()
         return self.index[index]
 
     def get_by_actions(self, actions: Set) -> list[Message]:
         """Return all messages triggered by specified Actions"""
         rsp = []
         indices = any_to_str_set(actions)
+        self._synced()
+        self.compact()
         for action in indices:
             if action not in self.index:
                 continue
             rsp += self.index[action]
         return rsp
+
+
+def _remove_by_identity(messages: list[Message], message: Message):
+    """`list.remove` compares by deep equality, look for the very object instead, recent ones first"""
+    for i in range(len(messages) - 1, -1, -1):
+        if messages[i] is message:
+            del messages[i]
+            return
@@ -0,0 +1,209 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+@Desc   : Memory keeping a window of recent messages in RAM and the older ones in SQLite
+"""
+import json
+import sqlite3
+from functools import lru_cache
+from pathlib import Path
+from typing import Any, Iterable, Optional, Set
+
+from pydantic import ConfigDict, PrivateAttr, model_serializer
+
+from metagpt.const import IGNORED_MESSAGE_ID
+from metagpt.memory.memory import Memory
+from metagpt.schema import Message
+from metagpt.utils.common import any_to_str, any_to_str_set, import_class
+from metagpt.utils.serialize import hoist_instruct_content_mappings
+
+COLD_SCHEMA = """
+CREATE TABLE IF NOT EXISTS messages (
+    seq INTEGER PRIMARY KEY AUTOINCREMENT,
+    key TEXT UNIQUE NOT NULL,
+    role TEXT NOT NULL,
+    cause_by TEXT NOT NULL,
+    content TEXT NOT NULL,
+    cls TEXT NOT NULL,
+    data TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_messages_role ON messages(role);
+CREATE INDEX IF NOT EXISTS idx_messages_cause_by ON messages(cause_by);
+"""
+
+
+class TieredMemory(Memory):
+    """Memory whose `storage` only holds the most recent `hot_size` messages.
+
+    Older messages are moved in batches to a SQLite database at `cold_path`, an anonymous temporary file by default, and
+    read back transparently by `get`, `get_by_role`, `get_by_action(s)`, `get_by_content`, `try_remember`, `count`,
+    `delete` and membership tests. `filter`, `index` and `get_history`, which roles hand to their actions, only cover
+    the hot messages. Without `cold_path` the cold messages are serialized along with the hot ones, and spilled again
+    once loaded.
+    """
+
+    model_config = ConfigDict(arbitrary_types_allowed=True)
+
+    hot_size: int = 1000
+    cold_path: Optional[Path] = None
+
+    _cold: Optional[sqlite3.Connection] = PrivateAttr(default=None)
+
+    def model_post_init(self, __context):
+        super().model_post_init(__context)
+        if super().count() > self.hot_size:
+            self._spill(super().count() - self.hot_size)
+
+    @model_serializer(mode="wrap")
+    def _serialize_memory(self, handler) -> dict[str, Any]:
+        data = super()._serialize_memory(handler)
+        if self.cold_path or not self.has_cold:
+            return data  # persisted by the database itself
+        cold = [json.loads(i) for (i,) in self.cold.execute("SELECT data FROM messages ORDER BY seq")]
+        mappings = data.pop("ic_mappings", {})
+        hoist_instruct_content_mappings(cold, mappings)
+        if mappings:
+            data["ic_mappings"] = mappings
+        data["storage"] = cold + data.get("storage", [])
+        return data
+
+    @property
+    def cold(self) -> sqlite3.Connection:
+        if self._cold is None:
+            if self.cold_path:
+                Path(self.cold_path).parent.mkdir(parents=True, exist_ok=True)
+            self._cold = sqlite3.connect(str(self.cold_path or ""), check_same_thread=False)
+            self._cold.execute("PRAGMA journal_mode=WAL")
+            self._cold.execute("PRAGMA synchronous=NORMAL")
+            self._cold.executescript(COLD_SCHEMA)
+        return self._cold
+
+    def close(self):
+        if self._cold is not None:
+            self._cold.close()
+            self._cold = None
+
+    @property
+    def has_cold(self) -> bool:
+        return self._cold is not None or bool(self.cold_path)
+
+    def __contains__(self, message: Message) -> bool:
+        if super().__contains__(message):
+            return True
+        if not self.has_cold:
+            return False
+        return self.cold.execute("SELECT 1 FROM messages WHERE key = ?", (self._key(message),)).fetchone() is not None
+
+    def add(self, message: Message):
+        super().add(message)
+        if super().count() > self.hot_size:
+            self._spill(super().count() - self.hot_size + self.hot_size // 10)
+
+    def _spill(self, n: int):
+        """Move the oldest `n` hot messages to the cold store in one transaction"""
+        self.compact()
+        spilled = self.storage[:n]
+        rows = [(self._key(i), i.role, i.cause_by, i.content, any_to_str(i), i.model_dump_json()) for i in spilled]
+        with self.cold:
+            self.cold.executemany(
+                "INSERT INTO messages (key, role, cause_by, content, cls, data) VALUES (?, ?, ?, ?, ?, ?)", rows
+            )
+        self.storage = self.storage[n:]
+        self._reindex()
+
+    def _cold_query(self, sql: str, params: Iterable = ()) -> list[Message]:
+        if not self.has_cold:
+            return []  # nothing spilled yet
+        return [_load_message(cls, data) for cls, data in self.cold.execute(sql, tuple(params))]
+
+    def _cold_count(self) -> int:
+        if not self.has_cold:
+            return 0
+        return self.cold.execute("SELECT COUNT(*) FROM messages").fetchone()[0]
+
+    def count(self) -> int:
+        return self._cold_count() + super().count()
+
+    def get(self, k=0) -> list[Message]:
+        self.compact()
+        if k and k <= len(self.storage):
+            return super().get(k)
+        if not k:
+            cold = self._cold_query("SELECT cls, data FROM messages ORDER BY seq")
+        else:
+            cold = self._cold_query(
+                "SELECT cls, data FROM (SELECT cls, data, seq FROM messages ORDER BY seq DESC LIMIT ?) ORDER BY seq",
+                (k - len(self.storage),),
+            )
+        return cold + self.storage
+
+    def get_history(self) -> list[Message]:
+        """Only the hot messages, the whole cold store is not read back on every action"""
+        self.compact()
+        return list(self.storage)
+
+    def get_by_role(self, role: str) -> list[Message]:
+        cold = self._cold_query("SELECT cls, data FROM messages WHERE role = ? ORDER BY seq", (role,))
+        return cold + super().get_by_role(role)
+
+    def get_by_content(self, content: str) -> list[Message]:
+        cold = self._cold_query("SELECT cls, data FROM messages WHERE instr(content, ?) > 0 ORDER BY seq", (content,))
+        return cold + super().get_by_content(content)
+
+    def get_by_action(self, action) -> list[Message]:
+        cause_by = any_to_str(action)
+        cold = self._cold_query("SELECT cls, data FROM messages WHERE cause_by = ? ORDER BY seq", (cause_by,))
+        return cold + super().get_by_action(action)
+
+    def get_by_actions(self, actions: Set) -> list[Message]:
+        rsp = []
+        self.compact()
+        for action in any_to_str_set(actions):
+            rsp += self._cold_query("SELECT cls, data FROM messages WHERE cause_by = ? ORDER BY seq", (action,))
+            rsp += self.index.get(action, [])
+        return rsp
+
+    def delete_newest(self) -> Optional[Message]:
+        self.compact()
+        if self.storage:
+            return super().delete_newest()
+        newest = self._cold_query("SELECT cls, data FROM messages ORDER BY seq DESC LIMIT 1")
+        if not newest:
+            return None
+        self._cold_delete(newest[0])
+        return newest[0]
+
+    def delete(self, message: Message):
+        if self.ignore_id:
+            message.id = IGNORED_MESSAGE_ID
+        if super().__contains__(message):
+            return super().delete(message)
+        if message not in self:
+            raise ValueError(f"Message {message.id} not in memory")
+        self._cold_delete(message)
+
+    def _cold_delete(self, message: Message):
+        with self.cold:
+            self.cold.execute("DELETE FROM messages WHERE key = ?", (self._key(message),))
+
+    def clear(self):
+        super().clear()
+        if self.has_cold:
+            with self.cold:
+                self.cold.execute("DELETE FROM messages")
+
+
+@lru_cache(maxsize=None)
+def _message_class(name: str) -> type[Message]:
+    module_name, _, class_name = name.rpartition(".")
+    return import_class(class_name, module_name)
+
+
+def _load_message(class_name: str, data: str) -> Message:
+    """Load a cold message as the class it was stored as, e.g. `UserMessage`"""
+    message = Message.model_validate_json(data)
+    cls = _message_class(class_name)
+    if cls is Message:
+        return message
+    # the subclasses only preset fields in an `__init__` that validation can't call
+    return cls.model_construct(_fields_set=message.model_fields_set, **dict(message))
@@ -4,34 +4,31 @@
 @Time    : 2023/5/5 22:59
 @Author  : alexanderwu
 @File    : __init__.py
+@Desc    : Providers are imported on first access, so that only the SDKs of the configured providers are loaded.
 """
+from importlib import import_module
 
-from metagpt.provider.google_gemini_api import GeminiLLM
-from metagpt.provider.ollama_api import OllamaLLM
-from metagpt.provider.openai_api import OpenAILLM
-from metagpt.provider.zhipuai_api import ZhiPuAILLM
-from metagpt.provider.azure_openai_api import AzureOpenAILLM
-from metagpt.provider.metagpt_api import MetaGPTLLM
-from metagpt.provider.human_provider import HumanProvider
-from metagpt.provider.spark_api import SparkLLM
-from metagpt.provider.qianfan_api import QianFanLLM
-from metagpt.provider.dashscope_api import DashScopeLLM
-from metagpt.provider.anthropic_api import AnthropicLLM
-from metagpt.provider.bedrock_api import BedrockLLM
-from metagpt.provider.ark_api import ArkLLM
+_PROVIDER_MODULES = {
+    "GeminiLLM": "metagpt.provider.google_gemini_api",
+    "OpenAILLM": "metagpt.provider.openai_api",
+    "ZhiPuAILLM": "metagpt.provider.zhipuai_api",
+    "AzureOpenAILLM": "metagpt.provider.azure_openai_api",
+    "MetaGPTLLM": "metagpt.provider.metagpt_api",
+    "OllamaLLM": "metagpt.provider.ollama_api",
+    "HumanProvider": "metagpt.provider.human_provider",
+    "SparkLLM": "metagpt.provider.spark_api",
+    "QianFanLLM": "metagpt.provider.qianfan_api",
+    "DashScopeLLM": "metagpt.provider.dashscope_api",
+    "AnthropicLLM": "metagpt.provider.anthropic_api",
+    "BedrockLLM": "metagpt.provider.bedrock_api",
+    "ArkLLM": "metagpt.provider.ark_api",
+    "RouterLLM": "metagpt.provider.router_api",
+}
 
-__all__ = [
-    "GeminiLLM",
-    "OpenAILLM",
-    "ZhiPuAILLM",
-    "AzureOpenAILLM",
-    "MetaGPTLLM",
-    "OllamaLLM",
-    "HumanProvider",
-    "SparkLLM",
-    "QianFanLLM",
-    "DashScopeLLM",
-    "AnthropicLLM",
-    "BedrockLLM",
-    "ArkLLM",
-]
+__all__ = list(_PROVIDER_MODULES)
+
+
+def __getattr__(name):
+    if name not in _PROVIDER_MODULES:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    return getattr(import_module(_PROVIDER_MODULES[name]), name)
@@ -8,6 +8,7 @@ from metagpt.configs.llm_config import LLMConfig, LLMType
 from metagpt.const import USE_CONFIG_TIMEOUT
 from metagpt.logs import log_llm_stream
 from metagpt.provider.base_llm import BaseLLM
+from metagpt.provider.llm_client_registry import LLM_CLIENT_REGISTRY
 from metagpt.provider.llm_provider_registry import register_provider
 
 
@@ -19,7 +20,21 @@ class AnthropicLLM(BaseLLM):
 
     def __init_anthropic(self):
         self.model = self.config.model
-        self.aclient: AsyncAnthropic = AsyncAnthropic(api_key=self.config.api_key, base_url=self.config.base_url)
+        self._aclient = None
+
+    @property
+    def aclient(self) -> AsyncAnthropic:
+        if self._aclient is not None:
+            return self._aclient
+        return LLM_CLIENT_REGISTRY.get_client(
+            self.config,
+            lambda: AsyncAnthropic(api_key=self.config.api_key, base_url=self.config.base_url),
+            namespace=self.__class__.__name__,
+        )
+
+    @aclient.setter
+    def aclient(self, client: AsyncAnthropic):
+        self._aclient = client
 
     def _const_kwargs(self, messages: list[dict], stream: bool = False) -> dict:
         kwargs = {
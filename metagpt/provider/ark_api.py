@@ -1,3 +1,5 @@
+from typing import AsyncIterator
+
 from openai import AsyncStream
 from openai.types import CompletionUsage
 from openai.types.chat import ChatCompletion, ChatCompletionChunk
@@ -17,25 +19,34 @@ class ArkLLM(OpenAILLM):
     """
 
     async def _achat_completion_stream(self, messages: list[dict], timeout=USE_CONFIG_TIMEOUT) -> str:
+        return "".join([chunk async for chunk in self._achat_completion_iter(messages, timeout=timeout)])
+
+    async def _achat_completion_iter(self, messages: list[dict], timeout=USE_CONFIG_TIMEOUT) -> AsyncIterator[str]:
         response: AsyncStream[ChatCompletionChunk] = await self.aclient.chat.completions.create(
             **self._cons_kwargs(messages, timeout=self.get_timeout(timeout)),
             stream=True,
             extra_body={"stream_options": {"include_usage": True}}  # 只有增加这个参数才会在流式时最后返回usage
         )
         usage = None
+        model = None
         collected_messages = []
-        async for chunk in response:
-            chunk_message = chunk.choices[0].delta.content or "" if chunk.choices else ""  # extract the message
-            log_llm_stream(chunk_message)
-            collected_messages.append(chunk_message)
-            if chunk.usage:
-                # 火山方舟的流式调用会在最后一个chunk中返回usage,最后一个chunk的choices为[]
-                usage = CompletionUsage(**chunk.usage)
-
-        log_llm_stream("\n")
-        full_reply_content = "".join(collected_messages)
-        self._update_costs(usage, chunk.model)
-        return full_reply_content
+        try:
+            async for chunk in response:
+                chunk_message = chunk.choices[0].delta.content or "" if chunk.choices else ""  # extract the message
+                log_llm_stream(chunk_message)
+                collected_messages.append(chunk_message)
+                model = chunk.model
+                if chunk.usage:
+                    # 火山方舟的流式调用会在最后一个chunk中返回usage,最后一个chunk的choices为[]
+                    usage = chunk.usage if isinstance(chunk.usage, CompletionUsage) else CompletionUsage(**chunk.usage)
+                yield chunk_message
+        finally:
+            # also reached when the reader stops early, before the last chunk carrying the usage
+            await response.close()
+            log_llm_stream("\n")
+            if not usage:
+                usage = self._calc_usage(messages, "".join(collected_messages))
+            self._update_costs(usage, model)
 
     async def _achat_completion(self, messages: list[dict], timeout=USE_CONFIG_TIMEOUT) -> ChatCompletion:
         kwargs = self._cons_kwargs(messages, timeout=self.get_timeout(timeout))
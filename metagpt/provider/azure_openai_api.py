@@ -20,12 +20,10 @@ class AzureOpenAILLM(OpenAILLM):
     Check https://platform.openai.com/examples for examples
     """
 
-    def _init_client(self):
+    def _create_client(self) -> AsyncAzureOpenAI:
         kwargs = self._make_client_kwargs()
         # https://learn.microsoft.com/zh-cn/azure/ai-services/openai/how-to/migration?tabs=python-new%2Cdalle-fix
-        self.aclient = AsyncAzureOpenAI(**kwargs)
-        self.model = self.config.model  # Used in _calc_usage & _cons_kwargs
-        self.pricing_plan = self.config.pricing_plan or self.model
+        return AsyncAzureOpenAI(**kwargs)
 
     def _make_client_kwargs(self) -> dict:
         kwargs = dict(
@@ -8,26 +8,48 @@
 """
 from __future__ import annotations
 
+import asyncio
 import json
 from abc import ABC, abstractmethod
-from typing import Optional, Union
+from contextvars import ContextVar
+from functools import partial
+from typing import AsyncIterator, Awaitable, Callable, Optional, TypeVar, Union
 
 from openai import AsyncOpenAI
 from pydantic import BaseModel
 from tenacity import (
+    AsyncRetrying,
     after_log,
     retry,
+    retry_if_exception,
     retry_if_exception_type,
     stop_after_attempt,
     wait_random_exponential,
 )
 
 from metagpt.configs.llm_config import LLMConfig
-from metagpt.const import LLM_API_TIMEOUT, USE_CONFIG_TIMEOUT
-from metagpt.logs import logger
+from metagpt.const import LLM_API_TIMEOUT, LLM_RESPONSE_CACHE_PATH, USE_CONFIG_TIMEOUT
+from metagpt.logs import log_llm_stream, logger
+from metagpt.provider.llm_client_registry import LLM_CLIENT_REGISTRY
+from metagpt.provider.llm_stream import ChunkChannel, LLMStream
+from metagpt.provider.rate_limiter import (
+    LIMITER_KEY_FIELDS,
+    LLMRateLimiter,
+    get_retry_after,
+    is_rate_limit_error,
+    report_usage,
+)
 from metagpt.schema import Message
 from metagpt.utils.common import log_and_reraise
 from metagpt.utils.cost_manager import CostManager, Costs
+from metagpt.utils.response_cache import ResponseCache, get_response_cache
+from metagpt.utils.single_flight import SingleFlight
+
+T = TypeVar("T")
+
+# The costs charged while running a request shared by `single_flight`, as (prompt_tokens, completion_tokens, model),
+# so that the callers joining it are charged as well
+_flight_costs: ContextVar[Optional[list[tuple[int, int, str]]]] = ContextVar("flight_costs", default=None)
 
 
 class BaseLLM(ABC):
@@ -36,6 +58,7 @@ class BaseLLM(ABC):
     config: LLMConfig
     use_system_prompt: bool = True
     system_prompt = "You are a helpful assistant."
+    stream_by_aask: bool = False  # `aask_stream` returns the reply of `aask` as one chunk, for providers overriding it
 
     # OpenAI / Azure / Others
     aclient: Optional[Union[AsyncOpenAI]] = None
@@ -112,11 +135,15 @@ class BaseLLM(ABC):
         model = model or self.pricing_plan
         model = model or self.model
         usage = usage.model_dump() if isinstance(usage, BaseModel) else usage
+        if usage:
+            report_usage(int(usage.get("prompt_tokens") or 0) + int(usage.get("completion_tokens") or 0))
         if calc_usage and self.cost_manager and usage:
             try:
                 prompt_tokens = int(usage.get("prompt_tokens", 0))
                 completion_tokens = int(usage.get("completion_tokens", 0))
                 self.cost_manager.update_cost(prompt_tokens, completion_tokens, model)
+                if (flight_costs := _flight_costs.get()) is not None:
+                    flight_costs.append((prompt_tokens, completion_tokens, model))
             except Exception as e:
                 logger.error(f"{self.__class__.__name__} updates costs failed! exp: {e}")
 
@@ -125,6 +152,218 @@ class BaseLLM(ABC):
             return Costs(0, 0, 0, 0)
         return self.cost_manager.get_costs()
 
+    @property
+    def response_cache(self) -> Optional[ResponseCache]:
+        """The persistent response cache, only if `LLMConfig.response_cache` is enabled"""
+        if not self.config.response_cache:
+            return None
+        return get_response_cache(
+            self.config.response_cache_path or str(LLM_RESPONSE_CACHE_PATH),
+            self.config.response_cache_max_entries,
+            self.config.response_cache_ttl,
+        )
+
+    def _response_cache_key(self, messages: list[dict], tools: Optional[list] = None, **kwargs) -> str:
+        return ResponseCache.make_key(
+            self.model or self.config.model, messages, self.config.temperature, tools, **kwargs
+        )
+
+    async def _acompletion_text_with_cache(
+        self, messages: list[dict], stream: bool = False, timeout: int = USE_CONFIG_TIMEOUT
+    ) -> str:
+        """`acompletion_text` served by the response cache or an identical in-flight request if possible"""
+        cache = self.response_cache
+        key = self._response_cache_key(messages)
+        if cache is not None and (rsp := await cache.aget(key)) is not None:
+            logger.debug(f"llm response cache hit: {key}")
+            if stream:
+                log_llm_stream(rsp)
+                log_llm_stream("\n")
+            return rsp
+
+        completion = partial(self.acompletion_text, messages, stream=stream, timeout=timeout)
+        request = partial(self._arequest_with_limit, messages, completion)
+        flights = self.single_flight
+        if flights is None:
+            rsp = await request()
+        else:
+            (rsp, costs, cost_manager), shared = await flights.do((key, stream), self._flight(request))
+            if shared:
+                self._charge_shared(costs, cost_manager)
+            if shared and stream:
+                # the chunks were printed by the request we joined
+                log_llm_stream(rsp)
+                log_llm_stream("\n")
+        if cache is not None:
+            await cache.aset(key, rsp)
+        return rsp
+
+    async def _acompletion_chunks_with_cache(
+        self, messages: list[dict], timeout: int = USE_CONFIG_TIMEOUT, stop: Optional[str] = None
+    ) -> AsyncIterator[str]:
+        """Streaming counterpart of `_acompletion_text_with_cache`.
+
+        The caller starting the request reads it chunk by chunk, an identical request already in flight is shared as one
+        chunk once complete. A reply closed early after `stop` is cached under a key of its own, which only serves
+        streams with the same `stop`.
+        """
+        if not self.config.stream:
+            yield await self._acompletion_text_with_cache(messages, stream=False, timeout=timeout)
+            return
+
+        cache = self.response_cache
+        key = self._response_cache_key(messages)
+        stop_key = self._response_cache_key(messages, stop=stop) if stop else None
+        if cache is not None:
+            rsp = await cache.aget(key)
+            if rsp is None and stop_key:
+                rsp = await cache.aget(stop_key)
+            if rsp is not None:
+                logger.debug(f"llm response cache hit: {key}")
+                log_llm_stream(rsp)
+                log_llm_stream("\n")
+                yield rsp
+                return
+
+        channel = ChunkChannel()
+        request = self._flight(partial(self._astream_reply, messages, key, channel, timeout))
+        flights = self.single_flight
+        if flights is None:
+            task, shared = asyncio.ensure_future(request()), False
+        else:
+            task, shared = flights.join((key, True), request)
+        if shared:
+            try:
+                rsp, costs, cost_manager = await asyncio.shield(task)
+            finally:
+                flights.leave(task)
+            self._charge_shared(costs, cost_manager)
+            log_llm_stream(rsp)
+            log_llm_stream("\n")
+            yield rsp
+            return
+
+        task.add_done_callback(lambda _: channel.close())
+        chunks = []
+        try:
+            while (chunk := await channel.get()) is not None:
+                chunks.append(chunk)
+                yield chunk
+            task.result()
+        finally:
+            channel.detach()
+            if flights is not None:
+                release = flights.leave(task)  # cancels the request if we were the last to wait for it
+            else:
+                release = task.cancel()
+            if release:
+                # closed early and nobody else waits for the reply
+                await asyncio.wait([task])
+                limiter = self.rate_limiter
+                if limiter and chunks:
+                    limiter.on_success()
+                text = "".join(chunks)
+                if cache is not None and stop_key and (idx := text.find(stop)) >= 0:
+                    await cache.aset(stop_key, text[: idx + len(stop)])
+
+    async def _astream_reply(self, messages: list[dict], key: str, channel: ChunkChannel, timeout: int) -> str:
+        """Read the reply into `channel` as it asks for the chunks, and cache the whole of it.
+
+        As `acompletion_text`, the request is retried on 429 and on connection errors, as long as no chunk was read.
+        """
+        chunks = []
+
+        async def read() -> str:
+            chunk_iter = self._achat_completion_iter(messages, timeout=timeout)
+            try:
+                while True:
+                    await channel.wanted()
+                    try:
+                        chunk = await chunk_iter.__anext__()
+                    except StopAsyncIteration:
+                        break
+                    chunks.append(chunk)
+                    channel.put(chunk)
+            finally:
+                await chunk_iter.aclose()  # release the request now if the task is cancelled
+            return "".join(chunks)
+
+        retrying = AsyncRetrying(
+            stop=stop_after_attempt(3),
+            wait=wait_random_exponential(min=1, max=60),
+            after=after_log(logger, logger.level("WARNING").name),
+            retry=retry_if_exception(lambda e: isinstance(e, ConnectionError) and not chunks),
+            retry_error_callback=log_and_reraise,
+        )
+        rsp = await retrying(self._arequest_with_limit, messages, read)
+        cache = self.response_cache
+        if cache is not None:
+            await cache.aset(key, rsp)
+        return rsp
+
+    def _flight(self, request: Callable[[], Awaitable[T]]) -> Callable[[], Awaitable[tuple[T, list, CostManager]]]:
+        """Wrap `request` to return its result along with the costs it charged and the cost manager charged"""
+
+        async def run():
+            costs = []
+            _flight_costs.set(costs)  # the flight runs in a task of its own, with a copy of the context
+            return await request(), costs, self.cost_manager
+
+        return run
+
+    def _charge_shared(self, costs: list[tuple[int, int, str]], cost_manager: Optional[CostManager]):
+        """Charge the costs of a request joined from another caller, unless they went to the same cost manager"""
+        if not self.config.calc_usage or self.cost_manager is None or self.cost_manager is cost_manager:
+            return
+        for prompt_tokens, completion_tokens, model in costs:
+            self.cost_manager.update_cost(prompt_tokens, completion_tokens, model)
+
+    @property
+    def single_flight(self) -> Optional[SingleFlight]:
+        """In-flight requests shared by the endpoint; sampling with temperature > 0 expects distinct responses"""
+        if not self.config.coalesce_requests or self.config.temperature:
+            return None
+        return LLM_CLIENT_REGISTRY.get_client(self.config, SingleFlight, namespace=SingleFlight.__name__)
+
+    @property
+    def rate_limiter(self) -> Optional[LLMRateLimiter]:
+        """The limiter shared by the endpoint and model, only if any of rpm/tpm/max_concurrency is configured"""
+        if not (self.config.rpm or self.config.tpm or self.config.max_concurrency):
+            return None
+        return LLM_CLIENT_REGISTRY.get_client(
+            self.config,
+            lambda: LLMRateLimiter.from_config(self.config),
+            namespace=LLMRateLimiter.__name__,
+            extra_fields=LIMITER_KEY_FIELDS,
+        )
+
+    def _estimate_tokens(self, messages: list[dict]) -> int:
+        """A cheap upper-bound guess (~4 chars per token plus the completion budget), reconciled after the call"""
+        contents = [
+            msg.get("content", "") if isinstance(msg, dict) else getattr(msg, "content", msg) for msg in messages
+        ]
+        return sum(len(str(i)) for i in contents) // 4 + self.config.max_token
+
+    async def _arequest_with_limit(self, messages: list[dict], request: Callable[[], Awaitable[T]]) -> T:
+        """Run `request` once admitted by the rate limiter of the endpoint, retry it on 429 with a shared backoff"""
+        limiter = self.rate_limiter
+        if limiter is None:
+            return await request()
+
+        estimated_tokens = self._estimate_tokens(messages)
+        for attempt in range(limiter.max_retries + 1):
+            async with limiter.acquire(estimated_tokens) as slot:
+                try:
+                    rsp = await request()
+                except Exception as e:
+                    if not is_rate_limit_error(e) or attempt >= limiter.max_retries:
+                        raise
+                    slot.actual_tokens = 0
+                    limiter.on_rate_limited(get_retry_after(e))
+                    continue
+            limiter.on_success()
+            return rsp
+
     async def aask(
         self,
         msg: Union[str, list[dict[str, str]]],
@@ -134,6 +373,46 @@ class BaseLLM(ABC):
         timeout=USE_CONFIG_TIMEOUT,
         stream=None,
     ) -> str:
+        message = self._build_messages(msg, system_msgs, format_msgs, images)
+        if stream is None:
+            stream = self.config.stream
+        logger.debug(message)
+        rsp = await self._acompletion_text_with_cache(message, stream=stream, timeout=self.get_timeout(timeout))
+        return rsp
+
+    def aask_stream(
+        self,
+        msg: Union[str, list[dict[str, str]]],
+        system_msgs: Optional[list[str]] = None,
+        format_msgs: Optional[list[dict[str, str]]] = None,
+        images: Optional[Union[str, list[str]]] = None,
+        timeout=USE_CONFIG_TIMEOUT,
+        stop: Optional[str] = None,
+    ) -> LLMStream:
+        """Same as `aask`, but return the reply as an async iterator of text chunks, closed early once `stop` arrives.
+
+        If `LLMConfig.stream` is off, or the provider sets `stream_by_aask` as a human does, the whole reply is
+        returned as one chunk.
+        """
+        if self.stream_by_aask:
+            return LLMStream(
+                self._aask_chunks(msg, system_msgs, format_msgs, images=images, timeout=timeout), stop=stop
+            )
+        message = self._build_messages(msg, system_msgs, format_msgs, images)
+        logger.debug(message)
+        chunks = self._acompletion_chunks_with_cache(message, timeout=self.get_timeout(timeout), stop=stop)
+        return LLMStream(chunks, stop=stop)
+
+    async def _aask_chunks(self, *args, **kwargs) -> AsyncIterator[str]:
+        yield await self.aask(*args, **kwargs)
+
+    def _build_messages(
+        self,
+        msg: Union[str, list[dict[str, str]]],
+        system_msgs: Optional[list[str]] = None,
+        format_msgs: Optional[list[dict[str, str]]] = None,
+        images: Optional[Union[str, list[str]]] = None,
+    ) -> list[dict]:
         if system_msgs:
             message = self._system_msgs(system_msgs)
         else:
@@ -146,11 +425,7 @@ class BaseLLM(ABC):
             message.append(self._user_msg(msg, images=images))
         else:
             message.extend(msg)
-        if stream is None:
-            stream = self.config.stream
-        logger.debug(message)
-        rsp = await self.acompletion_text(message, stream=stream, timeout=self.get_timeout(timeout))
-        return rsp
+        return message
 
     def _extract_assistant_rsp(self, context):
         return "\n".join([i["content"] for i in context if i["role"] == "assistant"])
@@ -161,10 +436,37 @@ class BaseLLM(ABC):
         for msg in msgs:
             umsg = self._user_msg(msg)
             context.append(umsg)
-            rsp_text = await self.acompletion_text(context, timeout=self.get_timeout(timeout))
+            rsp_text = await self._acompletion_text_with_cache(context, timeout=self.get_timeout(timeout))
             context.append(self._assistant_msg(rsp_text))
         return self._extract_assistant_rsp(context)
 
+    async def aask_many(
+        self,
+        msgs: list[Union[str, list[dict[str, str]]]],
+        system_msgs: Optional[list[str]] = None,
+        max_concurrency: int = 8,
+        timeout=USE_CONFIG_TIMEOUT,
+        return_exceptions: bool = True,
+    ) -> list[Union[str, Exception]]:
+        """Independent questioning, concurrently.
+
+        At most `max_concurrency` prompts are in flight, on top of the rate limit of the endpoint. Results are in the
+        order of `msgs`, a failed prompt gives its exception in place, or raises it if `return_exceptions` is False.
+        Replies are not streamed, to keep concurrent outputs apart.
+        """
+        semaphore = asyncio.Semaphore(max_concurrency or len(msgs) or 1)
+
+        async def ask(msg) -> str:
+            async with semaphore:
+                return await self.aask(msg, system_msgs, timeout=timeout, stream=False)
+
+        results = await asyncio.gather(*[ask(msg) for msg in msgs], return_exceptions=True)
+        if not return_exceptions:
+            for rsp in results:
+                if isinstance(rsp, BaseException):
+                    raise rsp
+        return results
+
     async def aask_code(self, messages: Union[str, Message, list[dict]], timeout=USE_CONFIG_TIMEOUT, **kwargs) -> dict:
         raise NotImplementedError
 
@@ -187,6 +489,12 @@ class BaseLLM(ABC):
     async def _achat_completion_stream(self, messages: list[dict], timeout: int = USE_CONFIG_TIMEOUT) -> str:
         """_achat_completion_stream implemented by inherited class"""
 
+    async def _achat_completion_iter(
+        self, messages: list[dict], timeout: int = USE_CONFIG_TIMEOUT
+    ) -> AsyncIterator[str]:
+        """Yield the reply chunk by chunk, providers without a native implementation yield the whole reply at once"""
+        yield await self._achat_completion_stream(messages, timeout=timeout)
+
     @retry(
         stop=stop_after_attempt(3),
         wait=wait_random_exponential(min=1, max=60),
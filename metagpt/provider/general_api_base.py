@@ -10,18 +10,8 @@ import re
 import sys
 import threading
 import time
-from contextlib import asynccontextmanager
 from enum import Enum
-from typing import (
-    AsyncGenerator,
-    AsyncIterator,
-    Dict,
-    Iterator,
-    Optional,
-    Tuple,
-    Union,
-    overload,
-)
+from typing import AsyncGenerator, Dict, Iterator, Optional, Tuple, Union, overload
 from urllib.parse import urlencode, urlsplit, urlunsplit
 
 import aiohttp
@@ -37,6 +27,8 @@ import logging
 import openai
 from openai import version
 
+from metagpt.utils.ahttp_client import SESSION_POOL
+
 logger = logging.getLogger("openai")
 
 TIMEOUT_SECS = 600
@@ -388,8 +380,8 @@ class APIRequestor:
         request_id: Optional[str] = None,
         request_timeout: Optional[Union[float, Tuple[float, float]]] = None,
     ) -> Tuple[Union[OpenAIResponse, AsyncGenerator[OpenAIResponse, None]], bool, str]:
-        ctx = aiohttp_session()
-        session = await ctx.__aenter__()
+        session = await aiohttp_session()
+        result = None
         try:
             result = await self.arequest_raw(
                 method.lower(),
@@ -403,7 +395,8 @@ class APIRequestor:
             )
             resp, got_stream = await self._interpret_async_response(result, stream)
         except Exception:
-            await ctx.__aexit__(None, None, None)
+            if result is not None:
+                result.release()
             raise
         if got_stream:
 
@@ -413,11 +406,12 @@ class APIRequestor:
                     async for r in resp:
                         yield r
                 finally:
-                    await ctx.__aexit__(None, None, None)
+                    # return the connection to the pool instead of closing the session
+                    result.release()
 
             return wrap_resp(), got_stream, self.api_key
         else:
-            await ctx.__aexit__(None, None, None)
+            result.release()
             return resp, got_stream, self.api_key
 
     def request_headers(self, method: str, extra, request_id: Optional[str]) -> Dict[str, str]:
@@ -616,7 +610,6 @@ class APIRequestor:
         ...
 
 
-@asynccontextmanager
-async def aiohttp_session() -> AsyncIterator[aiohttp.ClientSession]:
-    async with aiohttp.ClientSession() as session:
-        yield session
+async def aiohttp_session() -> aiohttp.ClientSession:
+    """The long-lived session of the running loop, see `metagpt.utils.ahttp_client.SESSION_POOL`"""
+    return await SESSION_POOL.get_session()
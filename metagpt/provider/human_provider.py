@@ -16,6 +16,8 @@ class HumanProvider(BaseLLM):
     This enables replacing LLM anywhere in the framework with a human, thus introducing human interaction
     """
 
+    stream_by_aask = True
+
     def __init__(self, config: LLMConfig):
         self.config = config
 
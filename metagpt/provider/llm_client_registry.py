@@ -0,0 +1,72 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+@Time    : 2024/6/3 10:12
+@File    : llm_client_registry.py
+@Desc    : Share provider SDK clients (and their keep-alive connection pools) between LLM instances.
+"""
+import asyncio
+from typing import Any, Callable, Hashable, Optional
+
+from metagpt.configs.llm_config import LLMConfig
+
+# Fields of `LLMConfig` which decide the endpoint and credential a SDK client is bound to.
+# Generation parameters (model, temperature, max_token ...) are passed per request and are not part of the key.
+CLIENT_KEY_FIELDS = ("api_type", "api_key", "base_url", "api_version", "proxy")
+
+
+class LLMClientRegistry:
+    """Cache SDK clients by endpoint config and event loop.
+
+    Every LLM instance still owns its `cost_manager`, only the underlying HTTP client is shared. Async HTTP
+    connections are bound to the event loop which opened them, so clients are cached per running loop and dropped
+    once the loop is closed.
+    """
+
+    def __init__(self):
+        self._loop_clients: dict[int, tuple[asyncio.AbstractEventLoop, dict]] = {}
+        self._clients: dict[Hashable, Any] = {}  # clients created outside of any running loop
+
+    @staticmethod
+    def client_key(config: LLMConfig, namespace: str = "", extra_fields: tuple[str, ...] = ()) -> tuple:
+        """Build the cache key of a config, `namespace` separates different client classes of the same endpoint, and
+        `extra_fields` of the config separate the instances of a class bound to more than the endpoint"""
+        fields = CLIENT_KEY_FIELDS + tuple(extra_fields)
+        return (namespace,) + tuple(str(getattr(config, field, None)) for field in fields)
+
+    def _get_bucket(self) -> dict:
+        try:
+            loop = asyncio.get_running_loop()
+        except RuntimeError:
+            return self._clients
+        entry = self._loop_clients.get(id(loop))
+        if entry is None or entry[0] is not loop:
+            self._loop_clients = {k: v for k, v in self._loop_clients.items() if not v[0].is_closed()}
+            entry = self._loop_clients[id(loop)] = (loop, {})
+        return entry[1]
+
+    def get_client(
+        self, config: LLMConfig, factory: Callable[[], Any], namespace: str = "", extra_fields: tuple[str, ...] = ()
+    ) -> Any:
+        """Return the cached client of `config`, create it by `factory` if not existed"""
+        bucket = self._get_bucket()
+        key = self.client_key(config, namespace, extra_fields)
+        client = bucket.get(key)
+        if client is None:
+            client = bucket[key] = factory()
+        return client
+
+    def remove(self, config: LLMConfig, namespace: str = "", extra_fields: tuple[str, ...] = ()) -> Optional[Any]:
+        """Forget the client of `config` in the current loop, return it so that caller can close it"""
+        return self._get_bucket().pop(self.client_key(config, namespace, extra_fields), None)
+
+    def clear(self):
+        self._loop_clients.clear()
+        self._clients.clear()
+
+    def __len__(self):
+        return len(self._clients) + sum(len(i) for _, i in self._loop_clients.values())
+
+
+# Registry instance
+LLM_CLIENT_REGISTRY = LLMClientRegistry()
@@ -5,9 +5,35 @@
 @Author  : alexanderwu
 @File    : llm_provider_registry.py
 """
+from importlib import import_module
+
 from metagpt.configs.llm_config import LLMConfig, LLMType
 from metagpt.provider.base_llm import BaseLLM
 
+# The module registering each provider, imported on first request so that unused SDKs are never loaded
+LLM_PROVIDER_MODULES = {
+    LLMType.OPENAI: "metagpt.provider.openai_api",
+    LLMType.FIREWORKS: "metagpt.provider.openai_api",
+    LLMType.OPEN_LLM: "metagpt.provider.openai_api",
+    LLMType.MOONSHOT: "metagpt.provider.openai_api",
+    LLMType.MISTRAL: "metagpt.provider.openai_api",
+    LLMType.YI: "metagpt.provider.openai_api",
+    LLMType.OPENROUTER: "metagpt.provider.openai_api",
+    LLMType.ANTHROPIC: "metagpt.provider.anthropic_api",
+    LLMType.CLAUDE: "metagpt.provider.anthropic_api",
+    LLMType.SPARK: "metagpt.provider.spark_api",
+    LLMType.ZHIPUAI: "metagpt.provider.zhipuai_api",
+    LLMType.GEMINI: "metagpt.provider.google_gemini_api",
+    LLMType.METAGPT: "metagpt.provider.metagpt_api",
+    LLMType.AZURE: "metagpt.provider.azure_openai_api",
+    LLMType.OLLAMA: "metagpt.provider.ollama_api",
+    LLMType.QIANFAN: "metagpt.provider.qianfan_api",
+    LLMType.DASHSCOPE: "metagpt.provider.dashscope_api",
+    LLMType.BEDROCK: "metagpt.provider.bedrock_api",
+    LLMType.ARK: "metagpt.provider.ark_api",
+    LLMType.ROUTER: "metagpt.provider.router_api",
+}
+
 
 class LLMProviderRegistry:
     def __init__(self):
@@ -18,6 +44,8 @@ class LLMProviderRegistry:
 
     def get_provider(self, enum: LLMType):
         """get provider instance according to the enum"""
+        if enum not in self.providers and enum in LLM_PROVIDER_MODULES:
+            import_module(LLM_PROVIDER_MODULES[enum])
         return self.providers[enum]
 
 
@@ -0,0 +1,113 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+@Time    : 2024/6/6 10:15
+@File    : llm_stream.py
+@Desc    : Async iterator over the text chunks of an LLM reply, with time-to-first-token and early stop.
+"""
+import asyncio
+import time
+from typing import AsyncIterator, Optional
+
+from metagpt.logs import logger
+
+
+class LLMStream:
+    """Wrap the chunk iterator of a reply.
+
+    Usage:
+        stream = llm.aask_stream(prompt, stop="[/CONTENT]")
+        async for chunk in stream:
+            ...
+        print(stream.text, stream.ttft)
+
+    Once `stop` has arrived the reply is cut right after it and the underlying request is closed, so that the
+    provider stops generating tokens nobody reads.
+    """
+
+    def __init__(self, chunks: AsyncIterator[str], stop: Optional[str] = None):
+        self._chunks = chunks
+        self.stop = stop
+        self.text = ""
+        self.ttft: Optional[float] = None  # seconds from the first read to the first non-empty chunk
+        self.stopped = False  # True if closed early by `stop`
+        self._started_at: Optional[float] = None
+        self._done = False
+
+    def __aiter__(self) -> "LLMStream":
+        return self
+
+    async def __anext__(self) -> str:
+        if self._done:
+            raise StopAsyncIteration
+        if self._started_at is None:
+            self._started_at = time.perf_counter()
+        try:
+            chunk = await self._chunks.__anext__()
+        except StopAsyncIteration:
+            self._done = True
+            raise
+        if chunk and self.ttft is None:
+            self.ttft = time.perf_counter() - self._started_at
+            logger.debug(f"llm time to first token: {self.ttft:.3f}s")
+
+        if self.stop:
+            start = max(0, len(self.text) - len(self.stop) + 1)
+            self.text += chunk
+            idx = self.text.find(self.stop, start)
+            if idx >= 0:
+                end = idx + len(self.stop)
+                chunk = chunk[: len(chunk) - (len(self.text) - end)]
+                self.text = self.text[:end]
+                self.stopped = True
+                await self.aclose()
+        else:
+            self.text += chunk
+        return chunk
+
+    async def aclose(self):
+        """Stop reading and close the underlying request"""
+        self._done = True
+        aclose = getattr(self._chunks, "aclose", None)
+        if aclose:
+            await aclose()
+
+    async def read(self) -> str:
+        """Consume the rest of the stream and return the whole text"""
+        async for _ in self:
+            pass
+        return self.text
+
+
+class ChunkChannel:
+    """Hand the chunks of a reply from the task reading it to the stream, one chunk whenever the stream asks for one.
+
+    The task does not read ahead of the stream, so a stream closed early also stops the request in time. Once the
+    stream is `detach`ed, the task reads the rest of the reply at its own pace for the callers sharing it.
+    """
+
+    def __init__(self):
+        self._chunks: asyncio.Queue = asyncio.Queue()
+        self._wanted = asyncio.Event()
+        self._detached = False
+
+    async def wanted(self):
+        """Wait until the stream asks for the next chunk"""
+        await self._wanted.wait()
+
+    def put(self, chunk: str):
+        if not self._detached:
+            self._wanted.clear()
+        self._chunks.put_nowait(chunk)
+
+    def close(self):
+        self._chunks.put_nowait(None)
+
+    async def get(self) -> Optional[str]:
+        """The next chunk, or None at the end of the reply"""
+        self._wanted.set()
+        return await self._chunks.get()
+
+    def detach(self):
+        self._detached = True
+        self._wanted.set()
@@ -10,7 +10,8 @@ from __future__ import annotations
 
 import json
 import re
-from typing import Optional, Union
+from functools import partial
+from typing import AsyncIterator, Optional, Union
 
 from openai import APIConnectionError, AsyncOpenAI, AsyncStream
 from openai._base_client import AsyncHttpxClientWrapper
@@ -29,6 +30,7 @@ from metagpt.const import USE_CONFIG_TIMEOUT
 from metagpt.logs import log_llm_stream, logger
 from metagpt.provider.base_llm import BaseLLM
 from metagpt.provider.constant import GENERAL_FUNCTION_SCHEMA
+from metagpt.provider.llm_client_registry import LLM_CLIENT_REGISTRY
 from metagpt.provider.llm_provider_registry import register_provider
 from metagpt.utils.common import CodeParser, decode_image, log_and_reraise
 from metagpt.utils.cost_manager import CostManager
@@ -65,8 +67,22 @@ class OpenAILLM(BaseLLM):
         """https://github.com/openai/openai-python#async-usage"""
         self.model = self.config.model  # Used in _calc_usage & _cons_kwargs
         self.pricing_plan = self.config.pricing_plan or self.model
+        self._aclient = None
+
+    @property
+    def aclient(self) -> AsyncOpenAI:
+        """The client is shared by all instances with the same endpoint config, so is its connection pool"""
+        if self._aclient is not None:
+            return self._aclient
+        return LLM_CLIENT_REGISTRY.get_client(self.config, self._create_client, namespace=self.__class__.__name__)
+
+    @aclient.setter
+    def aclient(self, client: AsyncOpenAI):
+        self._aclient = client
+
+    def _create_client(self) -> AsyncOpenAI:
         kwargs = self._make_client_kwargs()
-        self.aclient = AsyncOpenAI(**kwargs)
+        return AsyncOpenAI(**kwargs)
 
     def _make_client_kwargs(self) -> dict:
         kwargs = {"api_key": self.config.api_key, "base_url": self.config.base_url}
@@ -87,40 +103,47 @@ class OpenAILLM(BaseLLM):
         return params
 
     async def _achat_completion_stream(self, messages: list[dict], timeout=USE_CONFIG_TIMEOUT) -> str:
+        return "".join([chunk async for chunk in self._achat_completion_iter(messages, timeout=timeout)])
+
+    async def _achat_completion_iter(self, messages: list[dict], timeout=USE_CONFIG_TIMEOUT) -> AsyncIterator[str]:
         response: AsyncStream[ChatCompletionChunk] = await self.aclient.chat.completions.create(
             **self._cons_kwargs(messages, timeout=self.get_timeout(timeout)), stream=True
         )
         usage = None
         collected_messages = []
-        async for chunk in response:
-            chunk_message = chunk.choices[0].delta.content or "" if chunk.choices else ""  # extract the message
-            finish_reason = (
-                chunk.choices[0].finish_reason if chunk.choices and hasattr(chunk.choices[0], "finish_reason") else None
-            )
-            log_llm_stream(chunk_message)
-            collected_messages.append(chunk_message)
-            if finish_reason:
-                if hasattr(chunk, "usage") and chunk.usage is not None:
-                    # Some services have usage as an attribute of the chunk, such as Fireworks
-                    if isinstance(chunk.usage, CompletionUsage):
-                        usage = chunk.usage
-                    else:
-                        usage = CompletionUsage(**chunk.usage)
-                elif hasattr(chunk.choices[0], "usage"):
-                    # The usage of some services is an attribute of chunk.choices[0], such as Moonshot
-                    usage = CompletionUsage(**chunk.choices[0].usage)
-                elif "openrouter.ai" in self.config.base_url:
-                    # due to it get token cost from api
-                    usage = await get_openrouter_tokens(chunk)
-
-        log_llm_stream("\n")
-        full_reply_content = "".join(collected_messages)
-        if not usage:
-            # Some services do not provide the usage attribute, such as OpenAI or OpenLLM
-            usage = self._calc_usage(messages, full_reply_content)
-
-        self._update_costs(usage)
-        return full_reply_content
+        try:
+            async for chunk in response:
+                chunk_message = chunk.choices[0].delta.content or "" if chunk.choices else ""  # extract the message
+                finish_reason = (
+                    chunk.choices[0].finish_reason
+                    if chunk.choices and hasattr(chunk.choices[0], "finish_reason")
+                    else None
+                )
+                log_llm_stream(chunk_message)
+                collected_messages.append(chunk_message)
+                if finish_reason:
+                    if hasattr(chunk, "usage") and chunk.usage is not None:
+                        # Some services have usage as an attribute of the chunk, such as Fireworks
+                        if isinstance(chunk.usage, CompletionUsage):
+                            usage = chunk.usage
+                        else:
+                            usage = CompletionUsage(**chunk.usage)
+                    elif hasattr(chunk.choices[0], "usage"):
+                        # The usage of some services is an attribute of chunk.choices[0], such as Moonshot
+                        usage = CompletionUsage(**chunk.choices[0].usage)
+                    elif "openrouter.ai" in self.config.base_url:
+                        # due to it get token cost from api
+                        usage = await get_openrouter_tokens(chunk)
+                yield chunk_message
+        finally:
+            # also reached when the reader stops early, closing the response stops the generation
+            await response.close()
+            log_llm_stream("\n")
+            full_reply_content = "".join(collected_messages)
+            if not usage:
+                # Some services do not provide the usage attribute, such as OpenAI or OpenLLM
+                usage = self._calc_usage(messages, full_reply_content)
+            self._update_costs(usage)
 
     def _cons_kwargs(self, messages: list[dict], timeout=USE_CONFIG_TIMEOUT, **extra_kwargs) -> dict:
         kwargs = {
@@ -182,8 +205,72 @@ class OpenAILLM(BaseLLM):
         if "tools" not in kwargs:
             configs = {"tools": [{"type": "function", "function": GENERAL_FUNCTION_SCHEMA}]}
             kwargs.update(configs)
-        rsp = await self._achat_completion_function(messages, **kwargs)
-        return self.get_choice_function_arguments(rsp)
+        formatted_msgs = self.format_msg(messages)
+        cache = self.response_cache
+        if cache is not None:
+            key = self._response_cache_key(formatted_msgs, **kwargs)
+            if (code := await cache.aget(key)) is not None:
+                return code
+        rsp = await self._arequest_with_limit(
+            formatted_msgs, partial(self._achat_completion_function, messages, **kwargs)
+        )
+        code = self.get_choice_function_arguments(rsp)
+        if cache is not None:
+            await cache.aset(key, code)
+        return code
+
+    def to_batch_requests(
+        self, msgs: list[Union[str, list[dict[str, str]]]], system_msgs: Optional[list[str]] = None
+    ) -> list[dict]:
+        """The prompts of `aask_many` in the offline Batch API format, `custom_id` is the index of the prompt.
+        See https://platform.openai.com/docs/guides/batch
+        """
+        requests = []
+        for i, msg in enumerate(msgs):
+            body = self._cons_kwargs(self._build_messages(msg, system_msgs))
+            body.pop("timeout")
+            requests.append({"custom_id": str(i), "method": "POST", "url": "/v1/chat/completions", "body": body})
+        return requests
+
+    async def acreate_batch(
+        self,
+        msgs: list[Union[str, list[dict[str, str]]]],
+        system_msgs: Optional[list[str]] = None,
+        completion_window: str = "24h",
+    ) -> str:
+        """Submit the prompts as one offline batch, at a lower price than `aask_many`. Return the batch id."""
+        lines = "\n".join(json.dumps(i, ensure_ascii=False) for i in self.to_batch_requests(msgs, system_msgs))
+        file = await self.aclient.files.create(file=("batch.jsonl", lines.encode("utf-8")), purpose="batch")
+        batch = await self.aclient.batches.create(
+            input_file_id=file.id, endpoint="/v1/chat/completions", completion_window=completion_window
+        )
+        return batch.id
+
+    async def aretrieve_batch(self, batch_id: str) -> Optional[list[Union[str, Exception]]]:
+        """Return the replies of a batch in the order of its prompts like `aask_many`, or None if not finished yet"""
+        batch = await self.aclient.batches.retrieve(batch_id)
+        if batch.status in ["validating", "in_progress", "finalizing", "cancelling"]:
+            return None
+        if batch.status == "failed":
+            raise RuntimeError(f"Batch {batch_id} failed: {batch.errors}")
+
+        results = {}
+        for file_id in [batch.output_file_id, batch.error_file_id]:
+            if not file_id:
+                continue
+            content = await self.aclient.files.content(file_id)
+            for line in content.text.splitlines():
+                item = json.loads(line)
+                rsp = item.get("response") or {}
+                if item.get("error") or rsp.get("status_code") != 200:
+                    results[int(item["custom_id"])] = RuntimeError(item.get("error") or rsp.get("body"))
+                    continue
+                self._update_costs(rsp["body"].get("usage"))
+                results[int(item["custom_id"])] = rsp["body"]["choices"][0]["message"]["content"]
+        total = batch.request_counts.total if batch.request_counts else len(results)
+        return [
+            results.get(i, RuntimeError(f"Batch {batch_id} has no reply, status {batch.status}")) for i in range(total)
+        ]
 
     def _parse_arguments(self, arguments: str) -> dict:
         """parse arguments in openai function call"""
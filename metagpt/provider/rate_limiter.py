@@ -0,0 +1,189 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+@Time    : 2024/6/5 11:03
+@File    : rate_limiter.py
+@Desc    : Requests-per-minute / tokens-per-minute budgets and a concurrency cap shared by all LLM instances of the
+    same endpoint, model and limits, with adaptive backoff on 429 responses.
+"""
+import asyncio
+import random
+import time
+from contextlib import asynccontextmanager
+from contextvars import ContextVar
+from dataclasses import dataclass
+from typing import AsyncIterator, Optional
+
+from metagpt.configs.llm_config import LLMConfig
+from metagpt.logs import logger
+
+MAX_BACKOFF_SECS = 60
+# Fields of `LLMConfig` which, besides the endpoint, decide the limiter a config shares: limits are usually per model,
+# and configs with different limits must not inherit the limits of whichever of them built the limiter first.
+LIMITER_KEY_FIELDS = ("model", "rpm", "tpm", "max_concurrency", "rate_limit_retries")
+
+
+@dataclass
+class RateLimitSlot:
+    """A granted request, `actual_tokens` is filled in once the provider reports the usage"""
+
+    estimated_tokens: int
+    actual_tokens: Optional[int] = None
+
+
+# The slot of the request running in the current task, so that `BaseLLM._update_costs` can reconcile the estimate
+_current_slot: ContextVar[Optional[RateLimitSlot]] = ContextVar("rate_limit_slot", default=None)
+
+
+def report_usage(tokens: int):
+    """Record the real token usage of the request running in the current task"""
+    slot = _current_slot.get()
+    if slot is not None:
+        slot.actual_tokens = (slot.actual_tokens or 0) + tokens
+
+
+def is_rate_limit_error(e: BaseException) -> bool:
+    """openai/anthropic `RateLimitError`, `aiohttp.ClientResponseError` or any error carrying http status 429"""
+    if getattr(e, "status_code", None) == 429 or getattr(e, "status", None) == 429:
+        return True
+    return type(e).__name__ == "RateLimitError"
+
+
+def get_retry_after(e: BaseException) -> Optional[float]:
+    headers = getattr(getattr(e, "response", None), "headers", None) or getattr(e, "headers", None) or {}
+    try:
+        if "retry-after-ms" in headers:
+            return float(headers["retry-after-ms"]) / 1000
+        return float(headers["retry-after"]) if "retry-after" in headers else None
+    except (TypeError, ValueError):
+        return None
+
+
+class TokenBucket:
+    """Refill `rate_per_minute` units evenly over a minute, hold at most one minute of budget"""
+
+    def __init__(self, rate_per_minute: float):
+        self.capacity = float(rate_per_minute)
+        self.fill_rate = self.capacity / 60
+        self.tokens = self.capacity
+        self.updated_at = time.monotonic()
+
+    def _refill(self):
+        now = time.monotonic()
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated_at) * self.fill_rate)
+        self.updated_at = now
+
+    def wait_time(self, amount: float) -> float:
+        """Seconds until `amount` units are available, requests larger than the capacity wait for a full bucket"""
+        self._refill()
+        amount = min(amount, self.capacity)
+        return 0.0 if self.tokens >= amount else (amount - self.tokens) / self.fill_rate
+
+    def consume(self, amount: float):
+        self._refill()
+        self.tokens -= min(amount, self.capacity)
+
+    def refund(self, amount: float):
+        """Give back over-estimated units, a negative amount charges the under-estimated part"""
+        self._refill()
+        self.tokens = min(self.capacity, self.tokens + amount)
+
+
+class LLMRateLimiter:
+    """Admission control of one endpoint.
+
+    A request waits until both buckets have budget, the in-flight count is under the concurrency limit and no 429
+    cooldown is pending. After a 429 the concurrency limit is halved and recovers by one per successful request.
+    """
+
+    def __init__(self, rpm: int = 0, tpm: int = 0, max_concurrency: int = 0, max_retries: int = 3):
+        self.request_bucket = TokenBucket(rpm) if rpm else None
+        self.token_bucket = TokenBucket(tpm) if tpm else None
+        self.max_concurrency = max_concurrency
+        self.max_retries = max_retries
+        self.concurrency_limit = max_concurrency  # 0 means unlimited
+        self.in_flight = 0
+        self.cooldown_until = 0.0
+        self.strikes = 0
+        self._ceiling = max_concurrency
+        self._cond = asyncio.Condition()
+
+        self.rate_limited_count = 0
+        self.waited_secs = 0.0
+
+    @classmethod
+    def from_config(cls, config: LLMConfig) -> "LLMRateLimiter":
+        return cls(
+            rpm=config.rpm,
+            tpm=config.tpm,
+            max_concurrency=config.max_concurrency,
+            max_retries=config.rate_limit_retries,
+        )
+
+    def _delay(self, tokens: int) -> float:
+        delay = self.cooldown_until - time.monotonic()
+        if self.request_bucket:
+            delay = max(delay, self.request_bucket.wait_time(1))
+        if self.token_bucket:
+            delay = max(delay, self.token_bucket.wait_time(tokens))
+        return delay
+
+    async def _acquire(self, tokens: int) -> RateLimitSlot:
+        start = time.monotonic()
+        async with self._cond:
+            while True:
+                if self.concurrency_limit and self.in_flight >= self.concurrency_limit:
+                    await self._cond.wait()
+                    continue
+                delay = self._delay(tokens)
+                if delay <= 0:
+                    break
+                try:
+                    await asyncio.wait_for(self._cond.wait(), timeout=delay)
+                except asyncio.TimeoutError:
+                    pass
+            if self.request_bucket:
+                self.request_bucket.consume(1)
+            if self.token_bucket:
+                self.token_bucket.consume(tokens)
+            self.in_flight += 1
+        self.waited_secs += time.monotonic() - start
+        return RateLimitSlot(estimated_tokens=tokens)
+
+    async def _release(self, slot: RateLimitSlot):
+        async with self._cond:
+            self.in_flight -= 1
+            if self.token_bucket and slot.actual_tokens is not None:
+                self.token_bucket.refund(slot.estimated_tokens - slot.actual_tokens)
+            self._cond.notify_all()
+
+    @asynccontextmanager
+    async def acquire(self, estimated_tokens: int = 0) -> AsyncIterator[RateLimitSlot]:
+        slot = await self._acquire(estimated_tokens)
+        token = _current_slot.set(slot)
+        try:
+            yield slot
+        finally:
+            _current_slot.reset(token)
+            await self._release(slot)
+
+    def on_rate_limited(self, retry_after: Optional[float] = None):
+        """Back off all requests of the endpoint, instead of letting every caller retry on its own"""
+        self.strikes += 1
+        self.rate_limited_count += 1
+        if retry_after is None:
+            retry_after = min(MAX_BACKOFF_SECS, 2**self.strikes) * (0.5 + random.random() / 2)
+        self.cooldown_until = max(self.cooldown_until, time.monotonic() + retry_after)
+        self._ceiling = self.max_concurrency or max(self._ceiling, self.in_flight)
+        self.concurrency_limit = max(1, (self.concurrency_limit or self.in_flight) // 2)
+        logger.warning(
+            f"Rate limited, back off {retry_after:.2f}s, concurrency limit reduced to {self.concurrency_limit}"
+        )
+
+    def on_success(self):
+        self.strikes = 0
+        if self.concurrency_limit == self.max_concurrency:
+            return
+        self.concurrency_limit += 1
+        if self.concurrency_limit >= self._ceiling:
+            self.concurrency_limit = self.max_concurrency  # fully recovered, back to the configured limit
@@ -0,0 +1,216 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+@Time    : 2024/6/6 15:30
+@File    : router_api.py
+@Desc    : Route requests across several endpoints by observed latency and error rate, with fallback and hedging.
+"""
+import asyncio
+import math
+import time
+from collections import deque
+from typing import Awaitable, Callable, Optional, TypeVar, Union
+
+from metagpt.configs.llm_config import LLMConfig, LLMType
+from metagpt.const import USE_CONFIG_TIMEOUT
+from metagpt.logs import log_llm_stream, logger
+from metagpt.provider.base_llm import BaseLLM
+from metagpt.provider.llm_client_registry import LLM_CLIENT_REGISTRY
+from metagpt.provider.llm_provider_registry import (
+    create_llm_instance,
+    register_provider,
+)
+from metagpt.schema import Message
+from metagpt.utils.cost_manager import CostManager
+
+T = TypeVar("T")
+
+EWMA_ALPHA = 0.3  # weight of the latest observation
+LATENCY_WINDOW = 100  # latencies kept for the percentile
+MIN_HEDGE_SAMPLES = 10  # latencies needed before the percentile is trusted
+ERROR_PENALTY_SECS = 10  # a request that fails scores as one this much slower
+MAX_EJECT_SECS = 60
+
+
+class EndpointStats:
+    """Health of one endpoint, shared by all routers using it.
+
+    An endpoint failing `eject_after` times in a row is skipped for an exponentially growing period, then tried again.
+    """
+
+    def __init__(self, eject_after: int = 3):
+        self.latency: Optional[float] = None  # EWMA of successful request seconds
+        self.error_rate = 0.0  # EWMA of failures
+        self.latencies: deque[float] = deque(maxlen=LATENCY_WINDOW)
+        self.in_flight = 0
+        self.consecutive_failures = 0
+        self.eject_after = eject_after
+        self.ejected_until = 0.0
+
+    def _ewma(self, prev: Optional[float], value: float) -> float:
+        return value if prev is None else EWMA_ALPHA * value + (1 - EWMA_ALPHA) * prev
+
+    def record_success(self, latency: float):
+        self.latency = self._ewma(self.latency, latency)
+        self.latencies.append(latency)
+        self.error_rate = self._ewma(self.error_rate, 0)
+        self.consecutive_failures = 0
+
+    def record_failure(self):
+        self.error_rate = self._ewma(self.error_rate, 1)
+        self.consecutive_failures += 1
+        if self.consecutive_failures >= self.eject_after:
+            secs = min(MAX_EJECT_SECS, 2 ** (self.consecutive_failures - self.eject_after))
+            self.ejected_until = time.monotonic() + secs
+
+    def record_slow(self, elapsed: float):
+        """A request abandoned by hedging, its latency is at least `elapsed`"""
+        self.latency = self._ewma(self.latency, max(elapsed, self.latency or 0))
+
+    @property
+    def ejected(self) -> bool:
+        return time.monotonic() < self.ejected_until
+
+    def score(self) -> float:
+        """Lower is healthier, endpoints without samples score 0 so that they get tried"""
+        if self.ejected:
+            return math.inf
+        return ((self.latency or 0) + ERROR_PENALTY_SECS * self.error_rate) * (1 + 0.1 * self.in_flight)
+
+    def percentile(self, q: float) -> Optional[float]:
+        if len(self.latencies) < MIN_HEDGE_SAMPLES:
+            return None
+        ordered = sorted(self.latencies)
+        return ordered[min(len(ordered) - 1, int(len(ordered) * q / 100))]
+
+
+@register_provider(LLMType.ROUTER)
+class RouterLLM(BaseLLM):
+    """Spread requests across `config.endpoints`.
+
+    A request goes to the endpoint with the best score and falls back to the next one on error. Once it runs longer
+    than the `hedge_percentile` latency of its endpoint, a duplicate is sent to the next endpoint and the first reply
+    wins. Requests are hedged only once the endpoint has enough latency samples, hedged requests are not streamed and
+    the winning reply is printed once it arrives.
+    """
+
+    def __init__(self, config: LLMConfig):
+        if not config.endpoints:
+            raise ValueError("Router LLM requires at least one config in `endpoints`")
+        self.config = config
+        self.endpoints: list[BaseLLM] = [create_llm_instance(i) for i in config.endpoints]
+        self.model = config.model or self.endpoints[0].model
+        self.pricing_plan = config.pricing_plan or self.endpoints[0].pricing_plan
+        self._cost_manager: Optional[CostManager] = None
+
+    @property
+    def cost_manager(self) -> Optional[CostManager]:
+        return self._cost_manager
+
+    @cost_manager.setter
+    def cost_manager(self, value: Optional[CostManager]):
+        self._cost_manager = value
+        for llm in self.endpoints:
+            llm.cost_manager = value
+
+    def stats(self, llm: BaseLLM) -> EndpointStats:
+        """Stats of the endpoint and model, models served by the same endpoint differ in latency and health"""
+        return LLM_CLIENT_REGISTRY.get_client(
+            llm.config, EndpointStats, namespace=EndpointStats.__name__, extra_fields=("model",)
+        )
+
+    def _ranked(self, exclude: list[BaseLLM] = ()) -> list[BaseLLM]:
+        # sorted() is stable, endpoints of equal score keep the configured order
+        return sorted([i for i in self.endpoints if i not in exclude], key=lambda i: self.stats(i).score())
+
+    def _hedging(self) -> bool:
+        """Whether the healthiest endpoint has enough latency samples to be hedged, and a backup to hedge on"""
+        if not self.config.hedge_percentile or len(self.endpoints) < 2:
+            return False
+        return self.stats(self._ranked()[0]).percentile(self.config.hedge_percentile) is not None
+
+    async def _timed(self, llm: BaseLLM, request: Callable[[BaseLLM], Awaitable[T]]) -> T:
+        stats = self.stats(llm)
+        stats.in_flight += 1
+        start = time.monotonic()
+        try:
+            rsp = await request(llm)
+        except asyncio.CancelledError:
+            stats.record_slow(time.monotonic() - start)
+            raise
+        except Exception:
+            stats.record_failure()
+            raise
+        finally:
+            stats.in_flight -= 1
+        stats.record_success(time.monotonic() - start)
+        return rsp
+
+    async def _route(self, request: Callable[[BaseLLM], Awaitable[T]], hedge: bool = False) -> T:
+        """Run `request` on the healthiest endpoint, fall back to the others on error"""
+        tried = []  # hedging adds its backup endpoint too
+        error = None
+        while len(tried) < len(self.endpoints):
+            llm = self._ranked(exclude=tried)[0]
+            tried.append(llm)
+            try:
+                if hedge:
+                    return await self._hedged(llm, request, tried)
+                return await self._timed(llm, request)
+            except Exception as e:
+                logger.warning(f"{llm.config.base_url} failed, {len(self.endpoints) - len(tried)} endpoints left: {e}")
+                error = e
+        raise error
+
+    async def _hedged(self, llm: BaseLLM, request: Callable[[BaseLLM], Awaitable[T]], tried: list[BaseLLM]) -> T:
+        threshold = self.stats(llm).percentile(self.config.hedge_percentile)
+        backups = [i for i in self._ranked(exclude=tried) if not self.stats(i).ejected]
+        if threshold is None or not backups:
+            return await self._timed(llm, request)
+
+        primary = asyncio.ensure_future(self._timed(llm, request))
+        pending = {primary}
+        try:
+            done, _ = await asyncio.wait(pending, timeout=threshold)
+            if done:
+                return primary.result()
+            backup_llm = backups[0]
+            logger.info(f"{llm.config.base_url} slower than {threshold:.2f}s, hedge on {backup_llm.config.base_url}")
+            tried.append(backup_llm)
+            pending.add(asyncio.ensure_future(self._timed(backup_llm, request)))
+            while pending:
+                done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    if task.exception() is None:
+                        return task.result()
+            return primary.result()  # both failed, raise the error of the primary
+        finally:
+            for task in pending:
+                task.cancel()
+            if pending:  # the request of the loser is released before returning
+                await asyncio.wait(pending)
+
+    async def acompletion_text(
+        self, messages: list[dict], stream: bool = False, timeout: int = USE_CONFIG_TIMEOUT
+    ) -> str:
+        hedge = self._hedging()
+        rsp = await self._route(
+            lambda llm: llm._acompletion_text_with_cache(messages, stream=stream and not hedge, timeout=timeout),
+            hedge=hedge,
+        )
+        if stream and hedge:
+            log_llm_stream(rsp)
+            log_llm_stream("\n")
+        return rsp
+
+    async def _achat_completion(self, messages: list[dict], timeout=USE_CONFIG_TIMEOUT):
+        return await self._route(lambda llm: llm._achat_completion(messages, timeout=timeout))
+
+    async def acompletion(self, messages: list[dict], timeout=USE_CONFIG_TIMEOUT):
+        return await self._route(lambda llm: llm.acompletion(messages, timeout=timeout))
+
+    async def _achat_completion_stream(self, messages: list[dict], timeout: int = USE_CONFIG_TIMEOUT) -> str:
+        return await self._route(lambda llm: llm._achat_completion_stream(messages, timeout=timeout))
+
+    async def aask_code(self, messages: Union[str, Message, list[dict]], timeout=USE_CONFIG_TIMEOUT, **kwargs) -> dict:
+        return await self._route(lambda llm: llm.aask_code(messages, timeout=timeout, **kwargs))
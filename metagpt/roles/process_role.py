@@ -0,0 +1,192 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+@Desc   : Host a role in a worker process, so that CPU-bound roles don't block the others.
+
+The `ProcessRole` stays in the `Environment` in place of the wrapped role, with the same name, profile and addresses,
+so messages are routed to it exactly as to the role itself. Each time it runs, the messages it received are sent to the
+worker process, the role runs there once, and the messages the role published are published to the environment.
+Messages cross the process boundary as JSON, along with the LLM costs of each run, which are added to the cost manager
+of the environment so that they count against the investment of the team. The wrapped role is kept as its class and
+data, the data being sent back by the worker after every run, so a `ProcessRole` is serialized like any other role and
+a checkpoint taken while its worker runs is up to date. A worker lost along with its pipe is started again from that
+data by the next run.
+"""
+from __future__ import annotations
+
+import asyncio
+import json
+import multiprocessing
+import traceback
+from multiprocessing.connection import Connection
+from typing import Any, Optional
+
+from pydantic import PrivateAttr
+
+from metagpt.config2 import Config
+from metagpt.context import Context
+from metagpt.environment.base_env import Environment
+from metagpt.logs import logger
+from metagpt.roles.role import Role
+from metagpt.schema import Message
+from metagpt.utils.common import import_class
+from metagpt.utils.cost_manager import CostManager, Costs
+
+
+class _WorkerEnvironment(Environment):
+    """Environment of the worker process, it collects the published messages instead of routing them"""
+
+    outbox: list[Message] = []
+
+    def publish_message(self, message: Message, peekable: bool = True) -> bool:
+        self.outbox.append(message)
+        return True
+
+
+def _cost_delta(cost_manager: CostManager, before: Costs) -> Costs:
+    after = cost_manager.get_costs()
+    return Costs(*(i - j for i, j in zip(after, before)))
+
+
+async def _serve(conn: Connection, role: Role):
+    """Reply to each request with `(status, payload, idle, cost_delta, role_data)`, stop on None"""
+    loop = asyncio.get_running_loop()
+    env = _WorkerEnvironment(context=role.context)
+    env.add_role(role)
+    cost_manager = role.context.cost_manager
+    while True:
+        request = await loop.run_in_executor(None, conn.recv)
+        if request is None:
+            conn.send(("stopped", None, role.is_idle, Costs(0, 0, 0, 0), role.model_dump_json()))
+            break
+        before = cost_manager.get_costs()
+        try:
+            for data in request:
+                role.put_message(Message.model_validate_json(data))
+            await role.run()
+            reply = ("ok", [i.model_dump_json() for i in env.outbox])
+        except Exception:
+            reply = ("error", traceback.format_exc())
+        finally:
+            env.outbox = []
+        conn.send((*reply, role.is_idle, _cost_delta(cost_manager, before), role.model_dump_json()))
+
+
+def _worker_main(conn: Connection, class_name: str, module_name: str, role_data: str, config: Config):
+    role_class = import_class(class_name, module_name)
+    role = role_class(**json.loads(role_data), context=Context(config=config))
+    try:
+        asyncio.run(_serve(conn, role))
+    finally:
+        conn.close()
+
+
+class ProcessRole(Role):
+    """A role running in a worker process, created with `ProcessRole.from_role`"""
+
+    role_class: str = ""
+    role_module: str = ""
+    role_data: dict[str, Any] = {}  # the wrapped role as of the last reply of its worker
+
+    _process: Optional[multiprocessing.Process] = PrivateAttr(default=None)
+    _conn: Optional[Connection] = PrivateAttr(default=None)
+    _lock: Optional[asyncio.Lock] = PrivateAttr(default=None)
+    _worker_idle: bool = PrivateAttr(default=True)
+
+    @classmethod
+    def from_role(cls, role: Role) -> "ProcessRole":
+        proxy = cls(
+            name=role.name,
+            profile=role.profile,
+            goal=role.goal,
+            constraints=role.constraints,
+            desc=role.desc,
+            priority=role.priority,
+            context=role.context,
+        )
+        proxy.addresses = set(role.addresses)
+        proxy.role_class = type(role).__qualname__
+        proxy.role_module = type(role).__module__
+        proxy.role_data = json.loads(role.model_dump_json())
+        return proxy
+
+    def start(self):
+        """Start the worker process, done on the first run"""
+        if self._process is not None:
+            return
+        conn, child_conn = multiprocessing.Pipe()
+        process = multiprocessing.get_context("spawn").Process(
+            target=_worker_main,
+            args=(child_conn, self.role_class, self.role_module, json.dumps(self.role_data), self.config),
+            name=f"role-{self.name}",
+            daemon=True,
+        )
+        try:
+            process.start()
+        except Exception:
+            conn.close()
+            raise
+        finally:
+            child_conn.close()
+        self._process, self._conn = process, conn
+        logger.info(f"{self._setting} runs in process {self._process.pid}")
+
+    def stop(self):
+        """Stop the worker process, keeping the state of the role in it to start the next one with"""
+        if self._process is None:
+            return
+        try:
+            self._conn.send(None)
+            stopped = self._conn.poll(10)
+            if stopped:
+                self.role_data = json.loads(self._conn.recv()[-1])
+        except (BrokenPipeError, EOFError, OSError):
+            stopped = False
+        if not stopped:
+            logger.warning(f"{self._setting}: process {self._process.pid} did not stop cleanly, keep its last state")
+        self._process.join(timeout=10)
+        self._discard()
+
+    def _discard(self):
+        """Forget the worker process, terminating it if it is still alive, so that the next run starts a new one"""
+        if self._process.is_alive():
+            self._process.terminate()
+        self._conn.close()
+        self._process = self._conn = None
+
+    async def run(self, with_message=None) -> Message | None:
+        if with_message:
+            self.put_message(with_message if isinstance(with_message, Message) else Message(content=str(with_message)))
+        self._lock = self._lock or asyncio.Lock()
+        async with self._lock:  # one request at a time per worker
+            news = self.rc.msg_buffer.pop_all()
+            self.start()
+            pid = self._process.pid
+            try:
+                self._conn.send([i.model_dump_json() for i in news])
+                status, payload, self._worker_idle, cost_delta, role_data = await asyncio.to_thread(self._conn.recv)
+            except (BrokenPipeError, EOFError, OSError) as e:
+                self._discard()
+                for msg in news:  # handed to the next worker
+                    self.rc.msg_buffer.push(msg)
+                raise RuntimeError(f"{self._setting} lost its process {pid}, it restarts on the next run") from e
+        self.role_data = json.loads(role_data)
+        self._add_costs(cost_delta)
+        if status != "ok":
+            raise RuntimeError(f"{self._setting} failed in process {pid}:\n{payload}")
+
+        rsp = None
+        for data in payload:
+            rsp = Message.model_validate_json(data)
+            self.publish_message(rsp)
+        return rsp
+
+    def _add_costs(self, delta: Costs):
+        cost_manager = self.context.cost_manager
+        cost_manager.total_prompt_tokens += delta.total_prompt_tokens
+        cost_manager.total_completion_tokens += delta.total_completion_tokens
+        cost_manager.total_cost += delta.total_cost
+
+    @property
+    def is_idle(self) -> bool:
+        return self._worker_idle and self.rc.msg_buffer.empty()
@@ -96,9 +96,9 @@ class RoleContext(BaseModel):
     msg_buffer: MessageQueue = Field(
         default_factory=MessageQueue, exclude=True
     )  # Message Buffer with Asynchronous Updates
-    memory: Memory = Field(default_factory=Memory)
+    memory: SerializeAsAny[Memory] = Field(default_factory=Memory)  # subclasses like TieredMemory dump their own fields
     # long_term_memory: LongTermMemory = Field(default_factory=LongTermMemory)
-    working_memory: Memory = Field(default_factory=Memory)
+    working_memory: SerializeAsAny[Memory] = Field(default_factory=Memory)
     state: int = Field(default=-1)  # -1 indicates initial or termination state where todo is None
     todo: Action = Field(default=None, exclude=True)
     watch: set[str] = Field(default_factory=set)
@@ -115,7 +115,7 @@ class RoleContext(BaseModel):
 
     @property
     def history(self) -> list[Message]:
-        return self.memory.get()
+        return self.memory.get_history()
 
     @classmethod
     def model_rebuild(cls, **kwargs):
@@ -150,6 +150,8 @@ class Role(SerializationMixin, ContextMixin, BaseModel):
     addresses: set[str] = set()
     planner: Planner = Field(default_factory=Planner)
 
+    priority: int = 0  # roles with a higher priority run first when the environment caps the roles run per round
+
     # builtin variables
     recovered: bool = False  # to tag if a recovered role
     latest_observed_msg: Optional[Message] = None  # record the latest observed message when interrupted
@@ -322,7 +324,7 @@ class Role(SerializationMixin, ContextMixin, BaseModel):
     def _set_state(self, state: int):
         """Update the current state."""
         self.rc.state = state
-        logger.debug(f"actions={self.actions}, state={state}")
+        logger.opt(lazy=True).debug("actions={}, state={}", lambda: self.actions, lambda: state)
         self.set_todo(self.actions[self.rc.state] if state >= 0 else None)
 
     def set_env(self, env: "Environment"):
@@ -331,6 +333,8 @@ class Role(SerializationMixin, ContextMixin, BaseModel):
         self.rc.env = env
         if env:
             env.set_addresses(self, self.addresses)
+            if self.latest_observed_msg or not self.rc.msg_buffer.empty():
+                env.wake_up(self)
             self.llm.system_prompt = self._get_prefix()
             self.llm.cost_manager = self.context.cost_manager
             self.set_actions(self.actions)  # reset actions to update llm and prefix
@@ -402,12 +406,12 @@ class Role(SerializationMixin, ContextMixin, BaseModel):
         logger.info(f"{self._setting}: to do {self.rc.todo}({self.rc.todo.name})")
         response = await self.rc.todo.run(self.rc.history)
         if isinstance(response, (ActionOutput, ActionNode)):
-            msg = Message(
+            msg = Message.create_trusted(
                 content=response.content,
                 instruct_content=response.instruct_content,
                 role=self._setting,
-                cause_by=self.rc.todo,
-                sent_from=self,
+                cause_by=any_to_str(self.rc.todo),
+                sent_from=any_to_str(self),
             )
         elif isinstance(response, Message):
             msg = response
@@ -426,20 +430,21 @@ class Role(SerializationMixin, ContextMixin, BaseModel):
         if not news:
             news = self.rc.msg_buffer.pop_all()
         # Store the read messages in your own memory to prevent duplicate processing.
-        old_messages = [] if ignore_memory else self.rc.memory.get()
+        unseen = news if ignore_memory else self.rc.memory.find_news(news)
         self.rc.memory.add_batch(news)
         # Filter out messages of interest.
-        self.rc.news = [
-            n for n in news if (n.cause_by in self.rc.watch or self.name in n.send_to) and n not in old_messages
-        ]
+        self.rc.news = [n for n in unseen if n.cause_by in self.rc.watch or self.name in n.send_to]
         self.latest_observed_msg = self.rc.news[-1] if self.rc.news else None  # record the latest observed msg
 
         # Design Rules:
         # If you need to further categorize Message objects, you can do so using the Message.set_meta function.
         # msg_buffer is a receiving buffer, avoid adding message data and operations to msg_buffer.
-        news_text = [f"{i.role}: {i.content[:20]}..." for i in self.rc.news]
-        if news_text:
-            logger.debug(f"{self._setting} observed: {news_text}")
+        if self.rc.news:
+            logger.opt(lazy=True).debug(
+                "{} observed: {}",
+                lambda: self._setting,
+                lambda: [f"{i.role}: {i.content[:20]}..." for i in self.rc.news],
+            )
         return len(self.rc.news)
 
     def publish_message(self, msg):
@@ -456,6 +461,8 @@ class Role(SerializationMixin, ContextMixin, BaseModel):
         if not message:
             return
         self.rc.msg_buffer.push(message)
+        if self.rc.env:
+            self.rc.env.wake_up(self)
 
     async def _react(self) -> Message:
         """Think first, then act, until the Role _think it is time to stop and requires no more todo.
@@ -479,7 +486,7 @@ class Role(SerializationMixin, ContextMixin, BaseModel):
         """first plan, then execute an action sequence, i.e. _think (of a plan) -> _act -> _act -> ... Use llm to come up with the plan dynamically."""
 
         # create initial plan and update it until confirmation
-        goal = self.rc.memory.get()[-1].content  # retreive latest user requirement
+        goal = self.rc.memory.get(1)[-1].content  # retreive latest user requirement
         await self.planner.update_plan(goal=goal)
 
         # take on tasks until all finished
@@ -560,6 +567,9 @@ class Role(SerializationMixin, ContextMixin, BaseModel):
         """If true, all actions have been executed."""
         return not self.rc.news and not self.rc.todo and self.rc.msg_buffer.empty()
 
+    def stop(self):
+        """Release what the role holds besides its data once a run is over, e.g. a worker process, it can run again"""
+
     async def think(self) -> Action:
         """
         Export SDK API, used by AgentStore RPC.
@@ -12,7 +12,7 @@ import warnings
 from pathlib import Path
 from typing import Any, Optional
 
-from pydantic import BaseModel, ConfigDict, Field
+from pydantic import BaseModel, ConfigDict, Field, PrivateAttr
 
 from metagpt.actions import UserRequirement
 from metagpt.const import MESSAGE_ROUTE_TO_ALL, SERDESER_PATH
@@ -21,12 +21,9 @@ from metagpt.environment import Environment
 from metagpt.logs import logger
 from metagpt.roles import Role
 from metagpt.schema import Message
-from metagpt.utils.common import (
-    NoMoneyException,
-    read_json_file,
-    serialize_decorator,
-    write_json_file,
-)
+from metagpt.utils.common import NoMoneyException, serialize_decorator
+from metagpt.utils.redis import Redis
+from metagpt.utils.team_journal import TeamJournal
 
 
 class Team(BaseModel):
@@ -41,6 +38,8 @@ class Team(BaseModel):
     investment: float = Field(default=10.0)
     idea: str = Field(default="")
 
+    _journal: Optional[TeamJournal] = PrivateAttr(default=None)
+
     def __init__(self, context: Context = None, **data: Any):
         super(Team, self).__init__(**data)
         ctx = context or Context()
@@ -53,32 +52,43 @@ class Team(BaseModel):
         if "env_desc" in data:
             self.env.desc = data["env_desc"]
 
-    def serialize(self, stg_path: Path = None):
+    def _get_journal(self, stg_path: Path = None) -> TeamJournal:
         stg_path = SERDESER_PATH.joinpath("team") if stg_path is None else stg_path
-        team_info_path = stg_path.joinpath("team.json")
-        serialized_data = self.model_dump()
-        serialized_data["context"] = self.env.context.serialize()
+        if self._journal is None or self._journal.stg_path != stg_path:
+            self._journal = TeamJournal(stg_path)
+        return self._journal
+
+    def serialize(self, stg_path: Path = None):
+        """Write the whole team to `team.json`"""
+        self._get_journal(stg_path).snapshot(self)
 
-        write_json_file(team_info_path, serialized_data)
+    def checkpoint(self, stg_path: Path = None):
+        """Append what changed since the last checkpoint to the journal next to `team.json`, compacting it now and then"""
+        self._get_journal(stg_path).checkpoint(self)
 
     @classmethod
     def deserialize(cls, stg_path: Path, context: Context = None) -> "Team":
         """stg_path = ./storage/team"""
         # recover team_info
-        team_info_path = stg_path.joinpath("team.json")
-        if not team_info_path.exists():
+        journal = TeamJournal(stg_path)
+        if not journal.snapshot_path.exists():
             raise FileNotFoundError(
                 "recover storage meta file `team.json` not exist, " "not to recover and please start a new project."
             )
 
-        team_info: dict = read_json_file(team_info_path)
+        team_info: dict = journal.load()
         ctx = context or Context()
         ctx.deserialize(team_info.pop("context", None))
         team = Team(**team_info, context=ctx)
+        team._journal = journal
         return team
 
-    def hire(self, roles: list[Role]):
-        """Hire roles to cooperate"""
+    def hire(self, roles: list[Role], in_processes: bool = False):
+        """Hire roles to cooperate, with `in_processes` each role runs in a worker process of its own"""
+        if in_processes:
+            from metagpt.roles.process_role import ProcessRole
+
+            roles = [ProcessRole.from_role(i) for i in roles]
         self.env.add_roles(roles)
 
     @property
@@ -120,16 +130,22 @@ class Team(BaseModel):
         return self.run_project(idea=idea, send_to=send_to)
 
     @serialize_decorator
-    async def run(self, n_round=3, idea="", send_to="", auto_archive=True):
-        """Run company until target round or no money"""
+    async def run(self, n_round=3, idea="", send_to="", auto_archive=True, checkpoint=False):
+        """Run company until target round or no money, with `checkpoint` the team is checkpointed after every round"""
         if idea:
             self.run_project(idea=idea, send_to=send_to)
 
-        while n_round > 0:
-            n_round -= 1
-            self._check_balance()
-            await self.env.run()
-
-            logger.debug(f"max {n_round=} left.")
-        self.env.archive(auto_archive)
-        return self.env.history
+        try:
+            while n_round > 0:
+                n_round -= 1
+                self._check_balance()
+                await self.env.run()
+                if checkpoint:
+                    self.checkpoint()
+
+                logger.debug(f"max {n_round=} left.")
+            self.env.archive(auto_archive)
+            return self.env.history.text()
+        finally:
+            self.env.close()
+            await Redis.close_all()  # the connection pools shared by the roles in this event loop
@@ -2,11 +2,89 @@
 # -*- coding: utf-8 -*-
 # @Desc   : pure async http_client
 
+import asyncio
 from typing import Any, Mapping, Optional, Union
 
 import aiohttp
 from aiohttp.client import DEFAULT_TIMEOUT
 
+from metagpt.configs.http_config import (  # noqa: F401
+    DEFAULT_CONNECTOR_LIMIT,
+    DEFAULT_CONNECTOR_LIMIT_PER_HOST,
+    DEFAULT_DNS_CACHE_TTL,
+    DEFAULT_KEEPALIVE_TIMEOUT,
+    HTTPConfig,
+)
+
+
+class AioHttpSessionPool:
+    """Long-lived `aiohttp.ClientSession` per event loop, so that keep-alive connections are reused across requests.
+
+    The connector settings are those of `config.http`, unless given here or with `configure`. A session can only be used
+    inside the loop which created it, sessions of closed loops are closed and dropped on next access.
+    """
+
+    def __init__(self, **options):
+        self._options: dict[str, Any] = {}
+        self._sessions: dict[int, tuple[asyncio.AbstractEventLoop, aiohttp.ClientSession]] = {}
+        self.configure(**options)
+
+    def configure(self, **kwargs):
+        """Update connector settings, they take effect on sessions created afterwards"""
+        for k in kwargs:
+            if k not in HTTPConfig.model_fields:
+                raise ValueError(f"Unknown session pool option: {k}")
+        self._options.update(kwargs)
+
+    def _settings(self) -> HTTPConfig:
+        from metagpt.config2 import config  # avoid circular import
+
+        return config.http.model_copy(update=self._options)
+
+    def _new_session(self) -> aiohttp.ClientSession:
+        settings = self._settings()
+        connector = aiohttp.TCPConnector(
+            limit=settings.limit,
+            limit_per_host=settings.limit_per_host,
+            keepalive_timeout=settings.keepalive_timeout,
+            use_dns_cache=settings.ttl_dns_cache != 0,
+            ttl_dns_cache=settings.ttl_dns_cache,
+        )
+        return aiohttp.ClientSession(connector=connector)
+
+    @staticmethod
+    async def _discard(session: aiohttp.ClientSession):
+        """Close a session of a closed loop from the running one, its connector only drops the connections there"""
+        try:
+            await session.close()
+        except RuntimeError:  # the transports still try to schedule on their closed loop
+            pass
+
+    async def get_session(self) -> aiohttp.ClientSession:
+        """Return the session of the running loop"""
+        loop = asyncio.get_running_loop()
+        entry = self._sessions.get(id(loop))
+        if entry is None or entry[0] is not loop or entry[1].closed:
+            stale = []
+            for key, (other_loop, session) in list(self._sessions.items()):
+                if other_loop.is_closed() or (key == id(loop) and other_loop is not loop):
+                    stale.append(session)
+                    del self._sessions[key]
+            entry = self._sessions[id(loop)] = (loop, self._new_session())
+            for session in stale:  # the new session is in place before yielding to other callers
+                await self._discard(session)
+        return entry[1]
+
+    async def close(self):
+        """Close the session of the running loop"""
+        entry = self._sessions.pop(id(asyncio.get_running_loop()), None)
+        if entry and not entry[1].closed:
+            await entry[1].close()
+
+
+# Pool instance, shared by `apost`, `apost_stream` and `APIRequestor`
+SESSION_POOL = AioHttpSessionPool()
+
 
 async def apost(
     url: str,
@@ -18,13 +96,13 @@ async def apost(
     encoding: str = "utf-8",
     timeout: int = DEFAULT_TIMEOUT.total,
 ) -> Union[str, dict]:
-    async with aiohttp.ClientSession() as session:
-        async with session.post(url=url, params=params, json=json, data=data, headers=headers, timeout=timeout) as resp:
-            if as_json:
-                data = await resp.json()
-            else:
-                data = await resp.read()
-                data = data.decode(encoding)
+    session = await SESSION_POOL.get_session()
+    async with session.post(url=url, params=params, json=json, data=data, headers=headers, timeout=timeout) as resp:
+        if as_json:
+            data = await resp.json()
+        else:
+            data = await resp.read()
+            data = data.decode(encoding)
     return data
 
 
@@ -43,7 +121,7 @@ async def apost_stream(
         async for line in result:
             deal_with(line)
     """
-    async with aiohttp.ClientSession() as session:
-        async with session.post(url=url, params=params, json=json, data=data, headers=headers, timeout=timeout) as resp:
-            async for line in resp.content:
-                yield line.decode(encoding)
+    session = await SESSION_POOL.get_session()
+    async with session.post(url=url, params=params, json=json, data=data, headers=headers, timeout=timeout) as resp:
+        async for line in resp.content:
+            yield line.decode(encoding)
@@ -7,42 +7,98 @@
 """
 from __future__ import annotations
 
+import asyncio
 import traceback
+import zlib
 from datetime import timedelta
-
-import aioredis  # https://aioredis.readthedocs.io/en/latest/getting-started/
+from typing import Any, Optional
+from weakref import WeakKeyDictionary
 
 from metagpt.configs.redis_config import RedisConfig
 from metagpt.logs import logger
 
+COMPRESSED_MAGIC = b"\x00zlib:"
+
+# event loop -> (url, username, db) -> [client, users], the connection pool is shared by all `Redis` of the same server
+_clients: WeakKeyDictionary = WeakKeyDictionary()
+
 
 class Redis:
+    """Redis client sharing one connection pool per server and event loop.
+
+    With `RedisConfig.compress`, the values written by `set` and `encode` are zlib-compressed, `get` and `decode` read
+    both compressed and plain values. A pool is closed once the last `Redis` using it is closed, and `close_all` closes
+    the pools left open, which `Team.run` does when it is over.
+    """
+
     def __init__(self, config: RedisConfig = None):
         self.config = config
         self._client = None
+        self._key = None
+        self._entry = None  # the [client, users] of `_clients` this one is counted in
 
     async def _connect(self, force=False):
-        if self._client and not force:
-            return True
+        clients = _clients.setdefault(asyncio.get_running_loop(), {})
+        if self._client and not force and clients.get(self._key) is self._entry:
+            return True  # unless closed by `close_all` since
 
         try:
-            self._client = await aioredis.from_url(
-                self.config.to_url(),
-                username=self.config.username,
-                password=self.config.password,
-                db=self.config.db,
-            )
+            import aioredis  # https://aioredis.readthedocs.io/en/latest/getting-started/
+
+            key = (self.config.to_url(), self.config.username, self.config.db)
+            entry = clients.get(key)
+            if force or entry is None:
+                client = await aioredis.from_url(
+                    self.config.to_url(),
+                    username=self.config.username,
+                    password=self.config.password,
+                    db=self.config.db,
+                )
+                entry = clients.setdefault(key, [client, 0])
+                entry[0] = client
+            if self._entry is not entry:
+                entry[1] += 1
+            self._client, self._key, self._entry = entry[0], key, entry
             return True
         except Exception as e:
             logger.warning(f"Redis initialization has failed:{e}")
         return False
 
+    @property
+    def compress(self) -> bool:
+        return self.config.compress
+
+    def encode(self, data: str | bytes) -> bytes | str:
+        if not self.compress:
+            return data
+        data = data.encode("utf-8") if isinstance(data, str) else data
+        return COMPRESSED_MAGIC + zlib.compress(data)
+
+    @staticmethod
+    def decode(data: Optional[bytes]) -> Optional[bytes]:
+        if data and data.startswith(COMPRESSED_MAGIC):
+            return zlib.decompress(data[len(COMPRESSED_MAGIC) :])
+        return data
+
+    async def execute(self, *commands: tuple, transaction: bool = True) -> Optional[list[Any]]:
+        """Run the commands, e.g. `("get", key)`, in one round trip and return their results, None on failure"""
+        if not await self._connect() or not commands:
+            return None
+        try:
+            pipe = self._client.pipeline(transaction=transaction)
+            for name, *args in commands:
+                getattr(pipe, name)(*args)
+            return await pipe.execute()
+        except Exception as e:
+            logger.exception(f"{e}, stack:{traceback.format_exc()}")
+            return None
+
     async def get(self, key: str) -> bytes | None:
         if not await self._connect() or not key:
             return None
         try:
             v = await self._client.get(key)
-            return v
+            return self.decode(v)
         except Exception as e:
             logger.exception(f"{e}, stack:{traceback.format_exc()}")
             return None
@@ -52,12 +108,25 @@ class Redis:
             return
         try:
             ex = None if not timeout_sec else timedelta(seconds=timeout_sec)
-            await self._client.set(key, data, ex=ex)
+            await self._client.set(key, self.encode(data), ex=ex)
         except Exception as e:
             logger.exception(f"{e}, stack:{traceback.format_exc()}")
 
     async def close(self):
-        if not self._client:
-            return
-        await self._client.close()
-        self._client = None
+        """Release this client, closing the shared connection pool if no other `Redis` uses it"""
+        key, entry = self._key, self._entry
+        self._client = self._key = self._entry = None
+        clients = _clients.get(asyncio.get_running_loop(), {})
+        if entry is None or clients.get(key) is not entry:
+            return  # closed by `close_all` already
+        entry[1] -= 1
+        if entry[1] <= 0:
+            del clients[key]
+            await entry[0].close()
+
+    @staticmethod
+    async def close_all():
+        """Close the shared clients of the running event loop"""
+        clients = _clients.pop(asyncio.get_running_loop(), {})
+        for client, _ in clients.values():
+            await client.close()
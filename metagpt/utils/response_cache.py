@@ -0,0 +1,141 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+@Time    : 2024/6/4 14:20
+@File    : response_cache.py
+@Desc    : Persistent, content-addressed cache of LLM responses, so that re-running the same SOP does not pay twice
+    for identical prompts.
+"""
+import asyncio
+import hashlib
+import json
+import sqlite3
+import threading
+import time
+from functools import lru_cache
+from pathlib import Path
+from typing import Any, Optional, Union
+
+from metagpt.logs import logger
+
+
+class ResponseCache:
+    """An on-disk LRU cache backed by sqlite.
+
+    Entries are evicted by last access once `max_entries` is exceeded, and ignored once older than `ttl` seconds.
+    Values must be json serializable. The number of entries is tracked as they are added rather than counted, and
+    expired entries are purged at most every `PURGE_INTERVAL` seconds. `aget` and `aset` do the sqlite I/O in a thread,
+    off the event loop.
+    """
+
+    PURGE_INTERVAL = 60
+
+    def __init__(self, path: Union[str, Path], max_entries: int = 10000, ttl: int = 0):
+        self.path = Path(path)
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._conn = sqlite3.connect(str(self.path), check_same_thread=False, isolation_level=None)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS llm_response "
+            "(key TEXT PRIMARY KEY, value TEXT NOT NULL, created_at REAL NOT NULL, accessed_at REAL NOT NULL)"
+        )
+        self._conn.execute("CREATE INDEX IF NOT EXISTS idx_accessed_at ON llm_response (accessed_at)")
+        self._count = len(self)
+        self._purged_at = 0.0
+
+    @staticmethod
+    def make_key(
+        model: Optional[str],
+        messages: list[dict],
+        temperature: Optional[float] = None,
+        tools: Optional[list] = None,
+        **kwargs,
+    ) -> str:
+        """Hash the request parameters which decide the response, `kwargs` are any other parameters of the request"""
+        payload = {
+            "model": model,
+            "messages": [
+                {k: v for k, v in msg.items() if v is not None} if isinstance(msg, dict) else msg for msg in messages
+            ],
+            "temperature": temperature,
+            "tools": tools,
+        }
+        if kwargs:
+            payload["kwargs"] = kwargs
+        text = json.dumps(payload, sort_keys=True, ensure_ascii=False, separators=(",", ":"), default=str)
+        return hashlib.sha256(text.encode("utf-8")).hexdigest()
+
+    def get(self, key: str) -> Optional[Any]:
+        now = time.time()
+        with self._lock:
+            row = self._conn.execute("SELECT value, created_at FROM llm_response WHERE key = ?", (key,)).fetchone()
+            if row and self.ttl and now - row[1] > self.ttl:
+                self._conn.execute("DELETE FROM llm_response WHERE key = ?", (key,))
+                row = None
+            if not row:
+                self.misses += 1
+                return None
+            self._conn.execute("UPDATE llm_response SET accessed_at = ? WHERE key = ?", (now, key))
+            self.hits += 1
+        return json.loads(row[0])
+
+    async def aget(self, key: str) -> Optional[Any]:
+        return await asyncio.to_thread(self.get, key)
+
+    def set(self, key: str, value: Any):
+        now = time.time()
+        data = json.dumps(value, ensure_ascii=False)
+        with self._lock:
+            added = self._conn.execute(
+                "INSERT OR IGNORE INTO llm_response (key, value, created_at, accessed_at) VALUES (?, ?, ?, ?)",
+                (key, data, now, now),
+            ).rowcount
+            if added:
+                self._count += 1
+            else:
+                self._conn.execute(
+                    "UPDATE llm_response SET value = ?, created_at = ?, accessed_at = ? WHERE key = ?",
+                    (data, now, now, key),
+                )
+            self._evict(now)
+
+    async def aset(self, key: str, value: Any):
+        await asyncio.to_thread(self.set, key, value)
+
+    def _evict(self, now: float):
+        if self.ttl and now - self._purged_at > min(self.ttl, self.PURGE_INTERVAL):
+            self._conn.execute("DELETE FROM llm_response WHERE created_at < ?", (now - self.ttl,))
+            self._purged_at = now
+            self._count = len(self)  # also resyncs with other processes sharing the file
+        if not self.max_entries or self._count <= self.max_entries:
+            return
+        overflow = self._count - self.max_entries
+        evicted = self._conn.execute(
+            "DELETE FROM llm_response WHERE key IN (SELECT key FROM llm_response ORDER BY accessed_at ASC LIMIT ?)",
+            (overflow,),
+        ).rowcount
+        self._count -= evicted
+        logger.debug(f"Evicted {evicted} entries from llm response cache {self.path}")
+
+    def clear(self):
+        with self._lock:
+            self._conn.execute("DELETE FROM llm_response")
+            self._count = 0
+
+    def __len__(self):
+        return self._conn.execute("SELECT COUNT(*) FROM llm_response").fetchone()[0]
+
+    def __contains__(self, key: str):
+        row = self._conn.execute("SELECT created_at FROM llm_response WHERE key = ?", (key,)).fetchone()
+        return bool(row) and not (self.ttl and time.time() - row[0] > self.ttl)
+
+
+@lru_cache(maxsize=None)
+def get_response_cache(path: str, max_entries: int, ttl: int) -> ResponseCache:
+    """Share one cache (and one sqlite connection) among all LLM instances using the same settings"""
+    return ResponseCache(path, max_entries=max_entries, ttl=ttl)
@@ -3,7 +3,10 @@
 # @Desc   : the implement of serialization and deserialization
 
 import copy
+import hashlib
+import json
 import pickle
+from typing import Iterable
 
 from metagpt.utils.common import import_class
 
@@ -57,6 +60,28 @@ def actionoutput_str_to_mapping(mapping: dict) -> dict:
     return new_mapping
 
 
+def actionoutput_mapping_fingerprint(class_name: str, mapping: dict) -> str:
+    """Stable reference to the class built from `class_name` and a mapping of `actionoutput_mapping_to_str`"""
+    text = json.dumps([class_name, mapping], sort_keys=True, ensure_ascii=False)
+    return hashlib.sha1(text.encode("utf-8")).hexdigest()[:16]
+
+
+def hoist_instruct_content_mappings(messages: Iterable[dict], mappings: dict):
+    """Move the mappings out of the serialized `messages` into `mappings`, leaving only their `mapping_ref`"""
+    for message in messages:
+        ic = message.get("instruct_content")
+        if isinstance(ic, dict) and "mapping_ref" in ic and "mapping" in ic:
+            mappings[ic["mapping_ref"]] = ic.pop("mapping")
+
+
+def inline_instruct_content_mappings(messages: list, mappings: dict):
+    """Undo `hoist_instruct_content_mappings`"""
+    for idx, message in enumerate(messages):
+        ic = message.get("instruct_content") if isinstance(message, dict) else None
+        if isinstance(ic, dict) and ic.get("mapping_ref") in mappings and "mapping" not in ic:
+            messages[idx] = {**message, "instruct_content": {**ic, "mapping": mappings[ic["mapping_ref"]]}}
+
+
 def serialize_message(message: "Message"):
     message_cp = copy.deepcopy(message)  # avoid `instruct_content` value update by reference
     ic = message_cp.instruct_content
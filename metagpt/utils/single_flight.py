@@ -0,0 +1,60 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+@Time    : 2024/6/5 16:40
+@File    : single_flight.py
+@Desc    : Coalesce concurrent calls with the same key into one in-flight call.
+"""
+import asyncio
+from typing import Any, Awaitable, Callable, Hashable
+
+
+class SingleFlight:
+    """Concurrent `do` calls with the same key share the result of the first one.
+
+    Only live calls are shared, the key is forgotten as soon as the call finishes. The call runs in its own task, so a
+    cancelled caller does not fail the others; it is cancelled only when every caller has gone.
+    """
+
+    def __init__(self):
+        self._flights: dict[Hashable, asyncio.Task] = {}
+        self._waiters: dict[asyncio.Task, int] = {}
+        self.shared_count = 0
+
+    async def do(self, key: Hashable, fn: Callable[[], Awaitable[Any]]) -> tuple[Any, bool]:
+        """Return the result of `fn` and whether it was shared from another caller"""
+        task, shared = self.join(key, fn)
+        try:
+            return await asyncio.shield(task), shared
+        finally:
+            self.leave(task)
+
+    def join(self, key: Hashable, fn: Callable[[], Awaitable[Any]]) -> tuple[asyncio.Task, bool]:
+        """Wait for the in-flight call of `key`, started with `fn` if there is none, until `leave` is called.
+
+        Return the task of the call and whether it was shared from another caller.
+        """
+        task = self._flights.get(key)
+        shared = task is not None
+        if shared:
+            self.shared_count += 1
+        else:
+            task = self._flights[key] = asyncio.ensure_future(fn())
+            task.add_done_callback(lambda _: self._forget(key, task))
+        self._waiters[task] = self._waiters.get(task, 0) + 1
+        return task, shared
+
+    def leave(self, task: asyncio.Task) -> bool:
+        """Stop waiting for `task`, return True if it was cancelled because nobody else waits for it"""
+        self._waiters[task] -= 1
+        if self._waiters[task]:
+            return False
+        del self._waiters[task]
+        return task.cancel()
+
+    def _forget(self, key: Hashable, task: asyncio.Task):
+        if self._flights.get(key) is task:
+            del self._flights[key]
+
+    def __len__(self):
+        return len(self._flights)
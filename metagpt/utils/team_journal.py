@@ -0,0 +1,202 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+# @Desc   : incremental checkpoints of a team, an append-only journal of deltas on top of the `team.json` snapshot
+
+import json
+from pathlib import Path
+from typing import TYPE_CHECKING, Any, Optional
+
+from pydantic_core import to_jsonable_python
+
+from metagpt.logs import logger
+from metagpt.schema import Message
+from metagpt.utils.common import write_json_file
+from metagpt.utils.serialize import hoist_instruct_content_mappings
+
+if TYPE_CHECKING:
+    from metagpt.team import Team  # noqa: F401
+
+SNAPSHOT_FILENAME = "team.json"
+JOURNAL_FILENAME = "team.journal.jsonl"
+GENERATION_KEY = "journal_generation"
+
+
+class TeamJournal:
+    """Checkpoints of a team written as a snapshot plus an append-only journal.
+
+    `snapshot` writes the whole team to `team.json`, as `Team.serialize` always did. `checkpoint` appends one line to
+    the journal with what changed since the previous checkpoint: the messages added to each role's memory, with the
+    mappings of their `instruct_content` written once per role, or the whole memory if it changed otherwise, the entries added to the environment history, spilled
+    ones included, and the remaining state of the roles, the environment and the context only when it changed. The
+    journal is compacted into a new snapshot every `compact_every` checkpoints, or once it outgrows the snapshot.
+    Journal lines carry the generation of the snapshot they apply to, so that lines left over by a crash during
+    compaction are ignored by `load`.
+    """
+
+    def __init__(self, stg_path: Path, compact_every: int = 20):
+        self.stg_path = Path(stg_path)
+        self.compact_every = compact_every
+        self.generation = 0
+        self.entries = 0  # journal lines since the snapshot
+        self._memories: dict[str, tuple[int, Optional[Message]]] = {}  # role -> (memory length, last message)
+        self._states: dict[str, str] = {}  # role, "env" or "context" -> last written state
+        self._mapping_refs: dict[str, set[str]] = {}  # role -> refs of the mappings already in the journal
+        self._history_total = 0
+
+    @property
+    def snapshot_path(self) -> Path:
+        return self.stg_path / SNAPSHOT_FILENAME
+
+    @property
+    def journal_path(self) -> Path:
+        return self.stg_path / JOURNAL_FILENAME
+
+    def snapshot(self, team: "Team"):
+        """Write the whole team and start an empty journal"""
+        self.generation += 1
+        serialized_data = team.model_dump()
+        serialized_data["context"] = team.env.context.serialize()
+        serialized_data[GENERATION_KEY] = self.generation
+        tmp_path = self.snapshot_path.with_suffix(".json.tmp")
+        write_json_file(tmp_path, serialized_data)
+        tmp_path.replace(self.snapshot_path)  # lines of the previous generation are now stale
+        self.journal_path.write_text("", encoding="utf-8")
+        self.entries = 0
+        self._track(team)
+
+    def checkpoint(self, team: "Team"):
+        """Append the changes since the last checkpoint to the journal, or compact it into a new snapshot"""
+        if not self._states or set(team.env.roles) != set(self._memories) or self._should_compact():
+            self.snapshot(team)
+            return
+
+        delta: dict[str, Any] = {"generation": self.generation, "roles": {}}
+        for key, role in team.env.roles.items():
+            role_delta = {}
+            role.rc.memory.compact()
+            messages, reset = self._new_messages(key, role.rc.memory.storage)
+            if reset:  # the whole memory, which knows what else it keeps, e.g. the cold messages of `TieredMemory`
+                role_delta["memory_state"] = role.rc.memory.model_dump()
+                self._mapping_refs[key] = set(role_delta["memory_state"].get("ic_mappings", {}))
+            elif messages:
+                role_delta["memory"] = [i.model_dump() for i in messages]
+                mappings = self._new_mappings(key, role_delta["memory"])
+                if mappings:
+                    role_delta["ic_mappings"] = mappings
+            state = role.model_dump(exclude={"rc": {"memory"}})
+            if self._changed(key, state):
+                role_delta["state"] = state
+            if role_delta:
+                delta["roles"][key] = role_delta
+
+        history = team.env.history
+        if history.total > self._history_total:
+            delta["history"] = list(history.iter_all(self._history_total))
+        self._history_total = history.total
+        env_state = team.env.model_dump(exclude={"roles", "history"})
+        if self._changed("env", env_state):
+            delta["env"] = env_state
+        context = team.env.context.serialize()
+        if self._changed("context", context):
+            delta["context"] = context
+        delta["investment"], delta["idea"] = team.investment, team.idea
+
+        with open(self.journal_path, "a", encoding="utf-8") as f:
+            f.write(json.dumps(delta, ensure_ascii=False, default=to_jsonable_python) + "\n")
+        self.entries += 1
+
+    def _should_compact(self) -> bool:
+        if self.entries >= self.compact_every:
+            return True
+        try:
+            return self.journal_path.stat().st_size > self.snapshot_path.stat().st_size
+        except FileNotFoundError:
+            return True
+
+    def _track(self, team: "Team"):
+        """Take the current state of `team` as the base of the next delta"""
+        self._memories = {}
+        self._states = {}
+        self._mapping_refs = {}
+        for key, role in team.env.roles.items():
+            role.rc.memory.compact()
+            storage = role.rc.memory.storage
+            self._memories[key] = (len(storage), storage[-1] if storage else None)
+            self._changed(key, role.model_dump(exclude={"rc": {"memory"}}))
+        self._changed("env", team.env.model_dump(exclude={"roles", "history"}))
+        self._changed("context", team.env.context.serialize())
+        self._history_total = team.env.history.total
+
+    def _new_messages(self, key: str, storage: list[Message]) -> tuple[list[Message], bool]:
+        """The messages appended since the last checkpoint, or the whole storage if it was changed otherwise"""
+        length, last = self._memories.get(key, (0, None))
+        self._memories[key] = (len(storage), storage[-1] if storage else None)
+        if len(storage) >= length and (not length or storage[length - 1] is last):
+            return storage[length:], False
+        return list(storage), True
+
+    def _new_mappings(self, key: str, messages: list[dict]) -> dict[str, dict]:
+        """Hoist the mappings out of `messages`, returning those not yet in the journal for the role"""
+        mappings = {}
+        hoist_instruct_content_mappings(messages, mappings)
+        written = self._mapping_refs.setdefault(key, set())
+        mappings = {ref: mapping for ref, mapping in mappings.items() if ref not in written}
+        written.update(mappings)
+        return mappings
+
+    def _changed(self, key: str, state: Any) -> bool:
+        text = json.dumps(state, sort_keys=True, default=to_jsonable_python)
+        if self._states.get(key) == text:
+            return False
+        self._states[key] = text
+        return True
+
+    def load(self) -> dict:
+        """Read the snapshot and replay the journal on it, returning the data to build the team with"""
+        with open(self.snapshot_path, encoding="utf-8") as f:
+            team_info = json.load(f)
+        self.generation = team_info.pop(GENERATION_KEY, 0)
+        if not self.journal_path.exists():
+            return team_info
+
+        with open(self.journal_path, encoding="utf-8") as f:
+            lines = f.readlines()
+        for i, line in enumerate(lines):
+            try:
+                delta = json.loads(line)
+            except json.JSONDecodeError:
+                if i == len(lines) - 1:  # torn by a crash while being written
+                    logger.warning(f"Ignore the incomplete last line of {self.journal_path}")
+                    break
+                raise
+            if delta.get("generation") == self.generation:
+                self._replay(team_info, delta)
+        return team_info
+
+    @staticmethod
+    def _replay(team_info: dict, delta: dict):
+        env = team_info.setdefault("env", {})
+        roles = env.setdefault("roles", {})
+        for key, role_delta in delta.get("roles", {}).items():
+            role = roles.setdefault(key, {})
+            memory = role.get("rc", {}).get("memory", {"storage": []})
+            if "state" in role_delta:
+                role.clear()
+                role.update(role_delta["state"])
+                role.setdefault("rc", {})["memory"] = memory
+            if "memory_state" in role_delta:
+                memory.clear()
+                memory.update(role_delta["memory_state"])
+                role.setdefault("rc", {})["memory"] = memory
+            if "memory" in role_delta:
+                memory.setdefault("storage", []).extend(role_delta["memory"])
+                if "ic_mappings" in role_delta:
+                    memory.setdefault("ic_mappings", {}).update(role_delta["ic_mappings"])  # inlined by `Memory`
+                role.setdefault("rc", {})["memory"] = memory
+        if "history" in delta:
+            env["history"] = env.get("history", "") + "".join(delta["history"])
+        if "env" in delta:
+            env.update(delta["env"])
+        if "context" in delta:
+            team_info["context"] = delta["context"]
+        team_info["investment"], team_info["idea"] = delta["investment"], delta["idea"]
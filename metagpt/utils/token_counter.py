@@ -10,6 +10,8 @@ ref3: https://github.com/Significant-Gravitas/Auto-GPT/blob/master/autogpt/llm/t
 ref4: https://github.com/hwchase17/langchain/blob/master/langchain/chat_models/openai.py
 ref5: https://ai.google.dev/models/gemini
 """
+from functools import lru_cache
+
 import tiktoken
 from openai.types import CompletionUsage
 from openai.types.chat import ChatCompletionChunk
@@ -259,7 +261,6 @@ TOKEN_MAX = {
     "qwen-7b-chat": 32000,
     "qwen-1.8b-longcontext-chat": 32000,
     "qwen-1.8b-chat": 8000,
-    
 }
 
 # For Amazon Bedrock US region
@@ -318,13 +319,22 @@ SPARK_TOKENS = {
 }
 
 
-def count_input_tokens(messages, model="gpt-3.5-turbo-0125"):
-    """Return the number of tokens used by a list of messages."""
+TOKEN_COUNT_CACHE_SIZE = 8192  # messages whose token count is memoized, history is re-counted on every request
+
+
+@lru_cache(maxsize=None)
+def get_encoding(model: str) -> tiktoken.Encoding:
+    """Return the tiktoken encoding of the model, resolved once per model"""
     try:
-        encoding = tiktoken.encoding_for_model(model)
+        return tiktoken.encoding_for_model(model)
     except KeyError:
         logger.info(f"Warning: model {model} not found in tiktoken. Using cl100k_base encoding.")
-        encoding = tiktoken.get_encoding("cl100k_base")
+        return tiktoken.get_encoding("cl100k_base")
+
+
+@lru_cache(maxsize=None)
+def _get_message_format(model: str) -> tuple[str, int, int]:
+    """Return (model counted as, tokens_per_message, tokens_per_name), resolved once per model"""
     if model in {
         "gpt-3.5-turbo-0613",
         "gpt-3.5-turbo-16k-0613",
@@ -346,43 +356,70 @@ def count_input_tokens(messages, model="gpt-3.5-turbo-0125"):
         "gpt-4o-2024-05-13",
         "gpt-4o",
     }:
-        tokens_per_message = 3  # # every reply is primed with <|start|>assistant<|message|>
-        tokens_per_name = 1
+        return model, 3, 1  # every reply is primed with <|start|>assistant<|message|>
     elif model == "gpt-3.5-turbo-0301":
-        tokens_per_message = 4  # every message follows <|start|>{role/name}\n{content}<|end|>\n
-        tokens_per_name = -1  # if there's a name, the role is omitted
+        # every message follows <|start|>{role/name}\n{content}<|end|>\n, if there's a name, the role is omitted
+        return model, 4, -1
     elif "gpt-3.5-turbo" == model:
         logger.info("Warning: gpt-3.5-turbo may update over time. Returning num tokens assuming gpt-3.5-turbo-0125.")
-        return count_input_tokens(messages, model="gpt-3.5-turbo-0125")
+        return _get_message_format("gpt-3.5-turbo-0125")
     elif "gpt-4" == model:
         logger.info("Warning: gpt-4 may update over time. Returning num tokens assuming gpt-4-0613.")
-        return count_input_tokens(messages, model="gpt-4-0613")
+        return _get_message_format("gpt-4-0613")
     elif "open-llm-model" == model:
         """
         For self-hosted open_llm api, they include lots of different models. The message tokens calculation is
         inaccurate. It's a reference result.
         """
-        tokens_per_message = 0  # ignore conversation message template prefix
-        tokens_per_name = 0
-    else:
-        raise NotImplementedError(
-            f"num_tokens_from_messages() is not implemented for model {model}. "
-            f"See https://cookbook.openai.com/examples/how_to_count_tokens_with_tiktoken "
-            f"for information on how messages are converted to tokens."
-        )
+        return model, 0, 0  # ignore conversation message template prefix
+    raise NotImplementedError(
+        f"num_tokens_from_messages() is not implemented for model {model}. "
+        f"See https://cookbook.openai.com/examples/how_to_count_tokens_with_tiktoken "
+        f"for information on how messages are converted to tokens."
+    )
+
+
+def _count_message_tokens(message: dict, model: str) -> int:
+    """Tokens of one message, excluding `tokens_per_message`"""
+    _, _, tokens_per_name = _get_message_format(model)
+    encoding = get_encoding(model)
+    num_tokens = 0
+    for key, value in message.items():
+        content = value
+        if isinstance(value, list):
+            # for gpt-4v
+            for item in value:
+                if isinstance(item, dict) and item.get("type") in ["text"]:
+                    content = item.get("text", "")
+        num_tokens += len(encoding.encode(content))
+        if key == "name":
+            num_tokens += tokens_per_name
+    return num_tokens
+
+
+@lru_cache(maxsize=TOKEN_COUNT_CACHE_SIZE)
+def _count_message_tokens_cached(items: tuple[tuple[str, str], ...], model: str) -> int:
+    return _count_message_tokens(dict(items), model)
+
+
+def count_message_tokens(message: dict, model: str) -> int:
+    """Tokens of one message, excluding `tokens_per_message`.
+
+    Text-only messages are memoized by content, so a conversation that grows by one message only encodes the new one.
+    """
+    items = tuple(message.items())
+    if all(isinstance(v, str) for _, v in items):
+        # str caches its own hash, so looking up an unchanged message does not re-scan its content
+        return _count_message_tokens_cached(items, model)
+    return _count_message_tokens(message, model)
+
+
+def count_input_tokens(messages, model="gpt-3.5-turbo-0125"):
+    """Return the number of tokens used by a list of messages."""
+    model, tokens_per_message, _ = _get_message_format(model)
     num_tokens = 0
     for message in messages:
-        num_tokens += tokens_per_message
-        for key, value in message.items():
-            content = value
-            if isinstance(value, list):
-                # for gpt-4v
-                for item in value:
-                    if isinstance(item, dict) and item.get("type") in ["text"]:
-                        content = item.get("text", "")
-            num_tokens += len(encoding.encode(content))
-            if key == "name":
-                num_tokens += tokens_per_name
+        num_tokens += tokens_per_message + count_message_tokens(message, model)
     num_tokens += 3  # every reply is primed with <|start|>assistant<|message|>
     return num_tokens
 
@@ -398,12 +435,7 @@ def count_output_tokens(string: str, model: str) -> int:
     Returns:
         int: The number of tokens in the text string.
     """
-    try:
-        encoding = tiktoken.encoding_for_model(model)
-    except KeyError:
-        logger.info(f"Warning: model {model} not found in tiktoken. Using cl100k_base encoding.")
-        encoding = tiktoken.get_encoding("cl100k_base")
-    return len(encoding.encode(string))
+    return len(get_encoding(model).encode(string))
 
 
 def get_max_completion_tokens(messages: list[dict], model: str, default: int) -> int:
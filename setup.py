@@ -87,6 +87,7 @@ extras_require["test"] = [
     "grpcio-status==1.48.2",
     "pylint==3.0.3",
     "pybrowsers",
+    "fakeredis~=2.20",
 ]
 
 extras_require["pyppeteer"] = [
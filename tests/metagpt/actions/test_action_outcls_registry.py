@@ -2,9 +2,12 @@
 # -*- coding: utf-8 -*-
 # @Desc   : unittest of action_outcls_registry
 
-from typing import List
+from typing import List, Optional
+
+from pydantic import Field
 
 from metagpt.actions.action_node import ActionNode
+from metagpt.actions.action_outcls_registry import action_outcls_registry
 
 
 def test_action_outcls_registry():
@@ -44,3 +47,21 @@ def test_action_outcls_registry():
     outcls6 = ActionNode.create_model_class(class_name, out_mapping)
     outinst6 = outcls6(**out_data2)
     assert outinst5 == outinst6
+
+
+def test_action_outcls_registry_lru():
+    maxsize = action_outcls_registry.maxsize
+    action_outcls_registry.maxsize = 2
+    try:
+        nested = {"inner": (Optional[str], Field(default=None))}
+        outcls = ActionNode.create_model_class("lru0", {"field": (str, ...), "nested": nested})
+        assert ActionNode.create_model_class("lru0", {"nested": dict(nested), "field": (str, ...)}) is outcls
+
+        evictions = action_outcls_registry.evictions
+        ActionNode.create_model_class("lru1", {"field": (str, ...)})
+        ActionNode.create_model_class("lru2", {"field": (str, ...)})
+        assert len(action_outcls_registry) == 2
+        assert action_outcls_registry.evictions > evictions
+        assert ActionNode.create_model_class("lru0", {"field": (str, ...), "nested": nested}) is not outcls
+    finally:
+        action_outcls_registry.maxsize = maxsize
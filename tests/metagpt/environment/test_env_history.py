@@ -0,0 +1,44 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+# @Desc   : the unittest of EnvHistory
+
+from metagpt.environment import Environment
+from metagpt.environment.env_history import EnvHistory
+from metagpt.schema import Message
+
+
+def test_env_history_bounded(tmp_path):
+    spill_path = tmp_path / "history.jsonl"
+    history = EnvHistory(max_entries=2, spill_path=spill_path)
+    for i in range(5):
+        history.add(Message(content=f"msg {i}\nsecond line"))
+    history.close()
+
+    assert len(history) == 2
+    assert str(history) == "\nuser: msg 3\nsecond line\nuser: msg 4\nsecond line"
+    assert list(history.iter_all()) == [f"\nuser: msg {i}\nsecond line" for i in range(5)]
+
+    assert list(EnvHistory(max_entries=2).iter_all()) == []
+
+
+def test_env_history_serdeser():
+    env = Environment(history="\nuser: saved by an older version")
+    env.publish_message(Message(content="new"))
+    assert str(env.history) == "\nuser: saved by an older version\nuser: new"
+
+    data = env.model_dump()
+    assert data["history"] == str(env.history)
+    assert Environment(**data).history == env.history
+
+
+def test_env_history_spilled_by_default():
+    env = Environment(history=EnvHistory(max_entries=2))
+    for i in range(5):
+        env.publish_message(Message(content=f"msg {i}"))
+    env.close()
+
+    full = "".join(f"\nuser: msg {i}" for i in range(5))
+    assert str(env.history) == "\nuser: msg 3\nuser: msg 4"
+    assert env.history.text() == env.model_dump()["history"] == full
+    env.publish_message(Message(content="msg 5"))  # still usable once closed
+    assert env.history.text() == full + "\nuser: msg 5"
@@ -0,0 +1,61 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+# @Desc   : the unittest of RoleScheduler
+
+import pytest
+
+from metagpt.environment import Environment
+from metagpt.roles import Role
+from metagpt.schema import Message
+
+
+class CountingRole(Role):
+    runs: list[int] = []
+
+    async def run(self, with_message=None):
+        self.runs.append(self.rc.env.scheduler.round)
+        self.rc.msg_buffer.pop_all()
+
+
+def make_env(n: int, **kwargs) -> tuple[Environment, list[CountingRole]]:
+    env = Environment()
+    roles = [CountingRole(name=f"role{i}", profile=f"profile{i}", runs=[]) for i in range(n)]
+    env.add_roles(roles)
+    for key, value in kwargs.items():
+        setattr(env.scheduler, key, value)
+    return env, roles
+
+
+@pytest.mark.asyncio
+async def test_scheduler_runs_only_woken_roles():
+    env, roles = make_env(5)
+    await env.run()
+    assert all(not i.runs for i in roles)
+
+    env.publish_message(Message(content="hi", send_to="role1"))
+    roles[3].put_message(Message(content="direct"))
+    await env.run(k=2)
+    assert [len(i.runs) for i in roles] == [0, 1, 0, 1, 0]
+    assert env.scheduler.wakeups == 2
+    assert env.scheduler.idle_wakeups_avoided == 13
+
+    env.wake_up(roles[4], rounds=2)
+    await env.run(k=3)
+    assert roles[4].runs == [env.scheduler.round - 1]
+
+
+@pytest.mark.asyncio
+async def test_scheduler_priority_and_fairness():
+    env, roles = make_env(3, max_concurrency=1)
+    roles[0].priority = 2
+    for _ in range(4):
+        for role in roles:
+            role.put_message(Message(content="work"))
+        await env.run()
+    assert [len(i.runs) for i in roles] == [2, 1, 1]  # the others are not starved
+
+    env, roles = make_env(3)
+    env.add_role(roles[1])
+    roles[2].put_message(Message(content="work"))
+    roles[0].put_message(Message(content="work"))
+    assert env._get_ready_roles() == [roles[2], roles[0]]
@@ -8,9 +8,11 @@
 
 import pytest
 
+from metagpt.configs.redis_config import RedisConfig
 from metagpt.llm import LLM
 from metagpt.memory.brain_memory import BrainMemory
 from metagpt.schema import Message
+from metagpt.utils.redis import Redis
 
 
 @pytest.mark.asyncio
@@ -66,5 +68,45 @@ async def test_memory_llm(llm):
     assert memory.history or memory.historical_summary
 
 
+@pytest.mark.asyncio
+@pytest.mark.parametrize("compress", [False, True])
+async def test_memory_delta_dumps(mocker, compress):
+    fake_aioredis = pytest.importorskip("fakeredis.aioredis")
+    server = fake_aioredis.FakeRedis()
+
+    async def from_url(*args, **kwargs):
+        return server
+
+    mocker.patch("aioredis.from_url", from_url)
+    mocker.patch(
+        "metagpt.memory.brain_memory.config.redis",
+        RedisConfig(host="fake", port=0, password="", db="0", compress=compress),
+    )
+    spy = mocker.spy(Redis, "execute")
+    redis_key = BrainMemory.to_redis_key("test", "user_id", "chat_id")
+
+    memory = BrainMemory()
+    memory.add_talk(Message(content="talk 0", id="1"))
+    await memory.dumps(redis_key=redis_key)  # snapshot
+    for i in range(2, 5):
+        memory.add_answer(Message(content=f"answer {i}", id=str(i)))
+        await memory.dumps(redis_key=redis_key)  # history entries appended
+    assert [i.args[1][0] for i in spy.call_args_list] == ["set", "rpush", "rpush", "rpush"]
+    assert await server.llen(BrainMemory.history_key(redis_key)) == 3
+    assert (await server.get(redis_key)).startswith(b"\x00zlib:") == compress
+
+    loaded = await BrainMemory.loads(redis_key=redis_key)
+    assert [i.content for i in loaded.history] == [i.content for i in memory.history]
+    assert loaded.last_history_id == "4"
+
+    loaded.historical_summary = "summary"
+    loaded.add_talk(Message(content="talk 5", id="5"))
+    await loaded.dumps(redis_key=redis_key)  # other fields changed, rewritten as a new snapshot
+    assert spy.call_args_list[-1].args[1][0] == "set"
+    assert await server.llen(BrainMemory.history_key(redis_key)) == 0
+    assert (await BrainMemory.loads(redis_key=redis_key)).historical_summary == "summary"
+    await Redis.close_all()
+
+
 if __name__ == "__main__":
     pytest.main([__file__, "-s"])
@@ -2,7 +2,12 @@
 # -*- coding: utf-8 -*-
 # @Desc   : the unittest of Memory
 
-from metagpt.actions import UserRequirement
+import json
+
+import pytest
+
+from metagpt.actions import UserRequirement, WriteDesign, WritePRD
+from metagpt.actions.action_node import ActionNode
 from metagpt.memory.memory import Memory
 from metagpt.schema import Message
 
@@ -55,3 +60,116 @@ def test_memory():
     memory.clear()
     assert memory.count() == 0
     assert len(memory.index) == 0
+
+
+def test_memory_indexes():
+    memory = Memory()
+    msg1 = Message(content="design", role="Architect", cause_by=WriteDesign, sent_from="Bob", send_to={"Alex"})
+    msg2 = Message(content="prd", role="Product Manager", cause_by=WritePRD, sent_from="Alice", send_to={"Bob", "Alex"})
+    msg3 = Message(content="design v2", role="Architect", cause_by=WriteDesign, sent_from="Bob")
+    memory.add_batch([msg1, msg2, msg3, msg1, msg1.model_copy()])
+    assert memory.count() == 3
+    assert msg2 in memory and Message(content="prd") not in memory
+
+    assert memory.filter(role="Architect") == [msg1, msg3]
+    assert memory.filter(cause_by=WriteDesign, send_to="Alex") == [msg1]
+    assert memory.filter(send_to="Alex") == [msg1, msg2]
+    assert memory.filter(sent_from="Carol") == []
+    assert memory.filter() == [msg1, msg2, msg3]
+
+    memory.delete(msg1.model_copy())  # found by id
+    assert memory.get() == [msg2, msg3]
+    assert memory.filter(role="Architect") == [msg3]
+    assert memory.get_by_action(WriteDesign) == [msg3]
+    with pytest.raises(ValueError):
+        memory.delete(msg1)
+
+    memory.storage.append(msg1)  # changed behind the memory, the indexes catch up
+    assert memory.filter(sent_from="Bob") == [msg3, msg1]
+    assert memory.find_news([msg1, Message(content="new")])[0].content == "new"
+
+
+def test_memory_delete_lazily():
+    memory = Memory()
+    messages = [Message(content=str(i), cause_by=WritePRD) for i in range(10)]
+    memory.add_batch(messages)
+    for i in messages[:4]:
+        memory.delete(i)
+    assert len(memory.storage) == 10  # tombstones, nothing is scanned yet
+    assert memory.count() == 6 and messages[0] not in memory
+    assert memory.filter(cause_by=WritePRD) == messages[4:]
+
+    memory.add(messages[0])  # added again before the compaction
+    assert memory.get() == messages[4:] + messages[:1]
+    assert memory.get_by_action(WritePRD) == messages[4:] + messages[:1]
+
+    for i in messages[4:8]:
+        memory.delete(i)
+    assert memory.storage == [messages[8], messages[9], messages[0]]  # compacted once half of it is deleted
+
+
+def test_memory_storage_replaced():
+    memory = Memory()
+    messages = [Message(content=str(i), cause_by=WritePRD) for i in range(4)]
+    memory.add_batch(messages[:2])
+    assert memory.get_by_action(WritePRD) == messages[:2]
+
+    memory.storage = messages[2:]  # same length, other messages
+    assert memory.get_by_action(WritePRD) == messages[2:]
+    assert messages[0] not in memory and messages[2] in memory
+
+    memory.storage.reverse()  # same list and length, reordered
+    assert memory.get_by_action(WritePRD) == [messages[3], messages[2]]
+    assert memory.get(k=1) == [messages[2]]
+
+    memory.delete(messages[3])
+    memory.storage.append(messages[0])  # appended behind a pending deletion
+    memory.compact()
+    assert memory.get() == [messages[2], messages[0]]
+    assert memory.get_by_action(WritePRD) == [messages[2], messages[0]]
+
+
+def test_memory_ignore_id():
+    memory = Memory(ignore_id=True)
+    memory.add_batch([Message(content="a"), Message(content="b"), Message(content="a")])
+    assert [i.content for i in memory.get()] == ["a", "b"]
+    memory.delete(Message(content="a"))
+    assert [i.content for i in memory.get()] == ["b"]
+
+
+@pytest.mark.parametrize(
+    "query",
+    ["message", "ess", "test message", "st mess", "message1", "-2 x", "snake game", " snake", "game.", "!", "", "zzz"],
+)
+def test_memory_content_index(query):
+    contents = ["test message1", "test message-2 x", "a snake game.", "snakes", "game! test messages"]
+    memory, indexed = Memory(), Memory(index_content=True)
+    for content in contents:
+        memory.add(Message(content=content))
+        indexed.add(Message(content=content))
+    indexed.delete(indexed.get()[1])
+    memory.delete(memory.get()[1])
+    indexed.add(Message(content="test message-2 x"))
+    memory.add(Message(content="test message-2 x"))
+
+    expected = [i.content for i in memory.get_by_content(query)]
+    assert [i.content for i in indexed.get_by_content(query)] == expected
+    assert [i.content for i in indexed.try_remember(query)] == expected
+
+    memory.index_content = True  # indexed on first use
+    assert [i.content for i in memory.get_by_content(query)] == expected
+
+
+def test_memory_ic_mappings():
+    ic_class = ActionNode.create_model_class("prd_ic", {"Goals": (list[str], ...)})
+    memory = Memory()
+    memory.add_batch(
+        [Message(content=f"prd {i}", instruct_content=ic_class(Goals=[str(i)]), cause_by=WritePRD) for i in range(3)]
+    )
+
+    data = json.loads(memory.model_dump_json())
+    assert list(data["ic_mappings"].values()) == [{"Goals": "(list[str], Ellipsis)"}]
+    assert all("mapping" not in i["instruct_content"] for i in data["storage"])
+    new_memory = Memory.model_validate(data)
+    assert new_memory == memory
+    assert new_memory.get_by_action(WritePRD)[2].instruct_content.Goals == ["2"]
@@ -0,0 +1,76 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+# @Desc   : the unittest of TieredMemory
+
+import pytest
+
+from metagpt.actions import UserRequirement, WriteDesign, WritePRD
+from metagpt.memory.memory import Memory
+from metagpt.memory.tiered_memory import TieredMemory
+from metagpt.schema import AIMessage, Message, UserMessage
+
+
+def make_messages(n: int) -> list[Message]:
+    actions = [WritePRD, WriteDesign, UserRequirement]
+    return [
+        Message(content=f"message {i}", role=f"role{i % 2}", cause_by=actions[i % 3], sent_from="Alice")
+        for i in range(n)
+    ]
+
+
+@pytest.mark.parametrize("cold_path", [None, "cold.db"])
+def test_tiered_memory_same_as_memory(tmp_path, cold_path):
+    messages = make_messages(50)
+    memory = Memory()
+    tiered = TieredMemory(hot_size=10, cold_path=tmp_path / cold_path if cold_path else None)
+    memory.add_batch(messages)
+    tiered.add_batch(messages + messages[:5])  # duplicates in the cold store are skipped
+
+    assert len(tiered.storage) <= 10
+    assert tiered.count() == memory.count() == 50
+    assert tiered.get() == memory.get()
+    for k in (1, 10, 11, 30, 100):
+        assert tiered.get(k) == memory.get(k)
+    assert tiered.get_by_role("role1") == memory.get_by_role("role1")
+    assert tiered.get_by_action(WritePRD) == memory.get_by_action(WritePRD)
+    assert tiered.get_by_actions({WritePRD, WriteDesign}) == memory.get_by_actions({WritePRD, WriteDesign})
+    assert tiered.try_remember("message 1") == memory.try_remember("message 1")
+    observed = messages[:3] + messages[-3:] + make_messages(1)
+    assert tiered.find_news(observed) == memory.find_news(observed) == observed[-1:]
+
+    tiered.delete(messages[0])
+    tiered.delete(messages[-1])
+    assert messages[0] not in tiered and messages[-1] not in tiered
+    assert tiered.count() == 48
+    with pytest.raises(ValueError):
+        tiered.delete(messages[0])
+
+    tiered.clear()
+    assert tiered.count() == 0 and tiered.get() == []
+    tiered.close()
+
+
+def test_tiered_memory_reopen(tmp_path):
+    messages = make_messages(20)
+    tiered = TieredMemory(hot_size=5, cold_path=tmp_path / "cold.db")
+    tiered.add_batch(messages)
+    hot = tiered.storage
+    tiered.close()
+
+    reopened = TieredMemory(hot_size=5, cold_path=tmp_path / "cold.db", storage=hot)
+    assert reopened.get() == messages
+    assert reopened.delete_newest() == messages[-1]
+
+
+def test_tiered_memory_serdeser():
+    messages = [UserMessage(content="requirement"), AIMessage(content="answer")] + make_messages(10)
+    tiered = TieredMemory(hot_size=5)
+    tiered.add_batch(messages)
+    assert tiered.get_history() == messages[-5:]  # the cold store is not read back for the actions
+    assert [type(i) for i in tiered.get(12)[:2]] == [UserMessage, AIMessage]
+
+    data = tiered.model_dump()
+    assert len(data["storage"]) == 12  # the anonymous cold store is serialized too
+    loaded = TieredMemory.model_validate(data)
+    assert len(loaded.storage) == 5
+    assert [i.id for i in loaded.get()] == [i.id for i in messages]
@@ -10,6 +10,7 @@ from openai.types.chat import ChatCompletion, ChatCompletionChunk
 from openai.types.chat.chat_completion_chunk import Choice, ChoiceDelta
 
 from metagpt.provider.ark_api import ArkLLM
+from metagpt.utils.cost_manager import CostManager
 from tests.metagpt.provider.mock_llm_config import mock_llm_config_ark
 from tests.metagpt.provider.req_resp_const import (
     get_openai_chat_completion,
@@ -56,9 +57,16 @@ ark_resp_chunk_finish = create_chat_completion_chunk(content=resp_cont, finish_r
 ark_resp_chunk_last = create_chat_completion_chunk(content="", choices=[])
 
 
-async def chunk_iterator(chunks: List[ChatCompletionChunk]) -> AsyncIterator[ChatCompletionChunk]:
-    for chunk in chunks:
-        yield chunk
+class ChunkStream:
+    def __init__(self, chunks: List[ChatCompletionChunk]):
+        self.chunks = chunks
+
+    async def __aiter__(self) -> AsyncIterator[ChatCompletionChunk]:
+        for chunk in self.chunks:
+            yield chunk
+
+    async def close(self):
+        pass
 
 
 async def mock_ark_acompletions_create(
@@ -66,7 +74,7 @@ async def mock_ark_acompletions_create(
 ) -> Union[ChatCompletionChunk, ChatCompletion]:
     if stream:
         chunks = [ark_resp_chunk, ark_resp_chunk_finish, ark_resp_chunk_last]
-        return chunk_iterator(chunks)
+        return ChunkStream(chunks)
     else:
         return default_resp
 
@@ -83,3 +91,13 @@ async def test_ark_acompletion(mocker):
     assert resp.usage == USAGE
 
     await llm_general_chat_funcs_test(llm, prompt, messages, resp_cont)
+
+
+@pytest.mark.asyncio
+async def test_ark_aask_stream_costs(mocker):
+    mocker.patch("openai.resources.chat.completions.AsyncCompletions.create", mock_ark_acompletions_create)
+
+    llm = ArkLLM(mock_llm_config_ark)
+    llm.cost_manager = CostManager()
+    assert await llm.aask_stream(prompt).read() == resp_cont
+    assert llm.cost_manager.total_prompt_tokens == USAGE["prompt_tokens"]  # the usage of the last chunk
@@ -6,11 +6,14 @@
 @File    : test_base_llm.py
 """
 
+import asyncio
+
 import pytest
 
 from metagpt.configs.llm_config import LLMConfig
 from metagpt.provider.base_llm import BaseLLM
 from metagpt.schema import Message
+from metagpt.utils.cost_manager import CostManager
 from tests.metagpt.provider.mock_llm_config import mock_llm_config
 from tests.metagpt.provider.req_resp_const import (
     default_resp_cont,
@@ -104,3 +107,141 @@ async def test_async_base_llm():
 
     # resp = await base_llm.aask_code([prompt])
     # assert resp == default_resp_cont
+
+
+@pytest.mark.asyncio
+async def test_base_llm_response_cache(tmp_path):
+    config = mock_llm_config.model_copy(
+        update={"response_cache": True, "response_cache_path": str(tmp_path / "cache.db")}
+    )
+    base_llm = MockBaseLLM(config)
+    messages = [{"role": "user", "content": prompt}]
+
+    resp = await base_llm._acompletion_text_with_cache(messages)
+    assert resp == default_resp_cont
+    assert base_llm.response_cache.misses == 1
+
+    base_llm.acompletion_text = None  # served by cache without calling the provider
+    resp = await base_llm._acompletion_text_with_cache(messages, stream=True)
+    assert resp == default_resp_cont
+    assert base_llm.response_cache.hits == 1
+
+    assert MockBaseLLM().response_cache is None
+
+
+@pytest.mark.asyncio
+async def test_base_llm_coalesce_requests():
+    calls = 0
+
+    class SlowLLM(MockBaseLLM):
+        async def acompletion_text(self, messages: list[dict], stream=False, timeout=3) -> str:
+            nonlocal calls
+            calls += 1
+            call_id = calls
+            await asyncio.sleep(0.05)
+            self._update_costs({"prompt_tokens": 10, "completion_tokens": 5}, "gpt-4")
+            return f"{default_resp_cont} {call_id}"
+
+    messages = [{"role": "user", "content": prompt}]
+    config = mock_llm_config.model_copy(update={"coalesce_requests": True})
+    llm1, llm2, llm3 = SlowLLM(config), SlowLLM(config), SlowLLM(config)
+    llm1.cost_manager, llm2.cost_manager = CostManager(), CostManager()
+    llm3.cost_manager = llm1.cost_manager
+    rsps = await asyncio.gather(
+        llm1._acompletion_text_with_cache(messages),
+        llm2._acompletion_text_with_cache(messages),
+        llm3._acompletion_text_with_cache(messages),
+        llm1._acompletion_text_with_cache(messages, stream=True),
+        llm1._acompletion_text_with_cache([{"role": "user", "content": "another prompt"}]),
+    )
+    assert calls == 3
+    assert rsps[0] == rsps[1] == rsps[2] != rsps[3] != rsps[4]
+    assert llm1.single_flight.shared_count == 2
+    assert len(llm1.single_flight) == 0
+    # the caller sharing the request is charged, but not twice to the same cost manager
+    assert llm2.cost_manager.total_prompt_tokens == 10
+    assert llm1.cost_manager.total_prompt_tokens == 30
+
+    # finished requests are not shared
+    assert await llm1._acompletion_text_with_cache(messages) != rsps[0]
+    assert SlowLLM(config.model_copy(update={"temperature": 0.7})).single_flight is None
+    assert SlowLLM().single_flight is None  # off by default
+
+
+class StreamLLM(MockBaseLLM):
+    chunks = ["[CONTENT]\n{", '"a": 1}\n[/CON', "TENT]\ntrailing", " tokens"]
+
+    def __init__(self, config: LLMConfig = None):
+        super().__init__(config)
+        self.calls, self.read = 0, 0
+
+    async def _achat_completion_iter(self, messages: list[dict], timeout=3):
+        self.calls += 1
+        for chunk in self.chunks:
+            await asyncio.sleep(0.01)
+            self.read += 1
+            yield chunk
+
+
+@pytest.mark.asyncio
+async def test_base_llm_stream_stop_cached(tmp_path):
+    config = mock_llm_config.model_copy(
+        update={"response_cache": True, "response_cache_path": str(tmp_path / "cache.db")}
+    )
+    llm = StreamLLM(config)
+    stream = llm.aask_stream(prompt, stop="[/CONTENT]")
+    assert await stream.read() == '[CONTENT]\n{"a": 1}\n[/CONTENT]'
+    assert llm.read == 3  # the last chunk is never requested
+
+    stream = llm.aask_stream(prompt, stop="[/CONTENT]")
+    assert await stream.read() == '[CONTENT]\n{"a": 1}\n[/CONTENT]'
+    assert llm.calls == 1
+    # a reply cut at `stop` serves neither other stops nor `aask`
+    assert await llm.aask_stream(prompt).read() == "".join(StreamLLM.chunks)
+    assert llm.calls == 2
+
+
+@pytest.mark.asyncio
+async def test_base_llm_stream_coalesced():
+    llm = StreamLLM(mock_llm_config.model_copy(update={"coalesce_requests": True}))
+    first = llm.aask_stream(prompt, stop="[/CONTENT]")
+    texts = await asyncio.gather(first.read(), llm.aask_stream(prompt).read(), llm.aask(prompt))
+    assert llm.calls == 1
+    assert first.stopped
+    assert texts[1] == texts[2] == "".join(StreamLLM.chunks)  # read on for the callers sharing it
+    assert len(llm.single_flight) == 0
+
+
+@pytest.mark.asyncio
+async def test_base_llm_stream_by_aask(mocker):
+    mocker.patch("metagpt.provider.base_llm.BaseLLM.aask", return_value="mocked")
+    llm = StreamLLM()
+    assert await llm.aask_stream(prompt).read() == "".join(StreamLLM.chunks)
+    mocker.patch.object(StreamLLM, "stream_by_aask", True)
+    assert await llm.aask_stream(prompt).read() == "mocked"
+    assert llm.calls == 1
+
+
+@pytest.mark.asyncio
+async def test_base_llm_aask_many(mocker):
+    in_flight, peak = 0, 0
+
+    async def mock_aask(self, msg, system_msgs=None, timeout=3, stream=None):
+        nonlocal in_flight, peak
+        in_flight += 1
+        peak = max(peak, in_flight)
+        await asyncio.sleep(0.01 * (5 - int(msg)))  # later prompts finish first
+        in_flight -= 1
+        if msg == "3":
+            raise ValueError(msg)
+        return f"rsp {msg}"
+
+    mocker.patch("metagpt.provider.base_llm.BaseLLM.aask", mock_aask)
+    base_llm = MockBaseLLM()
+    rsp = await base_llm.aask_many([str(i) for i in range(5)], max_concurrency=2)
+    assert peak == 2
+    assert rsp[:3] == ["rsp 0", "rsp 1", "rsp 2"] and rsp[4] == "rsp 4"
+    assert isinstance(rsp[3], ValueError)
+
+    with pytest.raises(ValueError):
+        await base_llm.aask_many([str(i) for i in range(5)], return_exceptions=False)
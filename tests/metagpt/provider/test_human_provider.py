@@ -30,3 +30,12 @@ async def test_async_human_provider(mocker):
 
     resp = await human_provider.acompletion_text([])
     assert resp == ""
+
+
+@pytest.mark.asyncio
+async def test_human_provider_aask_stream(mocker):
+    mocker.patch("builtins.input", lambda _: "[CONTENT]\n{}\n[/CONTENT]")
+    human_provider = HumanProvider(mock_llm_config)
+
+    stream = human_provider.aask_stream("hello", stop="[/CONTENT]")
+    assert await stream.read() == "[CONTENT]\n{}\n[/CONTENT]"
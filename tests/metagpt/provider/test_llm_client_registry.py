@@ -0,0 +1,46 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+# @Desc   : the unittest of llm_client_registry
+
+import pytest
+
+from metagpt.provider import AzureOpenAILLM, OpenAILLM
+from metagpt.provider.llm_client_registry import LLMClientRegistry
+from metagpt.utils.cost_manager import CostManager
+from tests.metagpt.provider.mock_llm_config import (
+    mock_llm_config,
+    mock_llm_config_azure,
+    mock_llm_config_proxy,
+)
+
+
+def test_registry_key_and_bucket():
+    registry = LLMClientRegistry()
+    first = registry.get_client(mock_llm_config, object)
+    assert registry.get_client(mock_llm_config, object) is first
+    assert registry.get_client(mock_llm_config_proxy, object) is not first
+    assert registry.get_client(mock_llm_config, object, namespace="other") is not first
+    assert registry.get_client(mock_llm_config, object, extra_fields=("model",)) is not first
+    assert len(registry) == 4
+
+    assert registry.remove(mock_llm_config) is first
+    assert registry.get_client(mock_llm_config, object) is not first
+    registry.clear()
+    assert len(registry) == 0
+
+
+@pytest.mark.asyncio
+async def test_openai_client_shared():
+    llm1 = OpenAILLM(mock_llm_config)
+    llm2 = OpenAILLM(mock_llm_config)
+    llm1.cost_manager = CostManager()
+    llm2.cost_manager = CostManager()
+
+    assert llm1.aclient is llm2.aclient
+    assert llm1.cost_manager is not llm2.cost_manager
+    assert OpenAILLM(mock_llm_config_proxy).aclient is not llm1.aclient
+    assert AzureOpenAILLM(mock_llm_config_azure).aclient is not llm1.aclient
+
+    llm2.aclient = "private client"
+    assert llm2.aclient == "private client"
+    assert llm1.aclient is not llm2.aclient
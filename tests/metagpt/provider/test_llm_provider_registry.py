@@ -0,0 +1,43 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+# @Desc   : the unittest of llm_provider_registry
+
+import subprocess
+import sys
+
+import pytest
+
+import metagpt.provider
+from metagpt.configs.llm_config import LLMType
+from metagpt.provider.llm_provider_registry import LLM_PROVIDER_MODULES, LLM_REGISTRY
+
+SDK_MODULES = [
+    "google.generativeai",
+    "zhipuai",
+    "dashscope",
+    "boto3",
+    "anthropic",
+    "qianfan",
+    "volcenginesdkarkruntime",
+]
+
+
+def test_provider_modules():
+    assert set(LLM_PROVIDER_MODULES) == set(LLMType)
+    assert LLM_REGISTRY.get_provider(LLMType.CLAUDE) is metagpt.provider.AnthropicLLM
+    assert LLM_REGISTRY.get_provider(LLMType.MOONSHOT) is metagpt.provider.OpenAILLM
+    with pytest.raises(AttributeError):
+        metagpt.provider.UnknownLLM
+
+
+def test_sdks_not_imported_until_requested():
+    code = (
+        "import sys\n"
+        "import metagpt.roles\n"
+        "from metagpt.configs.llm_config import LLMConfig\n"
+        "from metagpt.provider.llm_provider_registry import create_llm_instance\n"
+        "create_llm_instance(LLMConfig(api_key='mock'))\n"
+        f"print([i for i in {SDK_MODULES} if i in sys.modules])\n"
+    )
+    output = subprocess.run([sys.executable, "-c", code], capture_output=True, text=True, check=True).stdout
+    assert output.strip().splitlines()[-1] == "[]"
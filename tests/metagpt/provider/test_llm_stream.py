@@ -0,0 +1,82 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+# @Desc   : the unittest of llm_stream
+
+import pytest
+from openai.types.chat import ChatCompletionChunk
+from openai.types.chat.chat_completion_chunk import Choice, ChoiceDelta
+
+from metagpt.provider import OpenAILLM
+from metagpt.provider.llm_stream import LLMStream
+from tests.metagpt.provider.mock_llm_config import mock_llm_config
+
+CHUNKS = ["[CONTENT]\n{", '"a": 1}\n[/CON', "TENT]\ntrailing", " tokens"]
+
+
+@pytest.mark.asyncio
+async def test_llm_stream_stop():
+    closed = False
+
+    async def chunks():
+        nonlocal closed
+        try:
+            for i in CHUNKS:
+                yield i
+        finally:
+            closed = True
+
+    stream = LLMStream(chunks(), stop="[/CONTENT]")
+    received = [i async for i in stream]
+    assert received == CHUNKS[:2] + ["TENT]"]
+    assert stream.text == '[CONTENT]\n{"a": 1}\n[/CONTENT]'
+    assert stream.stopped and closed
+    assert stream.ttft is not None
+
+    stream = LLMStream(chunks())
+    assert await stream.read() == "".join(CHUNKS)
+    assert not stream.stopped
+
+
+@pytest.mark.asyncio
+async def test_openai_aask_stream(mocker):
+    read, closed = 0, False
+
+    class Response:
+        async def __aiter__(self):
+            nonlocal read
+            for i, content in enumerate(CHUNKS):
+                read += 1
+                yield ChatCompletionChunk(
+                    id="cmpl-xx",
+                    model="xx/xxx",
+                    object="chat.completion.chunk",
+                    created=1703300855,
+                    choices=[
+                        Choice(
+                            delta=ChoiceDelta(content=content),
+                            finish_reason="stop" if i == len(CHUNKS) - 1 else None,
+                            index=0,
+                        )
+                    ],
+                )
+
+        async def close(self):
+            nonlocal closed
+            closed = True
+
+    async def mock_create(self, stream: bool = False, **kwargs):
+        assert stream
+        return Response()
+
+    mocker.patch("openai.resources.chat.completions.AsyncCompletions.create", mock_create)
+    llm = OpenAILLM(mock_llm_config)
+    update_costs = mocker.spy(llm, "_update_costs")
+
+    stream = llm.aask_stream("hello", stop="[/CONTENT]")
+    content = await stream.read()
+    assert content.endswith("[/CONTENT]")
+    assert read == 3  # the last chunk is never requested
+    assert closed
+    update_costs.assert_called_once()
+
+    assert await llm.aask("hello") == "".join(CHUNKS)
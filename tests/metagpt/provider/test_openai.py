@@ -1,3 +1,5 @@
+import json
+
 import pytest
 from openai.types.chat import (
     ChatCompletion,
@@ -147,6 +149,9 @@ async def mock_openai_acompletions_create(self, stream: bool = False, **kwargs)
             async def __aiter__(self):
                 yield default_resp_chunk
 
+            async def close(self):
+                pass
+
         return Iterator()
     else:
         return default_resp
@@ -164,3 +169,41 @@ async def test_openai_acompletion(mocker):
     assert resp.usage == usage
 
     await llm_general_chat_funcs_test(llm, prompt, messages, resp_cont)
+
+
+@pytest.mark.asyncio
+async def test_openai_batch(mocker):
+    from types import SimpleNamespace
+
+    llm = OpenAILLM(mock_llm_config)
+    requests = llm.to_batch_requests(["hello", "world"], system_msgs=["You are a poet."])
+    assert [i["custom_id"] for i in requests] == ["0", "1"]
+    assert requests[1]["body"]["messages"][-1] == {"role": "user", "content": "world"}
+    assert "timeout" not in requests[1]["body"]
+
+    aclient = mocker.MagicMock()
+    aclient.files.create = mocker.AsyncMock(return_value=SimpleNamespace(id="file-in"))
+    aclient.batches.create = mocker.AsyncMock(return_value=SimpleNamespace(id="batch-1"))
+    llm.aclient = aclient
+    assert await llm.acreate_batch(["hello", "world"]) == "batch-1"
+    assert aclient.files.create.call_args.kwargs["purpose"] == "batch"
+
+    batch = SimpleNamespace(
+        status="in_progress", output_file_id=None, error_file_id=None, errors=None, request_counts=None
+    )
+    aclient.batches.retrieve = mocker.AsyncMock(return_value=batch)
+    assert await llm.aretrieve_batch("batch-1") is None
+
+    output = {
+        "custom_id": "1",
+        "response": {"status_code": 200, "body": default_resp.model_dump()},
+        "error": None,
+    }
+    error = {"custom_id": "0", "response": {"status_code": 400, "body": {"error": "bad"}}, "error": None}
+    batch.status, batch.output_file_id, batch.error_file_id = "completed", "file-out", "file-err"
+    batch.request_counts = SimpleNamespace(total=2)
+    contents = {"file-out": json.dumps(output), "file-err": json.dumps(error)}
+    aclient.files.content = mocker.AsyncMock(side_effect=lambda i: SimpleNamespace(text=contents[i]))
+    rsp = await llm.aretrieve_batch("batch-1")
+    assert isinstance(rsp[0], RuntimeError)
+    assert rsp[1] == resp_cont
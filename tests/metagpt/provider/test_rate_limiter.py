@@ -0,0 +1,128 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+# @Desc   : the unittest of rate_limiter
+
+import asyncio
+import json
+
+import aiohttp.web
+import pytest
+from openai import AsyncOpenAI
+
+from metagpt.provider import OpenAILLM
+from metagpt.provider.rate_limiter import (
+    LLMRateLimiter,
+    TokenBucket,
+    get_retry_after,
+    is_rate_limit_error,
+    report_usage,
+)
+from tests.metagpt.provider.mock_llm_config import mock_llm_config
+from tests.metagpt.provider.req_resp_const import get_openai_chat_completion, messages
+
+
+def test_token_bucket():
+    bucket = TokenBucket(60)
+    assert bucket.wait_time(60) == 0
+    bucket.consume(60)
+    assert 0.9 < bucket.wait_time(1) <= 1
+    assert bucket.wait_time(1000) > 59  # larger than capacity waits for a full bucket
+    bucket.refund(30)
+    assert bucket.wait_time(30) == 0
+
+
+def test_rate_limit_error():
+    class RateLimitError(Exception):
+        headers = {"retry-after-ms": "1500"}
+
+    error = RateLimitError()
+    assert is_rate_limit_error(error)
+    assert get_retry_after(error) == 1.5
+    assert not is_rate_limit_error(ValueError())
+    assert get_retry_after(ValueError()) is None
+
+
+def test_limiter_shared_by_model_and_limits():
+    config = mock_llm_config.model_copy(update={"rpm": 60})
+    limiter = OpenAILLM(config).rate_limiter
+    assert OpenAILLM(config).rate_limiter is limiter
+    assert OpenAILLM(config.model_copy(update={"model": "other-model"})).rate_limiter is not limiter
+    other = OpenAILLM(config.model_copy(update={"rpm": 600})).rate_limiter
+    assert other is not limiter and other.request_bucket.capacity == 600
+
+
+@pytest.mark.asyncio
+async def test_limiter_concurrency_and_reconcile():
+    limiter = LLMRateLimiter(tpm=6000, max_concurrency=2)
+    peak = 0
+
+    async def request():
+        nonlocal peak
+        async with limiter.acquire(100):
+            peak = max(peak, limiter.in_flight)
+            await asyncio.sleep(0.01)
+            report_usage(10)
+
+    await asyncio.gather(*[request() for _ in range(6)])
+    assert peak == 2
+    assert limiter.in_flight == 0
+    assert limiter.token_bucket.tokens > 6000 - 6 * 100  # over-estimated tokens are given back
+
+
+@pytest.mark.asyncio
+async def test_limiter_adaptive_backoff():
+    limiter = LLMRateLimiter(max_concurrency=8)
+    limiter.on_rate_limited(retry_after=0.1)
+    assert limiter.concurrency_limit == 4
+    assert limiter._delay(0) > 0
+    for _ in range(4):
+        limiter.on_success()
+    assert limiter.concurrency_limit == 8
+
+    limiter = LLMRateLimiter(rpm=60)
+    limiter.in_flight = 6
+    limiter.on_rate_limited(retry_after=0)
+    assert limiter.concurrency_limit == 3
+    for _ in range(3):
+        limiter.on_success()
+    assert limiter.concurrency_limit == 0  # back to unlimited
+
+
+@pytest.mark.asyncio
+async def test_openai_rate_limited_by_local_server():
+    calls = 0
+
+    async def handler(request):
+        nonlocal calls
+        calls += 1
+        if calls <= 2:
+            return aiohttp.web.json_response(
+                {"error": {"message": "Rate limit reached", "type": "requests"}},
+                status=429,
+                headers={"retry-after-ms": "10"},
+            )
+        return aiohttp.web.json_response(json.loads(get_openai_chat_completion("GPT").model_dump_json()))
+
+    runner = aiohttp.web.ServerRunner(aiohttp.web.Server(handler))
+    await runner.setup()
+    site = aiohttp.web.TCPSite(runner, "127.0.0.1", 0)
+    await site.start()
+    _, port, *_ = site._server.sockets[0].getsockname()
+
+    config = mock_llm_config.model_copy(
+        update={"base_url": f"http://127.0.0.1:{port}/v1", "max_concurrency": 4, "rate_limit_retries": 2}
+    )
+    llm = OpenAILLM(config)
+    llm.aclient = AsyncOpenAI(api_key="mock", base_url=config.base_url, max_retries=0)
+    rsp = await llm._acompletion_text_with_cache(messages, stream=False)
+    assert "GPT" in rsp
+    assert calls == 3
+    assert llm.rate_limiter.rate_limited_count == 2
+    assert llm.rate_limiter.in_flight == 0
+
+    calls = 0
+    llm.rate_limiter.max_retries = 1
+    with pytest.raises(Exception) as exc_info:
+        await llm._acompletion_text_with_cache(messages, stream=False)
+    assert is_rate_limit_error(exc_info.value)
+    await site.stop()
@@ -0,0 +1,156 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+# @Desc   : the unittest of router_api, endpoints are local stub servers with injected latency
+
+import asyncio
+import json
+import time
+
+import aiohttp.web
+import pytest
+from openai import AsyncOpenAI
+
+from metagpt.configs.llm_config import LLMType
+from metagpt.provider.llm_provider_registry import create_llm_instance
+from metagpt.provider.router_api import EndpointStats, RouterLLM
+from tests.metagpt.provider.mock_llm_config import mock_llm_config
+from tests.metagpt.provider.req_resp_const import get_openai_chat_completion, messages
+
+
+class StubEndpoint:
+    def __init__(self, name: str, delay: float = 0.0):
+        self.name = name
+        self.delay = delay
+        self.fail = False
+        self.calls = 0
+        self.runner = None
+        self.base_url = ""
+
+    async def handler(self, request):
+        self.calls += 1
+        await asyncio.sleep(self.delay)
+        if self.fail:
+            return aiohttp.web.json_response({"error": {"message": "overloaded"}}, status=500)
+        return aiohttp.web.json_response(json.loads(get_openai_chat_completion(self.name).model_dump_json()))
+
+    async def start(self):
+        self.runner = aiohttp.web.ServerRunner(aiohttp.web.Server(self.handler))
+        await self.runner.setup()
+        site = aiohttp.web.TCPSite(self.runner, "127.0.0.1", 0)
+        await site.start()
+        _, port, *_ = site._server.sockets[0].getsockname()
+        self.base_url = f"http://127.0.0.1:{port}/v1"
+        return self
+
+    async def stop(self):
+        await self.runner.cleanup()
+
+
+async def make_router(*endpoints: StubEndpoint) -> RouterLLM:
+    for i in endpoints:
+        await i.start()
+    config = mock_llm_config.model_copy(
+        update={
+            "api_type": LLMType.ROUTER,
+            "endpoints": [mock_llm_config.model_copy(update={"base_url": i.base_url}) for i in endpoints],
+        }
+    )
+    router = create_llm_instance(config)
+    for llm in router.endpoints:
+        llm.aclient = AsyncOpenAI(api_key="mock", base_url=llm.config.base_url, max_retries=0)
+    return router
+
+
+def test_endpoint_stats():
+    stats = EndpointStats(eject_after=2)
+    assert stats.score() == 0 and stats.percentile(95) is None
+    for i in range(20):
+        stats.record_success(0.1 if i < 19 else 1.0)
+    assert 0.1 < stats.latency < 1.0
+    assert stats.percentile(95) == 1.0 and stats.percentile(50) == 0.1
+    stats.record_failure()
+    assert not stats.ejected and stats.error_rate > 0
+    stats.record_failure()
+    assert stats.ejected and stats.score() == float("inf")
+
+
+def test_router_stats_by_model():
+    other_model = mock_llm_config.model_copy(update={"model": "other-model"})
+    config = mock_llm_config.model_copy(
+        update={"api_type": LLMType.ROUTER, "endpoints": [mock_llm_config, other_model]}
+    )
+    router = create_llm_instance(config)
+    assert router.stats(router.endpoints[0]) is not router.stats(router.endpoints[1])
+    assert router.stats(router.endpoints[0]) is router.stats(create_llm_instance(mock_llm_config))
+
+
+@pytest.mark.asyncio
+async def test_router_prefers_fast_endpoint():
+    slow, fast = StubEndpoint("slow", delay=0.2), StubEndpoint("fast")
+    router = await make_router(slow, fast)
+    assert isinstance(router, RouterLLM)
+
+    for _ in range(6):
+        await router._acompletion_text_with_cache(messages, stream=False)
+    assert slow.calls == 1  # measured once, then avoided
+    assert fast.calls == 5
+    assert router.stats(router.endpoints[0]).latency > router.stats(router.endpoints[1]).latency
+    await slow.stop()
+    await fast.stop()
+
+
+@pytest.mark.asyncio
+async def test_router_fallback():
+    broken, healthy = StubEndpoint("broken"), StubEndpoint("healthy")
+    broken.fail = True
+    router = await make_router(broken, healthy)
+
+    rsp = await router._acompletion_text_with_cache(messages, stream=False)
+    assert "healthy" in rsp
+    assert broken.calls == 1
+    assert router.stats(router.endpoints[0]).error_rate > 0
+
+    broken.fail = False
+    healthy.fail = True
+    assert "broken" in await router._acompletion_text_with_cache(messages, stream=False)
+
+    broken.fail = True
+    with pytest.raises(Exception):
+        await router._acompletion_text_with_cache(messages, stream=False)
+    await broken.stop()
+    await healthy.stop()
+
+
+@pytest.mark.asyncio
+async def test_router_hedge_slow_request():
+    primary, backup = StubEndpoint("primary"), StubEndpoint("backup", delay=0.05)
+    router = await make_router(primary, backup)
+    for _ in range(12):
+        await router._acompletion_text_with_cache(messages, stream=False)
+    assert primary.calls == 11 and backup.calls >= 1  # measured once, or hedged on a latency spike of a busy host
+
+    primary.delay = 1
+    start = time.monotonic()
+    rsp = await router._acompletion_text_with_cache(messages, stream=False)
+    assert "backup" in rsp
+    assert time.monotonic() - start < 0.5
+    assert router.stats(router.endpoints[0]).in_flight == 0  # the slow request is cancelled
+    await primary.stop()
+    await backup.stop()
+
+
+@pytest.mark.asyncio
+async def test_router_hedge_after_samples():
+    primary, backup = StubEndpoint("primary"), StubEndpoint("backup", delay=0.05)
+    router = await make_router(primary, backup)
+    assert not router._hedging()  # streamed until the latency percentile is known
+    for _ in range(12):
+        await router._acompletion_text_with_cache(messages, stream=False)
+    assert router._hedging()
+
+    primary.delay, primary.fail, backup.fail = 0.2, True, True
+    with pytest.raises(Exception):
+        await router._acompletion_text_with_cache(messages, stream=False)
+    assert backup.calls == 2  # the failed backup is not tried again
+    await primary.stop()
+    await backup.stop()
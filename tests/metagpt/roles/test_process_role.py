@@ -0,0 +1,128 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+# @Desc   : the unittest of ProcessRole
+
+import os
+
+import pytest
+
+from metagpt.actions import Action, UserRequirement
+from metagpt.roles import Role
+from metagpt.roles.process_role import ProcessRole
+from metagpt.schema import Message
+from metagpt.team import Team
+
+
+class ReportPid(Action):
+    async def run(self, messages: list[Message]) -> str:
+        self.context.cost_manager.update_cost(10, 5, "gpt-4")
+        return f"{messages[-1].content} handled by {os.getpid()}"
+
+
+class Worker(Role):
+    name: str = "Worker"
+    profile: str = "worker"
+
+    def __init__(self, **kwargs):
+        super().__init__(**kwargs)
+        self.set_actions([ReportPid])
+        self._watch([UserRequirement])
+
+
+class Failing(Action):
+    async def run(self, messages: list[Message]) -> str:
+        raise ValueError("broken")
+
+
+class FailingWorker(Role):
+    name: str = "FailingWorker"
+
+    def __init__(self, **kwargs):
+        super().__init__(**kwargs)
+        self.set_actions([Failing])
+
+
+class Listener(Role):
+    name: str = "Listener"
+    profile: str = "listener"
+
+    def __init__(self, **kwargs):
+        super().__init__(**kwargs)
+        self._watch([ReportPid])
+
+
+@pytest.mark.asyncio
+async def test_process_role(context):
+    team = Team(context=context)
+    listener = Listener()
+    team.hire([Worker()], in_processes=True)
+    team.hire([listener])
+    worker = team.env.get_role("worker")
+    assert isinstance(worker, ProcessRole)
+    assert team.env.get_addresses(worker) == Worker().addresses
+
+    try:
+        team.run_project("task 1", send_to="Worker")
+        await team.env.run()
+        news = listener.rc.msg_buffer.pop_all()
+        assert len(news) == 1
+        assert news[0].content.startswith("task 1 handled by")
+        assert news[0].content != f"task 1 handled by {os.getpid()}"
+        assert news[0].cause_by == "tests.metagpt.roles.test_process_role.ReportPid"
+
+        await team.env.run()  # nothing new for the worker
+        assert listener.rc.msg_buffer.empty()
+    finally:
+        worker.stop()
+
+
+@pytest.mark.asyncio
+async def test_process_role_error():
+    proxy = ProcessRole.from_role(FailingWorker())
+    try:
+        with pytest.raises(RuntimeError, match="broken"):
+            await proxy.run(Message(content="task", cause_by=UserRequirement))
+    finally:
+        proxy.stop()
+
+
+@pytest.mark.asyncio
+async def test_process_role_lost_worker():
+    proxy = ProcessRole.from_role(Worker())
+    try:
+        await proxy.run(Message(content="task 1", cause_by=UserRequirement))
+        assert len(proxy.role_data["rc"]["memory"]["storage"]) == 2  # sent back with every reply
+
+        proxy._process.kill()
+        proxy._process.join()
+        with pytest.raises(RuntimeError, match="lost its process"):
+            await proxy.run(Message(content="task 2", cause_by=UserRequirement))
+        assert proxy._process is None and not proxy.rc.msg_buffer.empty()
+
+        await proxy.run()  # a new worker, from the state of the last reply, replays the latest observed message
+        rsp = await proxy.run()
+        assert rsp.content.startswith("task 2 handled by")
+        assert [i["content"] for i in proxy.role_data["rc"]["memory"]["storage"]][-2] == "task 2"
+    finally:
+        proxy.stop()
+
+
+@pytest.mark.asyncio
+async def test_process_role_team_run(context, tmp_path):
+    team = Team(context=context)
+    team.hire([Worker()], in_processes=True)
+    await team.run(n_round=1, idea="task 1", send_to="Worker", auto_archive=False)
+    worker = team.env.get_role("worker")
+    assert worker._process is None  # stopped once the run is over
+    assert team.cost_manager.total_prompt_tokens == 10  # the spending of the worker counts against the investment
+    assert len(worker.role_data["rc"]["memory"]["storage"]) == 2  # the state of the role is back from the worker
+
+    team.serialize(tmp_path)
+    recovered = Team.deserialize(tmp_path, context=context).env.get_role("worker")
+    assert isinstance(recovered, ProcessRole) and recovered.role_class == "Worker"
+    try:
+        await recovered.run(Message(content="task 2", cause_by=UserRequirement))  # replays the latest observed one
+        rsp = await recovered.run()
+        assert rsp.content.startswith("task 2 handled by")
+    finally:
+        recovered.stop()
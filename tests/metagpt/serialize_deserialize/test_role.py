@@ -11,6 +11,7 @@ from pydantic import BaseModel, SerializeAsAny
 from metagpt.actions import WriteCode
 from metagpt.actions.add_requirement import UserRequirement
 from metagpt.logs import logger
+from metagpt.memory.tiered_memory import TieredMemory
 from metagpt.roles.engineer import Engineer
 from metagpt.roles.product_manager import ProductManager
 from metagpt.roles.role import Role
@@ -88,6 +89,20 @@ def test_role_serdeser_save(context):
     assert len(new_pm.get_memories(1)) == 0
 
 
+def test_role_tiered_memory_serdeser(context):
+    role = RoleA()
+    role.rc.memory = TieredMemory(hot_size=2)
+    role.rc.memory.add_batch([Message(content=str(i)) for i in range(6)])
+    role_dict = role.model_dump()
+    assert len(role_dict["rc"]["memory"]["storage"]) == 6  # the cold messages too
+
+    new_role = RoleA(**role_dict)
+    assert isinstance(new_role.rc.memory, TieredMemory)
+    assert new_role.rc.memory.hot_size == 2
+    assert len(new_role.rc.memory.storage) == 2
+    assert [i.content for i in new_role.rc.memory.get()] == [str(i) for i in range(6)]
+
+
 @pytest.mark.asyncio
 async def test_role_serdeser_interrupt(context):
     role_c = RoleC()
@@ -3,14 +3,19 @@
 # @Author  : stellahong (stellahong@fuzhi.ai)
 # @Desc    :
 
+import json
 import shutil
 from pathlib import Path
 
 import pytest
 
+from metagpt.actions.action_node import ActionNode
 from metagpt.context import Context
+from metagpt.environment.env_history import EnvHistory
 from metagpt.logs import logger
+from metagpt.memory.tiered_memory import TieredMemory
 from metagpt.roles import Architect, ProductManager, ProjectManager
+from metagpt.schema import Message
 from metagpt.team import Team
 from metagpt.utils.common import write_json_file
 from tests.metagpt.serialize_deserialize.test_serdeser_base import (
@@ -163,5 +168,95 @@ async def test_context(context):
     assert company.env.context.cost_manager.max_budget == context.cost_manager.max_budget
 
 
+def test_team_checkpoint(context):
+    stg_path = serdeser_path.joinpath("team_checkpoint")
+    shutil.rmtree(stg_path, ignore_errors=True)
+
+    company = Team(context=context)
+    role_a, role_b = RoleA(), RoleB()
+    company.hire([role_a, role_b])
+    company.checkpoint(stg_path)  # the first checkpoint is a snapshot
+    snapshot = (stg_path / "team.json").read_text()
+
+    for i in range(3):
+        company.env.publish_message(Message(content=f"round {i}"))
+        role_a.rc.memory.add(Message(content=f"memory {i}"))
+        company.checkpoint(stg_path)
+    role_b.rc.state = 1
+    role_a.rc.memory.delete(role_a.rc.memory.get()[0])
+    company.checkpoint(stg_path)
+
+    assert (stg_path / "team.json").read_text() == snapshot
+    journal = (stg_path / "team.journal.jsonl").read_text().splitlines()
+    assert len(journal) == 4
+    assert "state" not in journal[0]
+    with open(stg_path / "team.journal.jsonl", "a") as f:
+        f.write('{"generation": 1, "roles": {"Rol')  # torn by a crash
+
+    new_company = Team.deserialize(stg_path)
+    new_role_a = new_company.env.get_role(role_a.profile)
+    assert new_role_a.rc.memory == role_a.rc.memory
+    assert [i.content for i in new_role_a.rc.memory.get()] == ["memory 1", "memory 2"]
+    assert new_company.env.get_role(role_b.profile).rc.state == 1
+    assert str(new_company.env.history) == str(company.env.history)
+
+    company._journal.compact_every = 5
+    for _ in range(2):
+        company.checkpoint(stg_path)
+    assert (stg_path / "team.journal.jsonl").read_text() == ""  # compacted into a new snapshot
+    assert Team.deserialize(stg_path).env.get_role(role_a.profile).rc.memory == role_a.rc.memory
+
+
+def test_team_checkpoint_deltas(context):
+    stg_path = serdeser_path.joinpath("team_checkpoint_deltas")
+    shutil.rmtree(stg_path, ignore_errors=True)
+
+    company = Team(context=context)
+    company.env.history = EnvHistory(max_entries=2)
+    role_a = RoleA()
+    company.hire([role_a])
+    company.checkpoint(stg_path)
+
+    ic_class = ActionNode.create_model_class("journal_ic", {"Goals": (list[str], ...)})
+    for i in range(5):
+        company.env.publish_message(Message(content=f"round {i}"))
+    for i in range(2):
+        role_a.rc.memory.add(Message(content=f"prd {i}", instruct_content=ic_class(Goals=[str(i)])))
+    company.checkpoint(stg_path)
+    role_a.rc.memory.add(Message(content="prd 2", instruct_content=ic_class(Goals=["2"])))
+    company.checkpoint(stg_path)
+
+    journal = [json.loads(i) for i in (stg_path / "team.journal.jsonl").read_text().splitlines()]
+    assert len(journal[0]["history"]) == 5  # the spilled entries included
+    assert list(journal[0]["roles"][role_a.profile]["ic_mappings"].values()) == [{"Goals": "(list[str], Ellipsis)"}]
+    assert "ic_mappings" not in journal[1]["roles"][role_a.profile]  # written once
+
+    new_company = Team.deserialize(stg_path)
+    assert new_company.env.history.text() == company.env.history.text()
+    new_role_a = new_company.env.get_role(role_a.profile)
+    assert [i.instruct_content.Goals for i in new_role_a.rc.memory.get()] == [["0"], ["1"], ["2"]]
+
+
+def test_team_tiered_memory(context):
+    stg_path = serdeser_path.joinpath("team_tiered_memory")
+    shutil.rmtree(stg_path, ignore_errors=True)
+
+    company = Team(context=context)
+    role_a = RoleA()
+    role_a.rc.memory = TieredMemory(hot_size=2)
+    company.hire([role_a])
+    role_a.rc.memory.add_batch([Message(content=str(i)) for i in range(3)])
+    company.serialize(stg_path)
+    new_memory = Team.deserialize(stg_path).env.get_role(role_a.profile).rc.memory
+    assert isinstance(new_memory, TieredMemory) and new_memory.hot_size == 2
+    assert [i.content for i in new_memory.get()] == ["0", "1", "2"]
+
+    role_a.rc.memory.add_batch([Message(content=str(i)) for i in range(3, 6)])  # spilled to the cold store
+    company.checkpoint(stg_path)
+    new_memory = Team.deserialize(stg_path).env.get_role(role_a.profile).rc.memory
+    assert isinstance(new_memory, TieredMemory)
+    assert [i.content for i in new_memory.get()] == [str(i) for i in range(6)]
+
+
 if __name__ == "__main__":
     pytest.main([__file__, "-s"])
@@ -11,6 +11,7 @@ from pathlib import Path
 import pytest
 
 from metagpt.actions import UserRequirement
+from metagpt.const import MESSAGE_ROUTE_TO_ALL
 from metagpt.environment import Environment
 from metagpt.logs import logger
 from metagpt.roles import Architect, ProductManager, Role
@@ -41,6 +42,31 @@ def test_get_roles(env: Environment):
     assert roles == {role1.profile: role1, role2.profile: role2}
 
 
+def test_publish_message_routing(env: Environment):
+    alice = Role(name="Alice", profile="product manager")
+    bob = Role(name="Bob", profile="engineer")
+    env.add_roles([alice, bob])
+
+    env.publish_message(Message(content="to bob", send_to="Bob"))
+    assert alice.rc.msg_buffer.empty() and len(bob.rc.msg_buffer.pop_all()) == 1
+
+    bob.set_addresses({"Bob", "reviewers"})
+    alice.set_addresses({"reviewers"})
+    env.publish_messages(
+        [
+            Message(content="review", send_to={"reviewers", "Bob"}),
+            Message(content="all", send_to=MESSAGE_ROUTE_TO_ALL),
+            Message(content="nobody", send_to="Carol"),
+        ]
+    )
+    assert [i.content for i in alice.rc.msg_buffer.pop_all()] == ["review", "all"]
+    assert [i.content for i in bob.rc.msg_buffer.pop_all()] == ["review", "all"]
+
+    alice.set_addresses({"Alice"})
+    env.publish_message(Message(content="review", send_to="reviewers"))
+    assert alice.rc.msg_buffer.empty() and not bob.rc.msg_buffer.empty()
+
+
 @pytest.mark.asyncio
 async def test_publish_and_process_message(env: Environment):
     if env.context.git_repo:
@@ -57,7 +83,7 @@ async def test_publish_and_process_message(env: Environment):
     env.publish_message(Message(role="User", content="需要一个基于LLM做总结的搜索引擎", cause_by=UserRequirement))
     await env.run(k=2)
     logger.info(f"{env.history=}")
-    assert len(env.history) > 10
+    assert len(str(env.history)) > 10
 
 
 if __name__ == "__main__":
@@ -0,0 +1,32 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+# @Desc   : the unittest of logs
+
+import time
+
+from metagpt import logs
+from metagpt.logs import BufferedStreamLog, log_llm_stream, set_llm_stream_logfunc
+
+
+def test_buffered_stream_log():
+    written = []
+    default_logfunc = logs._llm_stream_log
+    sink = BufferedStreamLog(write=written.append, flush_interval=0.1, max_size=10)
+    set_llm_stream_logfunc(sink)
+    try:
+        log_llm_stream("hel")
+        log_llm_stream("lo")
+        assert written == []  # waiting for the next flush
+        time.sleep(0.3)
+        assert written == ["hello"]
+
+        log_llm_stream("a")
+        log_llm_stream("b\n")
+        assert written == ["hello", "ab\n"]  # a complete line is written at once
+        log_llm_stream("0123456789")
+        assert written[-1] == "0123456789"
+    finally:
+        sink.close()
+        set_llm_stream_logfunc(default_logfunc)
+    assert not sink._thread.is_alive()
+    assert sink not in logs._stream_logs  # closed once, not again at exit
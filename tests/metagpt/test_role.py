@@ -137,6 +137,24 @@ async def test_recover():
     assert rsp.cause_by == any_to_str(MockAction)
 
 
+@pytest.mark.asyncio
+async def test_observe_news_only():
+    role = Role()
+    msgs = [Message(content=f"msg {i}", cause_by=UserRequirement) for i in range(3)]
+    for msg in msgs[:2]:
+        role.put_message(msg)
+    assert await role._observe() == 2
+
+    for msg in msgs:
+        role.put_message(msg)
+    assert await role._observe() == 1
+    assert role.rc.news == msgs[2:]
+    assert role.rc.memory.count() == 3
+
+    role.put_message(msgs[0])
+    assert await role._observe(ignore_memory=True) == 1
+
+
 @pytest.mark.asyncio
 async def test_think_act():
     # Mock LLM actions
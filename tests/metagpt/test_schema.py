@@ -12,10 +12,11 @@ import json
 
 import pytest
 
+from metagpt import schema
 from metagpt.actions import Action
 from metagpt.actions.action_node import ActionNode
 from metagpt.actions.write_code import WriteCode
-from metagpt.const import SYSTEM_DESIGN_FILE_REPO, TASK_FILE_REPO
+from metagpt.const import MESSAGE_ROUTE_TO_ALL, SYSTEM_DESIGN_FILE_REPO, TASK_FILE_REPO
 from metagpt.schema import (
     AIMessage,
     CodeSummarizeContext,
@@ -31,6 +32,7 @@ from metagpt.schema import (
     UserMessage,
 )
 from metagpt.utils.common import any_to_str
+from metagpt.utils.serialize import actionoutput_mapping_fingerprint
 
 
 def test_messages():
@@ -95,10 +97,12 @@ def test_message_serdeser():
 
     message = Message(content="code", instruct_content=ic_obj(**out_data), role="engineer", cause_by=WriteCode)
     message_dict = message.model_dump()
+    str_mapping = {"field3": "(<class 'str'>, Ellipsis)", "field4": "(list[str], Ellipsis)"}
     assert message_dict["cause_by"] == "metagpt.actions.write_code.WriteCode"
     assert message_dict["instruct_content"] == {
         "class": "code",
-        "mapping": {"field3": "(<class 'str'>, Ellipsis)", "field4": "(list[str], Ellipsis)"},
+        "mapping": str_mapping,
+        "mapping_ref": actionoutput_mapping_fingerprint("code", str_mapping),
         "value": {"field3": "field3 value3", "field4": ["field4 value1", "field4 value2"]},
     }
     new_message = Message.model_validate(message_dict)
@@ -107,6 +111,10 @@ def test_message_serdeser():
     assert new_message.instruct_content == message.instruct_content  # TODO
     assert new_message.cause_by == message.cause_by
     assert new_message.instruct_content.field3 == out_data["field3"]
+    ref_only = {k: v for k, v in message_dict["instruct_content"].items() if k != "mapping"}
+    assert Message(content="code", instruct_content=ref_only).instruct_content == new_message.instruct_content
+    with pytest.raises(KeyError):
+        Message(content="code", instruct_content={**ref_only, "mapping_ref": "unknown"})
 
     message = Message(content="code")
     message_dict = message.model_dump()
@@ -116,6 +124,35 @@ def test_message_serdeser():
     assert not Message.load("{")
 
 
+def test_message_ic_mappings_bounded(monkeypatch):
+    monkeypatch.setattr(schema, "_IC_MAPPINGS_MAXSIZE", 2)
+    ic_classes = [ActionNode.create_model_class(f"bounded_{i}", {"field": (str, ...)}) for i in range(3)]
+    dumps = [Message(content="a", instruct_content=i(field="v")).model_dump() for i in ic_classes]
+    assert len(schema._ic_mappings) <= 2
+    ref_only = {k: v for k, v in dumps[0]["instruct_content"].items() if k != "mapping"}
+    assert ref_only["mapping_ref"] not in schema._ic_mappings
+    assert Message(content="a", instruct_content=ref_only).instruct_content.field == "v"  # its class is alive
+
+
+def test_message_create_trusted():
+    msg = Message.create_trusted("a", role="b", cause_by=any_to_str(WriteCode), send_to={"c"})
+    assert msg == Message(id=msg.id, content="a", role="b", cause_by=WriteCode, send_to="c")
+    assert len(msg.id) == 32
+
+    msg = Message.create_trusted()
+    assert msg == Message(id=msg.id, content="")
+    assert msg.send_to == {MESSAGE_ROUTE_TO_ALL}
+    msg.cause_by = WriteCode  # setters still convert
+    assert msg.cause_by == any_to_str(WriteCode)
+    assert Message(**msg.model_dump()) == msg
+
+    assert isinstance(UserMessage.create_trusted("a"), UserMessage)
+    assert UserMessage.create_trusted("a").role == "user"
+    assert AIMessage.create_trusted("a").role == "assistant"
+    assert SystemMessage.create_trusted("a").role == "system"
+    assert SystemMessage.create_trusted("a").content == "a"
+
+
 def test_document():
     doc = Document(root_path="a", filename="b", content="c")
     meta_doc = doc.get_meta()
@@ -140,6 +177,29 @@ async def test_message_queue():
     assert new_mq.pop_all() == mq.pop_all()
 
 
+@pytest.mark.asyncio
+async def test_message_queue_snapshot():
+    mq = MessageQueue()
+    msgs = [Message(content=f"message {i}", cause_by=WriteCode) for i in range(100)]
+    for msg in msgs:
+        mq.push(msg)
+    assert mq.snapshot() == msgs
+    assert not mq.empty()  # nothing was taken out
+
+    val = await mq.dump(binary=True)
+    assert isinstance(val, bytes) and len(val) < len(await mq.dump())
+    assert MessageQueue.load(val).pop_all() == msgs
+    assert mq.pop_all() == msgs
+    assert MessageQueue.load(await mq.dump(binary=True)).empty()
+
+    mq.push(msgs[0])
+    mq.push(msgs[1])
+    assert mq.pop() == msgs[0]
+    assert mq.snapshot() == msgs[1:2]
+    assert await mq._queue.get() == msgs[1]  # awaiting consumers see the same items
+    assert mq.snapshot() == [] and mq.empty()
+
+
 @pytest.mark.parametrize(
     ("file_list", "want"),
     [
@@ -2,9 +2,18 @@
 # -*- coding: utf-8 -*-
 # @Desc   : unittest of ahttp_client
 
+import asyncio
+import warnings
+
 import pytest
 
-from metagpt.utils.ahttp_client import apost, apost_stream
+from metagpt.config2 import config
+from metagpt.utils.ahttp_client import (
+    SESSION_POOL,
+    AioHttpSessionPool,
+    apost,
+    apost_stream,
+)
 
 
 @pytest.mark.asyncio
@@ -27,3 +36,50 @@ async def test_apost_stream():
     result = apost_stream(url="http://aider.meizu.com/app/weather/listWeather", data={"cityIds": "101240101"})
     async for line in result:
         assert len(line) >= 0
+
+
+@pytest.mark.asyncio
+async def test_session_pool(http_server, mocker):
+    site, url = await http_server()
+    pool = AioHttpSessionPool(limit=8, ttl_dns_cache=0)
+    with pytest.raises(ValueError):
+        pool.configure(unknown=1)
+
+    session = await pool.get_session()
+    assert await pool.get_session() is session
+    assert session.connector.limit == 8
+    assert not session.connector.use_dns_cache
+
+    mocker.patch.object(SESSION_POOL, "_options", {})
+    SESSION_POOL.configure(keepalive_timeout=60)
+    for _ in range(3):
+        assert "MetaGPT" in await apost(url=url)
+    async for line in apost_stream(url=url):
+        assert len(line) >= 0
+    connector = (await SESSION_POOL.get_session()).connector
+    assert sum(len(i) for i in connector._conns.values()) == 1  # keep-alive connection is reused
+
+    await pool.close()
+    assert session.closed
+    assert await pool.get_session() is not session
+    await pool.close()
+    await SESSION_POOL.close()
+    await site.stop()
+
+
+def test_session_pool_closed_loops(mocker):
+    mocker.patch.object(config.http, "limit", 3)
+    pool = AioHttpSessionPool(limit_per_host=2)
+
+    loop = asyncio.new_event_loop()
+    session = loop.run_until_complete(pool.get_session())
+    assert (session.connector.limit, session.connector.limit_per_host) == (3, 2)
+    loop.close()
+
+    with warnings.catch_warnings(record=True) as caught:
+        warnings.simplefilter("always")
+        new_session = asyncio.run(pool.get_session())
+        assert session.closed  # closed when dropped, not left to the garbage collector
+        del session
+    assert not [i for i in caught if "Unclosed" in str(i.message)]
+    asyncio.run(new_session.close())
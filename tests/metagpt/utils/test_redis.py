@@ -26,6 +26,7 @@ async def test_redis(mocker):
     mock_config.username = "mockusername"
     mock_config.password = "mockpwd"
     mock_config.db = "0"
+    mock_config.compress = False
 
     conn = Redis(mock_config)
     await conn.set("test", "test", timeout_sec=0)
@@ -33,5 +34,40 @@ async def test_redis(mocker):
     await conn.close()
 
 
+@pytest.mark.asyncio
+async def test_redis_shared_pool(mocker):
+    async def async_mock_from_url(*args, **kwargs):
+        return AsyncMock()
+
+    from_url = mocker.patch("aioredis.from_url", side_effect=async_mock_from_url)
+    mock_config = mocker.Mock()
+    mock_config.to_url.return_value = "redis://mock.com"
+    mock_config.compress = True
+
+    conn1, conn2 = Redis(mock_config), Redis(mock_config)
+    await conn1.set("a", "a")
+    await conn2.set("b", "b")
+    assert from_url.call_count == 1  # one pool for the same server
+    client = conn1._client
+    assert client is conn2._client
+    assert client.set.call_args.args[1] == conn1.encode("b")
+
+    await conn1.close()
+    client.close.assert_not_called()  # still used by conn2
+    await conn2.close()
+    client.close.assert_awaited_once()
+
+    await conn1.get("a")  # a new pool
+    await Redis.close_all()
+    conn1._client.close.assert_awaited_once()
+    await conn2.get("b")  # reconnects instead of using the closed pool
+    assert from_url.call_count == 3
+    client = conn2._client
+    await conn1.close()  # its pool is gone, the new one is left alone
+    client.close.assert_not_called()
+    await conn2.close()
+    client.close.assert_awaited_once()
+
+
 if __name__ == "__main__":
     pytest.main([__file__, "-s"])
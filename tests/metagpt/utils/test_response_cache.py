@@ -0,0 +1,65 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+# @Desc   : unittest of response_cache
+
+import time
+
+import pytest
+
+from metagpt.utils.response_cache import ResponseCache, get_response_cache
+
+messages = [{"role": "user", "content": "hello"}]
+
+
+def test_make_key():
+    key = ResponseCache.make_key("gpt-4", messages, 0.0)
+    assert key == ResponseCache.make_key("gpt-4", [{"content": "hello", "role": "user"}], 0.0)
+    assert key != ResponseCache.make_key("gpt-3.5-turbo", messages, 0.0)
+    assert key != ResponseCache.make_key("gpt-4", messages, 0.5)
+    assert key != ResponseCache.make_key("gpt-4", messages, 0.0, tools=[{"type": "function"}])
+    assert ResponseCache.make_key("gpt-4", messages, 0.0, tool_choice="auto") != ResponseCache.make_key(
+        "gpt-4", messages, 0.0, tool_choice={"type": "function", "function": {"name": "execute"}}
+    )
+
+
+def test_response_cache(tmp_path):
+    cache = ResponseCache(tmp_path / "cache.db", max_entries=2)
+    assert cache.get("a") is None
+    cache.set("a", "rsp a")
+    cache.set("b", {"code": "print(1)"})
+    assert cache.get("a") == "rsp a"  # touch `a`, so `b` is the least recently used one
+    cache.set("c", "rsp c")
+    assert len(cache) == 2
+    assert "b" not in cache
+    assert "a" in cache and "c" in cache
+    assert cache.hits == 1 and cache.misses == 1
+
+    # persisted across instances
+    assert ResponseCache(tmp_path / "cache.db").get("c") == "rsp c"
+    cache.clear()
+    assert len(cache) == 0
+
+
+@pytest.mark.asyncio
+async def test_response_cache_async(tmp_path):
+    cache = ResponseCache(tmp_path / "cache.db", max_entries=3)
+    for i in range(5):
+        await cache.aset(str(i), f"rsp {i}")
+        await cache.aset(str(i), f"rsp {i}")  # replacing doesn't count twice
+    assert len(cache) == cache._count == 3
+    assert await cache.aget("4") == "rsp 4"
+    assert await cache.aget("0") is None
+
+
+def test_response_cache_ttl(tmp_path):
+    cache = ResponseCache(tmp_path / "cache.db", ttl=1)
+    cache.set("a", "rsp a")
+    assert cache.get("a") == "rsp a"
+    time.sleep(1.1)
+    assert "a" not in cache
+    assert cache.get("a") is None
+
+
+def test_get_response_cache(tmp_path):
+    path = str(tmp_path / "cache.db")
+    assert get_response_cache(path, 10, 0) is get_response_cache(path, 10, 0)
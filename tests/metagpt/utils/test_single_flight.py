@@ -0,0 +1,59 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+# @Desc   : unittest of single_flight
+
+import asyncio
+
+import pytest
+
+from metagpt.utils.single_flight import SingleFlight
+
+
+@pytest.mark.asyncio
+async def test_single_flight():
+    flights = SingleFlight()
+    calls = 0
+
+    async def fn():
+        nonlocal calls
+        calls += 1
+        await asyncio.sleep(0.05)
+        return calls
+
+    results = await asyncio.gather(*[flights.do("k", fn) for _ in range(5)])
+    assert calls == 1
+    assert [r for r, _ in results] == [1] * 5
+    assert [shared for _, shared in results] == [False, True, True, True, True]
+    assert len(flights) == 0
+
+    async def fail():
+        await asyncio.sleep(0.01)
+        raise ValueError("boom")
+
+    results = await asyncio.gather(flights.do("k", fail), flights.do("k", fail), return_exceptions=True)
+    assert all(isinstance(r, ValueError) for r in results)
+
+
+@pytest.mark.asyncio
+async def test_single_flight_cancel():
+    flights = SingleFlight()
+
+    async def fn():
+        await asyncio.sleep(0.05)
+        return "done"
+
+    first = asyncio.ensure_future(flights.do("k", fn))
+    second = asyncio.ensure_future(flights.do("k", fn))
+    await asyncio.sleep(0)
+    first.cancel()
+    assert await second == ("done", True)  # the shared call survives a cancelled caller
+    with pytest.raises(asyncio.CancelledError):
+        await first
+
+    only = asyncio.ensure_future(flights.do("k2", fn))
+    await asyncio.sleep(0)
+    only.cancel()
+    with pytest.raises(asyncio.CancelledError):
+        await only
+    await asyncio.sleep(0)
+    assert len(flights) == 0
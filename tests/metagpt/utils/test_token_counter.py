@@ -7,7 +7,12 @@
 """
 import pytest
 
-from metagpt.utils.token_counter import count_input_tokens, count_output_tokens
+from metagpt.utils.token_counter import (
+    _count_message_tokens_cached,
+    count_input_tokens,
+    count_output_tokens,
+    get_encoding,
+)
 
 
 def test_count_message_tokens():
@@ -69,5 +74,25 @@ def test_count_string_tokens_gpt_4():
     assert count_output_tokens(string, model="gpt-4-0314") == 4
 
 
+def test_count_message_tokens_memoized():
+    assert get_encoding("gpt-4-0613") is get_encoding("gpt-4-0613")
+    assert get_encoding("invalid_model").name == "cl100k_base"
+
+    _count_message_tokens_cached.cache_clear()
+    history = [{"role": "user", "content": "Hello"}, {"role": "assistant", "content": "Hi there!"}]
+    assert count_input_tokens(history) == 15
+    history.append({"role": "user", "content": "Hello", "name": "John"})
+    assert count_input_tokens(history) == 15 + 7
+    info = _count_message_tokens_cached.cache_info()
+    assert info.hits == 2 and info.misses == 3  # only the new message is encoded
+
+
+def test_count_message_tokens_gpt_4v():
+    messages = [
+        {"role": "user", "content": [{"type": "text", "text": "Hello"}, {"type": "image_url", "image_url": {}}]}
+    ]
+    assert count_input_tokens(messages, model="gpt-4o") == count_input_tokens([{"role": "user", "content": "Hello"}])
+
+
 if __name__ == "__main__":
     pytest.main([__file__, "-s"])
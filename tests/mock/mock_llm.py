@@ -6,6 +6,7 @@ from metagpt.configs.llm_config import LLMType
 from metagpt.logs import logger
 from metagpt.provider.azure_openai_api import AzureOpenAILLM
 from metagpt.provider.constant import GENERAL_FUNCTION_SCHEMA
+from metagpt.provider.llm_stream import LLMStream
 from metagpt.provider.openai_api import OpenAILLM
 from metagpt.schema import Message
 
@@ -98,6 +99,22 @@ class MockLLM(OriginalLLM):
         rsp = await self._mock_rsp(msg_key, self.original_aask, msg, system_msgs, format_msgs, images, timeout, stream)
         return rsp
 
+    def aask_stream(
+        self,
+        msg: Union[str, list[dict[str, str]]],
+        system_msgs: Optional[list[str]] = None,
+        format_msgs: Optional[list[dict[str, str]]] = None,
+        images: Optional[Union[str, list[str]]] = None,
+        timeout=3,
+        stop: Optional[str] = None,
+    ) -> LLMStream:
+        """Serve the mocked `aask` response as a single chunk"""
+
+        async def chunks():
+            yield await self.aask(msg, system_msgs, format_msgs, images, timeout)
+
+        return LLMStream(chunks(), stop=stop)
+
     async def aask_batch(self, msgs: list, timeout=3) -> str:
         msg_key = "#MSG_SEP#".join([msg if isinstance(msg, str) else msg.content for msg in msgs])
         rsp = await self._mock_rsp(msg_key, self.original_aask_batch, msgs, timeout)
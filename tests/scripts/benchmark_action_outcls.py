@@ -0,0 +1,57 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+@File    : benchmark_action_outcls.py
+@Desc    : Cost of a registry lookup of `ActionNode.create_model_class`, and of building its key the previous way.
+
+Usage:
+    python tests/scripts/benchmark_action_outcls.py [--fields 20] [--repeat 10000]
+"""
+import argparse
+import time
+from typing import List
+
+from metagpt.actions.action_node import ActionNode
+from metagpt.actions.action_outcls_registry import (
+    action_outcls_registry,
+    mapping_fingerprint,
+)
+
+
+def string_key(*args) -> str:
+    """The key the registry used to build by stringifying its arguments"""
+    arr = list(args)
+    for idx, item in enumerate(arr):
+        if isinstance(item, dict):
+            arr[idx] = dict(sorted(item.items()))
+    outcls_id = "_".join([str(i) for i in arr])
+    return outcls_id.replace("typing.List", "list").replace("typing.Dict", "dict")
+
+
+def timed(func, repeat: int) -> float:
+    start = time.perf_counter()
+    for _ in range(repeat):
+        func()
+    return (time.perf_counter() - start) / repeat * 1e6
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--fields", type=int, default=20)
+    parser.add_argument("--repeat", type=int, default=10000)
+    args = parser.parse_args()
+
+    mapping = {f"Field {i}": (List[str] if i % 2 else str, ...) for i in range(args.fields)}
+    ActionNode.create_model_class("Benchmark", mapping)
+
+    print(f"{'operation':<24}{'us/call':>10}")
+    print(f"{'string key':<24}{timed(lambda: string_key(ActionNode, 'Benchmark', mapping), args.repeat):>10.2f}")
+    print(f"{'structural key':<24}{timed(lambda: mapping_fingerprint(mapping), args.repeat):>10.2f}")
+    print(
+        f"{'registry hit':<24}{timed(lambda: ActionNode.create_model_class('Benchmark', mapping), args.repeat):>10.2f}"
+    )
+    print(action_outcls_registry.stats())
+
+
+if __name__ == "__main__":
+    main()
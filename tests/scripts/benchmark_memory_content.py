@@ -0,0 +1,64 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+@File    : benchmark_memory_content.py
+@Desc    : `Memory.get_by_content` with and without the word index, over a large synthetic history.
+
+Usage:
+    python tests/scripts/benchmark_memory_content.py [--messages 100000] [--repeat 20]
+"""
+import argparse
+import random
+import time
+
+from metagpt.memory.memory import Memory
+from metagpt.schema import Message
+
+VOCABULARY = [f"word{i}" for i in range(5000)]
+QUERIES = {
+    "rare word": "needle",
+    "common word": "word7",
+    "phrase": "word1 needle word2",
+    "missing": "haystack",
+}
+
+
+def make_messages(n: int) -> list[Message]:
+    rnd = random.Random(0)
+    messages = []
+    for i in range(n):
+        words = rnd.choices(VOCABULARY, k=30)
+        if i % 1000 == 0:
+            words[10:13] = ["word1", "needle", "word2"]
+        messages.append(Message.create_trusted(" ".join(words), role="Researcher"))
+    return messages
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--messages", type=int, default=100000)
+    parser.add_argument("--repeat", type=int, default=20)
+    args = parser.parse_args()
+
+    messages = make_messages(args.messages)
+    memories = {}
+    for index_content in (False, True):
+        start = time.perf_counter()
+        memory = Memory(index_content=index_content)
+        memory.add_batch(messages)
+        memories[index_content] = memory
+        print(f"add {args.messages} messages, index_content={index_content}: {time.perf_counter() - start:.2f}s")
+
+    print(f"{'query':<16}{'hits':>8}{'scan ms':>12}{'index ms':>12}")
+    for name, query in QUERIES.items():
+        elapsed = {}
+        for index_content, memory in memories.items():
+            start = time.perf_counter()
+            for _ in range(args.repeat):
+                hits = memory.get_by_content(query)
+            elapsed[index_content] = (time.perf_counter() - start) / args.repeat * 1000
+        print(f"{name:<16}{len(hits):>8}{elapsed[False]:>12.2f}{elapsed[True]:>12.2f}")
+
+
+if __name__ == "__main__":
+    main()
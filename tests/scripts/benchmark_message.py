@@ -0,0 +1,44 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+@File    : benchmark_message.py
+@Desc    : Messages per second for the ways a `Message` gets created.
+
+Usage:
+    python tests/scripts/benchmark_message.py [--number 50000]
+"""
+import argparse
+import timeit
+
+from metagpt.actions.write_code import WriteCode
+from metagpt.schema import Message
+from metagpt.utils.common import any_to_str
+
+FIELDS = {"role": "Engineer", "cause_by": any_to_str(WriteCode), "sent_from": "Alex", "send_to": {"Bob"}}
+MESSAGE = Message(content="hello", **FIELDS)
+DUMPED = MESSAGE.model_dump()
+
+CASES = {
+    "Message(content)": lambda: Message(content="hello"),
+    "Message(content, **fields)": lambda: Message(content="hello", **FIELDS),
+    "Message(cause_by=<class>)": lambda: Message(content="hello", cause_by=WriteCode),
+    "Message(**model_dump())": lambda: Message(**DUMPED),
+    "Message.model_copy()": lambda: MESSAGE.model_copy(),
+    "Message.create_trusted(content, **fields)": lambda: Message.create_trusted("hello", **FIELDS),
+}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--number", type=int, default=50000)
+    args = parser.parse_args()
+
+    print(f"{'case':<48}{'msgs/s':>12}")
+    for name, create in CASES.items():
+        create()  # warm up, the first default `cause_by` imports the actions
+        best = min(timeit.repeat(create, number=args.number, repeat=3))
+        print(f"{name:<48}{args.number / best:>12,.0f}")
+
+
+if __name__ == "__main__":
+    main()
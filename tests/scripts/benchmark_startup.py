@@ -0,0 +1,54 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+@File    : benchmark_startup.py
+@Desc    : Cold start time of `import metagpt` and the CLI entry point, each measured in a fresh interpreter.
+
+Usage:
+    python tests/scripts/benchmark_startup.py [--runs 5]
+"""
+import argparse
+import statistics
+import subprocess
+import sys
+import time
+
+CASES = {
+    "import metagpt": [sys.executable, "-c", "import metagpt"],
+    "import metagpt.provider.llm_provider_registry": [
+        sys.executable,
+        "-c",
+        "import metagpt.provider.llm_provider_registry",
+    ],
+    "import metagpt.roles": [sys.executable, "-c", "import metagpt.roles"],
+    "metagpt --help": [sys.executable, "-c", "from metagpt.software_company import app; app()", "--help"],
+}
+
+
+def measure(cmd: list[str], runs: int) -> list[float]:
+    """Seconds of each run, empty if the command fails"""
+    elapsed = []
+    for _ in range(runs):
+        start = time.perf_counter()
+        if subprocess.run(cmd, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL).returncode:
+            return []
+        elapsed.append(time.perf_counter() - start)
+    return elapsed
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--runs", type=int, default=5)
+    args = parser.parse_args()
+
+    print(f"{'case':<48}{'median':>10}{'min':>10}")
+    for name, cmd in CASES.items():
+        elapsed = measure(cmd, args.runs)
+        if not elapsed:
+            print(f"{name:<48}{'failed':>10}")
+            continue
+        print(f"{name:<48}{statistics.median(elapsed):>9.3f}s{min(elapsed):>9.3f}s")
+
+
+if __name__ == "__main__":
+    main()
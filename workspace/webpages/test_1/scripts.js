@@ -0,0 +1 @@
+// scripts.js
@@ -0,0 +1 @@
+// script.js